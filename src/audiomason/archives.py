@@ -1,9 +1,53 @@
 from __future__ import annotations
 
+import os
 import shutil
-from pathlib import Path
+import tarfile
+import time
+import zipfile
+from collections.abc import Iterator
+from pathlib import Path, PurePosixPath
+from typing import IO
 
-from audiomason.util import die, ensure_dir, run_cmd
+import audiomason.state as state
+from audiomason.util import die, ensure_dir, out, run_cmd, run_parallel
+from audiomason.virtual_stage import write_index
+
+# zip and tar.* are read in-process (zipfile/tarfile) and, unless
+# stage.unpack=all, only the members a book is built from are extracted:
+# audio, cover images and playlists/cue sheets. NFOs, PDFs, sample videos
+# etc. never reach the stage. rar/7z still go through unrar/7z (everything).
+# With stage.virtual, stored (uncompressed) zip audio members are not
+# extracted at all; see virtual_stage.
+
+MEDIA_EXTS = frozenset(
+    {
+        # audio
+        ".mp3",
+        ".m4a",
+        ".m4b",
+        ".opus",
+        ".ogg",
+        ".flac",
+        ".wav",
+        ".aac",
+        # covers
+        ".jpg",
+        ".jpeg",
+        ".png",
+        ".webp",
+        ".avif",
+        # playlists / chapter sheets
+        ".m3u",
+        ".m3u8",
+        ".cue",
+    }
+)
+
+# Members that may stay in the archive under stage.virtual (read via ffmpeg/mutagen).
+VIRTUAL_EXTS = frozenset({".mp3", ".m4a", ".m4b", ".opus", ".ogg"})
+
+TAR_EXTS = (".tar", ".tgz", ".tbz2", ".txz", ".gz", ".bz2", ".xz")
 
 
 def _require_tool(name: str) -> None:
@@ -11,13 +55,169 @@ def _require_tool(name: str) -> None:
         die(f"Missing external tool: {name} (install {name})")
 
 
+def _member_path(outdir: Path, name: str) -> Path | None:
+    """Destination of an archive member, or None when it would escape outdir."""
+    parts = [p for p in PurePosixPath(name.replace("\\", "/")).parts if p not in ("", ".")]
+    if not parts or parts[0] == "/" or ".." in parts:
+        return None
+    return outdir.joinpath(*parts)
+
+
+def _wanted(name: str, everything: bool) -> bool:
+    return everything or PurePosixPath(name).suffix.lower() in MEDIA_EXTS
+
+
+def _stream(fi: IO[bytes], dst: Path, buffer_size: int, mtime: float) -> None:
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    with dst.open("wb") as fo:
+        shutil.copyfileobj(fi, fo, buffer_size)
+    os.utime(dst, (mtime, mtime))
+
+
+def _placeholder(dst: Path, size: int, mtime: float) -> None:
+    # sparse file: right size and mtime for stat-keyed caches, no data written
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    with dst.open("wb") as fo:
+        fo.truncate(size)
+    os.utime(dst, (mtime, mtime))
+
+
+def _data_offset(fh: IO[bytes], info: zipfile.ZipInfo) -> int:
+    # local file header: 30 fixed bytes, then name and extra field
+    fh.seek(info.header_offset)
+    hdr = fh.read(30)
+    if len(hdr) != 30 or hdr[:4] != b"PK\x03\x04":
+        raise zipfile.BadZipFile(f"bad local header for {info.filename}")
+    name_len = int.from_bytes(hdr[26:28], "little")
+    extra_len = int.from_bytes(hdr[28:30], "little")
+    return info.header_offset + 30 + name_len + extra_len
+
+
+def _virtual_candidate(info: zipfile.ZipInfo) -> bool:
+    return (
+        info.compress_type == zipfile.ZIP_STORED
+        and not info.flag_bits & 0x1  # encrypted
+        and PurePosixPath(info.filename).suffix.lower() in VIRTUAL_EXTS
+    )
+
+
+def _chunks(items: list[zipfile.ZipInfo], n: int) -> Iterator[list[zipfile.ZipInfo]]:
+    # round-robin so large and small members spread across workers
+    for i in range(n):
+        chunk = items[i::n]
+        if chunk:
+            yield chunk
+
+
+def _unpack_zip(
+    archive: Path,
+    outdir: Path,
+    *,
+    everything: bool,
+    workers: int,
+    buffer_size: int,
+    virtual: bool = False,
+) -> tuple[int, int]:
+    with zipfile.ZipFile(archive) as zf:
+        infos = [i for i in zf.infolist() if not i.is_dir()]
+    todo: list[tuple[zipfile.ZipInfo, Path]] = []
+    kept: dict[str, tuple[int, int]] = {}
+    with archive.open("rb") as fh:
+        for info in infos:
+            dst = _member_path(outdir, info.filename)
+            if dst is None:
+                out(f"[unpack] skipped unsafe member: {info.filename}")
+            elif virtual and _virtual_candidate(info):
+                _placeholder(dst, info.file_size, time.mktime((*info.date_time, 0, 0, -1)))
+                kept[dst.relative_to(outdir).as_posix()] = (
+                    _data_offset(fh, info),
+                    info.file_size,
+                )
+            elif _wanted(info.filename, everything):
+                todo.append((info, dst))
+    if kept:
+        write_index(outdir, archive, kept)
+        out(f"[unpack] virtual: {len(kept)} stored member(s) read in place from the archive")
+    dests = {info.filename: dst for info, dst in todo}
+
+    def extract(chunk: list[zipfile.ZipInfo]) -> None:
+        # one ZipFile per worker: a shared handle serializes every read
+        with zipfile.ZipFile(archive) as zf:
+            for info in chunk:
+                mtime = time.mktime((*info.date_time, 0, 0, -1))
+                with zf.open(info) as fi:
+                    _stream(fi, dests[info.filename], buffer_size, mtime)
+
+    members = [info for info, _ in todo]
+    run_parallel(extract, list(_chunks(members, max(1, workers))), workers=workers)
+    return len(todo), len(infos) - len(todo) - len(kept)
+
+
+def _unpack_tar(
+    archive: Path, outdir: Path, *, everything: bool, buffer_size: int
+) -> tuple[int, int]:
+    # stream mode: one sequential pass, no random access into compressed data
+    done = skipped = 0
+    with tarfile.open(archive, mode="r|*", bufsize=buffer_size) as tf:
+        for member in tf:
+            if not member.isfile():
+                continue
+            dst = _member_path(outdir, member.name)
+            if dst is None:
+                out(f"[unpack] skipped unsafe member: {member.name}")
+                skipped += 1
+                continue
+            if not _wanted(member.name, everything):
+                skipped += 1
+                continue
+            fi = tf.extractfile(member)
+            if fi is None:
+                continue
+            with fi:
+                _stream(fi, dst, buffer_size, member.mtime)
+            done += 1
+    return done, skipped
+
+
+def _is_tar(archive: Path) -> bool:
+    return archive.name.lower().endswith(TAR_EXTS) and tarfile.is_tarfile(archive)
+
+
 def unpack(archive: Path, outdir: Path) -> None:
     ensure_dir(outdir)
     ext = archive.suffix.lower()
+    opts = state.OPTS if state.OPTS is not None else state.Opts()
+    everything = opts.stage_unpack == "all"
+    buffer_size = opts.stage_copy_buffer_kb * 1024
 
     if ext == ".zip":
-        _require_tool("unzip")
-        run_cmd(["unzip", "-q", "-o", str(archive), "-d", str(outdir)], check=True)
+        try:
+            done, skipped = _unpack_zip(
+                archive,
+                outdir,
+                everything=everything,
+                workers=opts.stage_copy_workers,
+                buffer_size=buffer_size,
+                virtual=opts.stage_virtual,
+            )
+        except (zipfile.BadZipFile, RuntimeError) as e:
+            # RuntimeError: encrypted members
+            die(f"Broken archive: {archive} ({e})")
+            return
+        out(f"[unpack] extracted {done} member(s), skipped {skipped}")
+        return
+
+    if ext in TAR_EXTS:
+        if not _is_tar(archive):
+            die(f"Unsupported archive: {archive}")
+        try:
+            done, skipped = _unpack_tar(
+                archive, outdir, everything=everything, buffer_size=buffer_size
+            )
+        except (tarfile.TarError, EOFError) as e:
+            die(f"Broken archive: {archive} ({e})")
+            return
+        out(f"[unpack] extracted {done} member(s), skipped {skipped}")
         return
 
     if ext == ".rar":
@@ -1,16 +1,62 @@
 from __future__ import annotations
 
 import json
+import os
 import shutil
 import subprocess
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
 from pathlib import Path
-from typing import cast
+from typing import Protocol, cast
+
+from mutagen import File as MutagenFile
 
 import audiomason.state as state
-from audiomason.util import die, ensure_dir, out, run_cmd
+from audiomason.loudnorm import LOUDNORM_DYNAMIC, loudnorm_filter, with_loudnorm
+from audiomason.mp4_chapters import read_mp4_chapters
+from audiomason.scheduler import TranscodeSchedule, plan_transcodes
+from audiomason.stat_cache import StatCache
+from audiomason.transcode_cache import TranscodeCache, file_sha256
+from audiomason.util import die, ensure_dir, out, run_cmd, run_parallel
+from audiomason.virtual_stage import input_arg, open_media
+
+# Per-process ffmpeg thread cap used when no explicit thread count is given.
+FFMPEG_DEFAULT_THREADS = 2
+
+# ffmpeg.keep_codec: codec -> container its audio stream is copied into.
+KEEP_CODEC_CONTAINERS = {"aac": ".m4b", "opus": ".ogg"}
+_CONTAINER_FORMATS = {".m4b": "mp4", ".ogg": "ogg"}
+# Suffixes of finished tracks in an output dir.
+TRACK_EXTS = {".mp3", *KEEP_CODEC_CONTAINERS.values()}
+
+# ffmpeg.split_mode / --split-mode values.
+SPLIT_MODES = ("auto", "single", "parallel")
+# split_mode=auto encodes chapters in parallel for sources at least this long.
+SPLIT_PARALLEL_MIN_SECONDS = 20 * 60
+
+# ffprobe results cache (<cache root>/probe). Bump the version whenever the
+# ffprobe command line below changes what an entry contains.
+PROBE_CACHE_VERSION = 1
+PROBE_CACHE_MAX_BYTES = 32 * 1024 * 1024
+_PROBE_CACHE: StatCache | None = None
+_TRANSCODE_CACHE: TranscodeCache | None = None
+
+
+def probe_cache() -> StatCache:
+    global _PROBE_CACHE
+    root = state.OPTS.cache_root if state.OPTS is not None else None
+    probe_root = root / "probe" if root is not None else None
+    if _PROBE_CACHE is None or _PROBE_CACHE.root != probe_root:
+        _PROBE_CACHE = StatCache(
+            probe_root, version=PROBE_CACHE_VERSION, max_bytes=PROBE_CACHE_MAX_BYTES
+        )
+    return _PROBE_CACHE
 
 
 def ffprobe_json(path: Path) -> dict[str, object]:
+    cached = probe_cache().get(path)
+    if cached is not None:
+        return cached
     if not shutil.which("ffprobe"):
         die("ffprobe not found (install ffmpeg package)")
     cmd = [
@@ -22,39 +68,137 @@ def ffprobe_json(path: Path) -> dict[str, object]:
         "-show_format",
         "-show_streams",
         "-show_chapters",
-        str(path),
+        input_arg(path),
     ]
     if state.OPTS is not None and state.OPTS.dry_run:
         out("[dry-run] " + " ".join(cmd))
         return {}
     p = run_cmd(cmd, check=True, stdout=subprocess.PIPE)
-    return cast(dict[str, object], json.loads(p.stdout or b"{}"))
+    data = cast(dict[str, object], json.loads(p.stdout or b"{}"))
+    probe_cache().put(path, data)
+    return data
 
 
-def m4a_chapters(path: Path) -> list[dict[str, object]]:
-    data = ffprobe_json(path)
-    ch_raw = data.get("chapters")
-    ch: list[dict[str, object]] = (
-        cast(list[dict[str, object]], ch_raw) if isinstance(ch_raw, list) else []
-    )
-    out(f"[chapters] {path.name}: {len(ch)} chapter(s)")
-    return ch
+class _MediaInfo(Protocol):
+    length: float
+
+
+class _Media(Protocol):
+    info: _MediaInfo
 
 
-def ffmpeg_common_input() -> list[str]:
-    import os
+def media_duration(path: Path) -> float | None:
+    """Duration in seconds (in-process header read, ffprobe as fallback)."""
+    try:
+        with open_media(path) as fh:
+            mf = cast(_Media | None, MutagenFile(fh))
+        if mf is not None and float(mf.info.length) > 0:
+            return float(mf.info.length)
+    except Exception:
+        pass
+    if state.OPTS is not None and state.OPTS.dry_run:
+        return None
+    try:
+        fmt = ffprobe_json(path).get("format")
+        if isinstance(fmt, dict):
+            d = float(str(cast(dict[str, object], fmt).get("duration")))
+            return d if d > 0 else None
+    except Exception:
+        pass
+    return None
+
+
+def _audio_codec(path: Path) -> tuple[str, int] | None:
+    """(codec, bits/s) of an m4a/opus source from its headers, for the keep_codec policy."""
+    try:
+        with open_media(path) as fh:
+            mf = cast(_Media | None, MutagenFile(fh))
+        if mf is None or float(mf.info.length) <= 0:
+            return None
+        length = float(mf.info.length)
+        codec = cast(object, getattr(mf.info, "codec", None))
+        rate = cast(object, getattr(mf.info, "bitrate", None))
+    except Exception:
+        return None
+    if path.suffix.lower() == ".opus":
+        name = "opus"
+    elif isinstance(codec, str) and codec.startswith("mp4a.40."):
+        name = "aac"
+    else:
+        return None
+    if not isinstance(rate, int) or rate <= 0:
+        rate = int(path.stat().st_size * 8 / length)
+    return name, rate
+
+
+def keep_codec_target(src: Path) -> str | None:
+    """Container suffix to stream-copy src into (ffmpeg.keep_codec), or None to encode mp3."""
+    opts = state.OPTS
+    if opts is None or not opts.keep_codec or opts.loudnorm:
+        # loudnorm is a filter: it needs a decode + encode
+        return None
+    info = _audio_codec(src)
+    if info is None:
+        return None
+    codec, rate = info
+    if codec not in opts.keep_codec or codec not in KEEP_CODEC_CONTAINERS:
+        return None
+    if rate < opts.keep_codec_min_kbps * 1000:
+        return None
+    return KEEP_CODEC_CONTAINERS[codec]
+
+
+def m4a_chapters(path: Path, *, log: Callable[[str], None] = out) -> list[dict[str, object]]:
+    # Parse chpl / QuickTime chapter tracks in-process; ffprobe only for files
+    # the native reader cannot make sense of.
+    native = read_mp4_chapters(path)
+    if native is not None:
+        ch = native
+    else:
+        data = ffprobe_json(path)
+        ch_raw = data.get("chapters")
+        ch = cast(list[dict[str, object]], ch_raw) if isinstance(ch_raw, list) else []
+    log(f"[chapters] {path.name}: {len(ch)} chapter(s)")
+    return ch
+
 
+def cpu_budget() -> int:
+    """Total cores AudioMason may keep busy (--cpu-cores / config cpu_cores)."""
     cores: int = os.cpu_count() or 1
     if state.OPTS is not None and state.OPTS.cpu_cores is not None:
         cores = state.OPTS.cpu_cores
-    threads = min(2, max(1, cores // 2))
+    return max(1, cores)
+
+
+def schedule_transcodes(files: list[Path], *, max_workers: int | None = None) -> TranscodeSchedule:
+    """Split the cpu_cores budget between processes and -threads for `files`."""
+    if state.OPTS is not None and state.OPTS.dry_run:
+        # dry-run only prints commands: keep it serial and skip probing
+        return TranscodeSchedule(
+            cores=cpu_budget(),
+            workers=1,
+            names=tuple(p.name for p in files),
+            threads=tuple(FFMPEG_DEFAULT_THREADS for _ in files),
+            durations=tuple(None for _ in files),
+        )
+    return plan_transcodes(
+        cpu_budget(),
+        [media_duration(p) for p in files],
+        names=[p.name for p in files],
+        max_workers=max_workers,
+    )
+
+
+def ffmpeg_common_input(threads: int | None = None, *, stats: bool = True) -> list[str]:
+    if threads is None:
+        threads = min(FFMPEG_DEFAULT_THREADS, max(1, cpu_budget() // 2))
     loglevel = "warning"
     if state.OPTS is not None:
         loglevel = state.OPTS.ff_loglevel
     return [
         "-hide_banner",
         "-nostdin",
-        "-stats",
+        "-stats" if stats else "-nostats",
         "-loglevel",
         loglevel,
         "-threads",
@@ -62,40 +206,188 @@ def ffmpeg_common_input() -> list[str]:
     ]
 
 
-def opus_to_mp3_single(src: Path, dst: Path) -> None:
+def _mp3_encode_args(opts: state.Opts) -> list[str]:
+    args: list[str] = []
+    if opts.loudnorm:
+        args += ["-af", LOUDNORM_DYNAMIC]
+    return args + ["-codec:a", "libmp3lame", "-q:a", opts.q_a]
+
+
+def transcode_cache() -> TranscodeCache | None:
+    """The shared transcode cache, or None when disabled or without a cache root."""
+    global _TRANSCODE_CACHE
+    opts = state.OPTS
+    if opts is None or not opts.transcode_cache or opts.cache_root is None:
+        return None
+    max_bytes = max(0, opts.transcode_cache_max_mb) * 1024 * 1024
+    if (
+        _TRANSCODE_CACHE is None
+        or _TRANSCODE_CACHE.root != opts.cache_root / "transcode"
+        or _TRANSCODE_CACHE.max_bytes != max_bytes
+    ):
+        _TRANSCODE_CACHE = TranscodeCache(opts.cache_root, max_bytes=max_bytes)
+    return _TRANSCODE_CACHE
+
+
+def _encode_cached(src: Path, dst: Path, cmd: list[str], enc: list[str]) -> bool:
+    # Run cmd unless an identical encode (same source bytes, same encoder
+    # arguments) is cached; returns True on a cache hit.
+    if LOUDNORM_DYNAMIC in enc:
+        flt = loudnorm_filter(src)
+        cmd, enc = with_loudnorm(cmd, flt), with_loudnorm(enc, flt)
+    cache = transcode_cache()
+    key = cache.key(src, enc) if cache is not None else None
+    if cache is not None and key is not None and cache.fetch(key, dst):
+        return True
+    run_cmd(cmd, check=True)
+    if cache is not None and key is not None:
+        cache.store(key, dst)
+    return False
+
+
+@dataclass(frozen=True)
+class EncodeTags:
+    """ID3 frames ffmpeg writes while encoding, as tags.write_tags/write_cover would.
+
+    With wipe, source metadata and chapters are dropped and ffmpeg adds no
+    encoder frame, so the file carries exactly these frames.
+    """
+
+    title: str
+    artist: str
+    album: str
+    track: int
+    genre: str
+    cover: Path | None = None  # jpeg/png, embedded as is (front cover, desc "Cover")
+    wipe: bool = False
+
+    def input_args(self) -> list[str]:
+        return ["-i", str(self.cover)] if self.cover is not None else []
+
+    def output_args(self) -> list[str]:
+        # replaces -vn: only the first audio stream and our cover are mapped
+        args = ["-map", "0:a:0"]
+        if self.cover is not None:
+            args += [
+                "-map",
+                "1:v:0",
+                "-c:v",
+                "copy",
+                "-disposition:v:0",
+                "attached_pic",
+                "-metadata:s:v:0",
+                "title=Cover",
+                "-metadata:s:v:0",
+                "comment=Cover (front)",
+            ]
+        if self.wipe:
+            args += ["-map_metadata", "-1", "-map_chapters", "-1", "-fflags", "+bitexact"]
+        for key, value in (
+            ("title", self.title),
+            ("artist", self.artist),
+            ("album", self.album),
+            ("track", str(self.track)),
+            ("genre", self.genre),
+        ):
+            args += ["-metadata", f"{key}={value}"]
+        return args + ["-id3v2_version", "4"]
+
+    def cache_args(self) -> list[str]:
+        # the transcode cache keys on arguments: name the cover by content
+        if self.cover is None:
+            return []
+        return [f"cover-sha256={file_sha256(self.cover)}"]
+
+
+def _encode_mp3(
+    src: Path, dst: Path, *, threads: int | None, stats: bool, tags: EncodeTags | None
+) -> bool:
     if not shutil.which("ffmpeg"):
         die("ffmpeg not installed")
     if state.OPTS is None:
-        return
-    cmd = ["ffmpeg"] + ffmpeg_common_input() + ["-y", "-i", str(src), "-vn"]
-    if state.OPTS.loudnorm:
-        cmd += ["-af", "loudnorm=I=-16:LRA=11:TP=-1.5"]
-    cmd += ["-codec:a", "libmp3lame", "-q:a", state.OPTS.q_a, str(dst)]
+        return False
+    enc = [*(tags.output_args() if tags is not None else ["-vn"]), *_mp3_encode_args(state.OPTS)]
+    cmd = ["ffmpeg"] + ffmpeg_common_input(threads, stats=stats) + ["-y", "-i", input_arg(src)]
+    if tags is not None:
+        cmd += tags.input_args()
+    cmd += enc + [str(dst)]
     if state.OPTS.dry_run:
         out("[dry-run] " + " ".join(cmd))
-        return
-    run_cmd(cmd, check=True)
-
-
-def m4a_to_mp3_single(src: Path, dst: Path) -> None:
+        return False
+    if tags is not None:
+        enc += tags.cache_args()
+    return _encode_cached(src, dst, cmd, enc)
+
+
+def opus_to_mp3_single(
+    src: Path,
+    dst: Path,
+    *,
+    threads: int | None = None,
+    stats: bool = True,
+    tags: EncodeTags | None = None,
+) -> bool:
+    return _encode_mp3(src, dst, threads=threads, stats=stats, tags=tags)
+
+
+def m4a_to_mp3_single(
+    src: Path,
+    dst: Path,
+    *,
+    threads: int | None = None,
+    stats: bool = True,
+    tags: EncodeTags | None = None,
+) -> bool:
+    return _encode_mp3(src, dst, threads=threads, stats=stats, tags=tags)
+
+
+def _copy_args(dst_suffix: str) -> list[str]:
+    args = ["-c:a", "copy", "-f", _CONTAINER_FORMATS[dst_suffix]]
+    if dst_suffix == ".m4b":
+        args += ["-movflags", "+faststart"]
+    return args
+
+
+def remux_single(
+    src: Path,
+    dst: Path,
+    *,
+    threads: int | None = None,
+    stats: bool = True,
+    tags: EncodeTags | None = None,
+) -> bool:
+    """Stream-copy the first audio stream of src into dst's container (no re-encode).
+
+    m4b/ogg tracks are tagged by mutagen afterwards; tags is ignored.
+    """
     if not shutil.which("ffmpeg"):
         die("ffmpeg not installed")
     if state.OPTS is None:
-        return
-    cmd = ["ffmpeg"] + ffmpeg_common_input() + ["-y", "-i", str(src), "-vn"]
-    if state.OPTS.loudnorm:
-        cmd += ["-af", "loudnorm=I=-16:LRA=11:TP=-1.5"]
-    cmd += ["-codec:a", "libmp3lame", "-q:a", state.OPTS.q_a, str(dst)]
+        return False
+    cmd = ["ffmpeg"] + ffmpeg_common_input(threads, stats=stats)
+    cmd += ["-y", "-i", input_arg(src), "-vn", "-map", "0:a:0", *_copy_args(dst.suffix), str(dst)]
     if state.OPTS.dry_run:
         out("[dry-run] " + " ".join(cmd))
-        return
+        return False
     run_cmd(cmd, check=True)
+    return False
 
 
-def m4a_split_by_chapters(src: Path, outdir: Path) -> list[Path]:
-    ch = m4a_chapters(src)
+@dataclass(frozen=True)
+class _SplitPlan:
+    """ffmpeg commands producing `produced`; more than one command => per-chapter mode."""
+
+    src: Path
+    cmds: list[list[str]]
+    produced: list[Path]
+    workers: int = 1
+
+
+def _chapter_times(src: Path, log: Callable[[str], None]) -> list[tuple[float, float]] | None:
+    # Probe + validate chapters: at least two, ordered and non-overlapping.
+    ch = m4a_chapters(src, log=log)
     if not ch or len(ch) < 2:
-        return []
+        return None
 
     times: list[tuple[float, float]] = []
     for c in ch:
@@ -103,44 +395,130 @@ def m4a_split_by_chapters(src: Path, outdir: Path) -> list[Path]:
             st = float(str(c["start_time"]))
             et = float(str(c["end_time"]))
         except Exception:
-            return []
+            return None
         if et <= st:
-            return []
+            return None
         times.append((st, et))
 
     for i in range(1, len(times)):
         if times[i][0] < times[i - 1][1]:
-            return []
+            return None
+    return times
+
+
+def split_mode(total: float, cores: int) -> str:
+    """Resolve --split-mode: 'single' (one segment encode) or 'parallel' (one per chapter)."""
+    mode = state.OPTS.split_mode if state.OPTS is not None else "auto"
+    if mode in ("single", "parallel"):
+        return mode
+    # libmp3lame is single-threaded, so a single-pass split of a long book
+    # leaves the other cores idle; short files are not worth N ffmpeg startups.
+    if cores >= 2 and total >= SPLIT_PARALLEL_MIN_SECONDS:
+        return "parallel"
+    return "single"
 
+
+# (chapter times, total seconds, split points) of a chapter split
+_Layout = tuple[list[tuple[float, float]], float, list[float]]
+
+
+def _split_layout(src: Path, *, log: Callable[[str], None] = out) -> _Layout | None:
+    """(chapter times, total seconds, split points) when src splits by chapters."""
+    times = _chapter_times(src, log)
+    if times is None:
+        return None
     start0 = times[0][0]
-    ends = [et for _, et in times]
-    total = ends[-1] - start0
+    total = times[-1][1] - start0
     if total <= 0:
-        return []
-
+        return None
     split_points: list[float] = []
-    for e in ends[:-1]:
+    for _, e in times[:-1]:
         t = e - start0
         if t <= 0:
-            return []
+            return None
         split_points.append(t)
+    return times, total, split_points
+
+
+def split_outputs(src: Path, dst: Path) -> list[Path] | None:
+    """Tracks convert_m4a_in_place splits src into instead of dst; None if src stays whole."""
+    if src.suffix != ".m4a" or state.OPTS is None or not state.OPTS.split_chapters:
+        return None
+    layout = _split_layout(src)
+    if layout is None:
+        return None
+    return [dst.parent / f"{i:02d}{dst.suffix}" for i in range(1, len(layout[0]) + 1)]
+
+
+def _split_plan(
+    src: Path,
+    outdir: Path,
+    layout: _Layout,
+    *,
+    threads: int | None = None,
+    stats: bool = True,
+    cores: int = 1,
+    keep: str | None = None,
+    log: Callable[[str], None] = out,
+) -> _SplitPlan | None:
+    # `cores` is the share of the budget this split may use in parallel mode.
+    # `keep` is a keep_codec container suffix: stream-copy instead of encoding.
+    times, total, split_points = layout
+    start0 = times[0][0]
+    ends = [et for _, et in times]
+
+    # a stream copy is I/O bound; one pass is always enough
+    mode = "single" if keep is not None else split_mode(total, cores)
+    ext = keep or ".mp3"
 
     ensure_dir(outdir)
-    out(f"[split] splitting by chapters: {len(times)} tracks (single-pass)")
+    if mode == "parallel":
+        workers = max(1, min(cores, len(times)))
+        log(f"[split] splitting by chapters: {len(times)} tracks (parallel, {workers} worker(s))")
+    else:
+        log(f"[split] splitting by chapters: {len(times)} tracks (single-pass)")
 
     if state.OPTS is None:
-        return []
+        return None
+
+    produced = [outdir / f"{i:02d}{ext}" for i in range(1, len(times) + 1)]
+
+    if mode == "parallel":
+        # Same boundaries as the segment muxer: track N runs from the end of
+        # chapter N-1 (or the first start) to the end of chapter N. -ss before
+        # -i is frame-accurate when transcoding.
+        starts = [start0, *ends[:-1]]
+        cmds = [
+            ["ffmpeg"]
+            + ffmpeg_common_input(1, stats=False)
+            + [
+                "-y",
+                "-ss",
+                str(st),
+                "-i",
+                input_arg(src),
+                "-vn",
+                "-t",
+                str(et - st),
+                "-map",
+                "0:a:0",
+            ]
+            + _mp3_encode_args(state.OPTS)
+            + [str(dst)]
+            for st, et, dst in zip(starts, ends, produced, strict=True)
+        ]
+        return _SplitPlan(src, cmds, produced, workers=workers)
 
-    dst_pat = outdir / "%02d.mp3"
+    dst_pat = outdir / f"%02d{ext}"
     cmd = (
         ["ffmpeg"]
-        + ffmpeg_common_input()
+        + ffmpeg_common_input(threads, stats=stats)
         + [
             "-y",
             "-ss",
             str(start0),
             "-i",
-            str(src),
+            input_arg(src),
             "-vn",
             "-t",
             str(total),
@@ -148,13 +526,11 @@ def m4a_split_by_chapters(src: Path, outdir: Path) -> list[Path]:
             "0:a:0",
         ]
     )
-    if state.OPTS.loudnorm:
-        cmd += ["-af", "loudnorm=I=-16:LRA=11:TP=-1.5"]
+    if keep is not None:
+        cmd += ["-c:a", "copy", "-segment_format", _CONTAINER_FORMATS[keep]]
+    else:
+        cmd += _mp3_encode_args(state.OPTS)
     cmd += [
-        "-codec:a",
-        "libmp3lame",
-        "-q:a",
-        state.OPTS.q_a,
         "-f",
         "segment",
         "-segment_times",
@@ -165,15 +541,35 @@ def m4a_split_by_chapters(src: Path, outdir: Path) -> list[Path]:
         "1",
         str(dst_pat),
     ]
+    return _SplitPlan(src, [cmd], produced)
 
-    produced = [outdir / f"{i:02d}.mp3" for i in range(1, len(times) + 1)]
 
-    if state.OPTS.dry_run:
-        out("[dry-run] " + " ".join(cmd))
-        return produced
+def _run_split(plan: _SplitPlan) -> list[Path]:
+    if state.OPTS is not None and state.OPTS.dry_run:
+        for cmd in plan.cmds:
+            out("[dry-run] " + " ".join(cmd))
+        return plan.produced
+
+    cmds = plan.cmds
+    if any(LOUDNORM_DYNAMIC in cmd for cmd in cmds):
+        # measured once per source, shared by every chapter
+        flt = loudnorm_filter(plan.src)
+        cmds = [with_loudnorm(cmd, flt) for cmd in cmds]
+    try:
+        run_parallel(lambda cmd: run_cmd(cmd, check=True), cmds, workers=plan.workers)
+    except Exception:
+        for p in plan.produced:
+            p.unlink(missing_ok=True)
+        raise
+    return [p for p in plan.produced if p.exists() and p.stat().st_size > 0]
 
-    run_cmd(cmd, check=True)
-    return [p for p in produced if p.exists() and p.stat().st_size > 0]
+
+def m4a_split_by_chapters(src: Path, outdir: Path) -> list[Path]:
+    layout = _split_layout(src)
+    plan = None if layout is None else _split_plan(src, outdir, layout, cores=cpu_budget())
+    if plan is None:
+        return []
+    return _run_split(plan)
 
 
 def _sort_key(p: Path) -> str:
@@ -186,41 +582,210 @@ def _sorted_audio_files(stage: Path, ext: str, recursive: bool) -> list[Path]:
     return sorted(files, key=_sort_key)
 
 
-def convert_opus_in_place(stage: Path, recursive: bool = True) -> None:
+# A transcode job runs one ffmpeg invocation and returns the lines to log afterwards.
+_Job = Callable[[], list[str]]
+
+
+class _Converter(Protocol):
+    def __call__(
+        self,
+        src: Path,
+        dst: Path,
+        *,
+        threads: int | None = None,
+        stats: bool = True,
+        tags: EncodeTags | None = None,
+    ) -> bool: ...
+
+
+def _single_job(
+    convert: _Converter,
+    src: Path,
+    dst: Path,
+    *,
+    threads: int,
+    stats: bool,
+    tags: EncodeTags | None = None,
+) -> _Job:
+    def job() -> list[str]:
+        try:
+            cached = convert(src, dst, threads=threads, stats=stats, tags=tags)
+        except Exception:
+            # never leave a truncated mp3 behind (it would satisfy "skip (mp3 exists)")
+            dst.unlink(missing_ok=True)
+            raise
+        return [f"[convert] cache hit: {dst.name}"] if cached else []
+
+    return job
+
+
+def _split_job(plan: _SplitPlan, fallback: _Job) -> _Job:
+    def job() -> list[str]:
+        done = _run_split(plan)
+        ext = plan.produced[0].suffix[1:]
+        if done:
+            return [f"[convert] split produced {len(done)} {ext}"]
+        return [f"[convert] no chapters split -> single {ext}", *fallback()]
+
+    return job
+
+
+# The lines logged while planning one source, and its job (None: skipped).
+_Step = tuple[list[str], _Job | None]
+
+
+def _run_jobs(steps: list[_Step], workers: int) -> None:
+    # Each job's lines follow its planning lines, in source order, whether
+    # the jobs run one by one or in parallel.
+    if workers <= 1:
+        for lines, job in steps:
+            for line in lines:
+                out(line)
+            if job is not None:
+                for line in job():
+                    out(line)
+        return
+
+    jobs = [job for _, job in steps if job is not None]
+    out(f"[convert] running {len(jobs)} job(s) on {workers} worker(s)")
+    results = iter(run_parallel(lambda job: job(), jobs, workers=workers))
+    for lines, job in steps:
+        if job is not None:
+            lines = [*lines, *next(results)]
+        for line in lines:
+            out(line)
+
+
+def _output_path(src: Path, outdir: Path | None, suffix: str) -> Path:
+    return (outdir if outdir is not None else src.parent) / f"{src.stem}{suffix}"
+
+
+def convert_opus_in_place(
+    stage: Path,
+    recursive: bool = True,
+    *,
+    outdir: Path | None = None,
+    tags: Mapping[Path, EncodeTags] | None = None,
+) -> TranscodeSchedule | None:
+    """Encode the opus files under stage; results go next to them, or into outdir.
+
+    tags: frames to write while encoding, by output path.
+    """
     opuses = _sorted_audio_files(stage, "opus", recursive)
     if not opuses:
-        return
+        return None
 
     out(f"[convert] found {len(opuses)} opus")
 
+    todo: list[tuple[list[str], tuple[Path, Path, _Converter] | None]] = []
     for idx, src in enumerate(opuses, 1):
-        out(f"[convert] {idx}/{len(opuses)} {src.name}")
+        lines = [f"[convert] {idx}/{len(opuses)} {src.name}"]
 
-        dst = src.with_suffix(".mp3")
+        keep = keep_codec_target(src)
+        dst = _output_path(src, outdir, keep or ".mp3")
         if dst.exists() and dst.stat().st_size > 0:
-            out(f"[convert] skip (mp3 exists): {dst.name}")
+            lines.append(f"[convert] skip ({dst.suffix[1:]} exists): {dst.name}")
+            todo.append((lines, None))
             continue
 
-        out("[convert] opus -> mp3")
-        opus_to_mp3_single(src, dst)
-
-
-def convert_m4a_in_place(stage: Path, recursive: bool = True) -> None:
+        if keep is not None:
+            lines.append(f"[convert] opus -> {keep[1:]} (stream copy)")
+            todo.append((lines, (src, dst, remux_single)))
+        else:
+            lines.append("[convert] opus -> mp3")
+            todo.append((lines, (src, dst, opus_to_mp3_single)))
+
+    work = [w for _, w in todo if w is not None]
+    # same-named sources from different subdirs meet in outdir: keep them serial
+    serial = len({dst for _, dst, _ in work}) < len(work)
+    sched = schedule_transcodes([src for src, _, _ in work], max_workers=1 if serial else None)
+    workers = sched.workers
+    stats = workers <= 1
+    threads = iter(sched.threads)
+    steps: list[_Step] = []
+    for lines, w in todo:
+        if w is None:
+            steps.append((lines, None))
+            continue
+        src, dst, convert = w
+        job = _single_job(
+            convert, src, dst, threads=next(threads), stats=stats, tags=(tags or {}).get(dst)
+        )
+        steps.append((lines, job))
+    _run_jobs(steps, workers)
+    return sched
+
+
+def convert_m4a_in_place(
+    stage: Path,
+    recursive: bool = True,
+    *,
+    outdir: Path | None = None,
+    tags: Mapping[Path, EncodeTags] | None = None,
+) -> TranscodeSchedule | None:
+    """Encode/split the m4a files under stage; results go next to them, or into outdir.
+
+    tags: frames to write while encoding, by output path (chapter splits are
+    tagged afterwards).
+    """
     m4as = _sorted_audio_files(stage, "m4a", recursive)
     if not m4as:
-        return
+        return None
 
     out(f"[convert] found {len(m4as)} m4a")
 
+    # Jobs writing the same NN.mp3 names must stay serial so the last one
+    # wins deterministically, as before: decided up front so the schedule
+    # (threads, stats, split share) is the one that runs. Each source is
+    # probed once here; the jobs below reuse keep/dst/layout.
+    split = state.OPTS is not None and state.OPTS.split_chapters
+    claimed: set[Path] = set()
+    serial = False
+    prepared: list[tuple[list[str], str | None, Path, _Layout | None]] = []
     for idx, src in enumerate(m4as, 1):
-        out(f"[convert] {idx}/{len(m4as)} {src.name}")
-
-        if state.OPTS is not None and state.OPTS.split_chapters:
-            produced = m4a_split_by_chapters(src, src.parent)
-            if produced:
-                out(f"[convert] split produced {len(produced)} mp3")
+        lines = [f"[convert] {idx}/{len(m4as)} {src.name}"]
+        keep = keep_codec_target(src)
+        dst = _output_path(src, outdir, keep or ".mp3")
+        layout = _split_layout(src, log=lines.append) if split else None
+        prepared.append((lines, keep, dst, layout))
+        writes = {dst}
+        if layout is not None:
+            writes.update(
+                dst.parent / f"{i:02d}{keep or '.mp3'}" for i in range(1, len(layout[0]) + 1)
+            )
+        serial = serial or bool(claimed & writes)
+        claimed |= writes
+
+    sched = schedule_transcodes(m4as, max_workers=1 if serial else None)
+    workers = sched.workers
+    stats = workers <= 1
+    # a per-chapter split fans out over this file's share of the core budget
+    share = max(1, sched.cores // workers)
+    steps: list[_Step] = []
+    for src, threads, (lines, keep, dst, layout) in zip(m4as, sched.threads, prepared, strict=True):
+        convert: _Converter = remux_single if keep is not None else m4a_to_mp3_single
+        if keep is not None:
+            lines.append(f"[convert] m4a -> {keep[1:]} (stream copy)")
+        single = _single_job(
+            convert, src, dst, threads=threads, stats=stats, tags=(tags or {}).get(dst)
+        )
+        if layout is not None:
+            plan = _split_plan(
+                src,
+                dst.parent,
+                layout,
+                threads=threads,
+                stats=stats,
+                cores=share,
+                keep=keep,
+                log=lines.append,
+            )
+            if plan is not None:
+                steps.append((lines, _split_job(plan, fallback=single)))
                 continue
 
-        dst = src.with_suffix(".mp3")
-        out("[convert] no chapters split -> single mp3")
-        m4a_to_mp3_single(src, dst)
+        lines.append(f"[convert] no chapters split -> single {dst.suffix[1:]}")
+        steps.append((lines, single))
+
+    _run_jobs(steps, workers)
+    return sched
@@ -9,9 +9,17 @@ from typing import cast
 import yaml
 
 import audiomason.state as state
+from audiomason.audio import KEEP_CODEC_CONTAINERS, SPLIT_MODES
 from audiomason.config import DEFAULTS, load_config, user_config_path, validate_prompts_disable
+from audiomason.filecopy import STRATEGIES as STAGE_COPY_STRATEGIES
 from audiomason.import_flow import run_import
-from audiomason.paths import get_output_root, validate_paths_contract
+from audiomason.loudnorm import LOUDNORM_MODES
+from audiomason.paths import (
+    get_cache_root,
+    get_output_root,
+    get_stage_root,
+    validate_paths_contract,
+)
 from audiomason.preflight_resolve import resolve_bool_config
 from audiomason.state import Opts
 from audiomason.util import AmAbortError, AmConfigError, AmExitError, ensure_dir, out
@@ -86,10 +94,24 @@ def _parent_parser() -> argparse.ArgumentParser:
     )
 
     pp.add_argument("--loudnorm", action="store_true", default=None)
+    _loudnorm_mode_choices: list[str] = list(LOUDNORM_MODES)
+    pp.add_argument(
+        "--loudnorm-mode",
+        choices=_loudnorm_mode_choices,
+        default=None,
+        help="dynamic single pass, or measure once then encode linearly (two-pass)",
+    )
     pp.add_argument("--q-a", default=None, help="lame VBR quality (2=high)")
 
     pp.add_argument("--split-chapters", dest="split_chapters", action="store_true", default=None)
     pp.add_argument("--no-split-chapters", dest="split_chapters", action="store_false")
+    _split_mode_choices: list[str] = list(SPLIT_MODES)
+    pp.add_argument(
+        "--split-mode",
+        choices=_split_mode_choices,
+        default=None,
+        help="chapter split: one segment encode or one ffmpeg per chapter (default auto)",
+    )
 
     pp.add_argument(
         "--cpu-cores", type=int, default=None, help="override CPU core count for perf tuning"
@@ -161,6 +183,11 @@ def _parse_args() -> argparse.Namespace:
 
     v = sub.add_parser("verify", help="verify audiobook library", parents=[parent])
     v.add_argument("root", nargs="?", type=Path, default=None)
+    v.add_argument(
+        "--rehash",
+        action="store_true",
+        help="re-read every file and compare SHA-256 digests (default: size/mtime only)",
+    )
 
     i = sub.add_parser("inspect", help="read-only source inspection", parents=[parent])
     i.add_argument("path", type=Path)
@@ -173,6 +200,13 @@ def _parse_args() -> argparse.Namespace:
         "--max-mb", type=int, default=None, help="keep cache size under M megabytes (prune oldest)"
     )
 
+    st = sub.add_parser("status", help="show stage runs from the run index", parents=[parent])
+    st.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="rebuild the run index from the stage manifests first",
+    )
+
     sub.add_parser("init", help="interactive config wizard", parents=[parent])
 
     ns = ap.parse_args()
@@ -216,8 +250,8 @@ def _cmd_requires_config(ns: argparse.Namespace) -> bool:
         root_val = cast(object, getattr(ns, "root", None))
         verify_root_val = cast(object, getattr(ns, "verify_root", None))
         return not bool(root_val or verify_root_val)
-    # cache and import require config
-    if cast(str, ns.cmd) in ("import", "cache"):
+    # cache, status and import require config
+    if cast(str, ns.cmd) in ("import", "cache", "status"):
         return True
     # default safe stance: require config
     return True
@@ -248,12 +282,30 @@ def _apply_config_defaults(ns: argparse.Namespace, cfg: dict[str, object]) -> No
     if cast(object, getattr(ns, "loudnorm", None)) is None:
         ns.loudnorm = bool(ffmpeg.get("loudnorm", False))
 
+    if cast(object, getattr(ns, "loudnorm_mode", None)) is None:
+        loudnorm_mode = str(ffmpeg.get("loudnorm_mode", "dynamic"))
+        if loudnorm_mode not in LOUDNORM_MODES:
+            raise AmConfigError(
+                f"Invalid config: ffmpeg.loudnorm_mode must be {'|'.join(LOUDNORM_MODES)},"
+                f" got: {loudnorm_mode!r}"
+            )
+        ns.loudnorm_mode = loudnorm_mode
+
     if cast(object, getattr(ns, "q_a", None)) is None:
         ns.q_a = str(ffmpeg.get("q_a", "2"))
 
     if cast(object, getattr(ns, "split_chapters", None)) is None:
         ns.split_chapters = bool(cfg.get("split_chapters", True))
 
+    if cast(object, getattr(ns, "split_mode", None)) is None:
+        split_mode = str(ffmpeg.get("split_mode", "auto"))
+        if split_mode not in SPLIT_MODES:
+            raise AmConfigError(
+                f"Invalid config: ffmpeg.split_mode must be {'|'.join(SPLIT_MODES)},"
+                f" got: {split_mode!r}"
+            )
+        ns.split_mode = split_mode
+
     if cast(object, getattr(ns, "cpu_cores", None)) is None:
         ns.cpu_cores = cfg.get("cpu_cores")
 
@@ -261,6 +313,88 @@ def _apply_config_defaults(ns: argparse.Namespace, cfg: dict[str, object]) -> No
         ns.ff_loglevel = str(ffmpeg.get("loglevel", "warning"))
 
 
+def _apply_cache_config(opts: Opts, cfg: dict[str, object]) -> None:
+    ffmpeg = _as_dict(cfg.get("ffmpeg"))
+    opts.cache_root = get_cache_root(cfg)
+    enabled = ffmpeg.get("transcode_cache", False)
+    if not isinstance(enabled, bool):
+        raise AmConfigError("Invalid config: ffmpeg.transcode_cache must be true|false")
+    opts.transcode_cache = enabled
+    max_mb = ffmpeg.get("transcode_cache_max_mb")
+    if max_mb is not None:
+        if not isinstance(max_mb, int) or isinstance(max_mb, bool) or max_mb < 1:
+            raise AmConfigError(
+                "Invalid config: ffmpeg.transcode_cache_max_mb must be a positive integer"
+            )
+        opts.transcode_cache_max_mb = max_mb
+
+
+def _apply_keep_codec_config(opts: Opts, cfg: dict[str, object]) -> None:
+    ffmpeg = _as_dict(cfg.get("ffmpeg"))
+    raw = ffmpeg.get("keep_codec")
+    if isinstance(raw, str):
+        raw = [raw]
+    if isinstance(raw, list):
+        codecs = [str(c).strip().lower() for c in cast(list[object], raw)]
+        unknown = [c for c in codecs if c not in KEEP_CODEC_CONTAINERS]
+        if unknown:
+            raise AmConfigError(
+                f"Invalid config: ffmpeg.keep_codec supports {sorted(KEEP_CODEC_CONTAINERS)},"
+                f" got: {unknown}"
+            )
+        opts.keep_codec = tuple(codecs)
+    min_kbps = ffmpeg.get("keep_codec_min_kbps")
+    if min_kbps is not None:
+        if not isinstance(min_kbps, int) or isinstance(min_kbps, bool) or min_kbps < 0:
+            raise AmConfigError(
+                "Invalid config: ffmpeg.keep_codec_min_kbps must be a non-negative integer"
+            )
+        opts.keep_codec_min_kbps = min_kbps
+
+
+def _apply_stage_config(opts: Opts, cfg: dict[str, object]) -> None:
+    stage = _as_dict(cfg.get("stage"))
+    strategy = str(stage.get("copy", "auto"))
+    if strategy != "auto" and strategy not in STAGE_COPY_STRATEGIES:
+        raise AmConfigError(
+            "Invalid config: stage.copy must be one of"
+            f" auto|{'|'.join(STAGE_COPY_STRATEGIES)}, got: {strategy!r}"
+        )
+    opts.stage_copy = strategy
+    unpack = str(stage.get("unpack", "media"))
+    if unpack not in ("media", "all"):
+        raise AmConfigError(f"Invalid config: stage.unpack must be media|all, got: {unpack!r}")
+    opts.stage_unpack = unpack
+    virtual = stage.get("virtual", False)
+    if not isinstance(virtual, bool):
+        raise AmConfigError("Invalid config: stage.virtual must be true|false")
+    opts.stage_virtual = virtual
+    for key, attr in (
+        ("copy_workers", "stage_copy_workers"),
+        ("copy_buffer_kb", "stage_copy_buffer_kb"),
+    ):
+        value = stage.get(key)
+        if value is None:
+            continue
+        if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+            raise AmConfigError(f"Invalid config: stage.{key} must be a positive integer")
+        setattr(opts, attr, value)
+
+
+def _apply_tags_config(opts: Opts, cfg: dict[str, object]) -> None:
+    tags = _as_dict(cfg.get("tags"))
+    workers = tags.get("workers")
+    if workers is not None:
+        if not isinstance(workers, int) or isinstance(workers, bool) or workers < 1:
+            raise AmConfigError("Invalid config: tags.workers must be a positive integer")
+        opts.tag_workers = workers
+    padding = tags.get("padding_kb")
+    if padding is not None:
+        if not isinstance(padding, int) or isinstance(padding, bool) or padding < 0:
+            raise AmConfigError("Invalid config: tags.padding_kb must be a non-negative integer")
+        opts.tag_padding_kb = padding
+
+
 def _argv_config_path() -> Path | None:
     _argv = list(sys.argv[1:])
     for _i, _a in enumerate(_argv):
@@ -279,10 +413,14 @@ def _apply_builtin_defaults(ns: argparse.Namespace) -> None:
         ns.clean_inbox = "no"
     if cast(object, getattr(ns, "loudnorm", None)) is None:
         ns.loudnorm = False
+    if cast(object, getattr(ns, "loudnorm_mode", None)) is None:
+        ns.loudnorm_mode = "dynamic"
     if cast(object, getattr(ns, "q_a", None)) is None:
         ns.q_a = "2"
     if cast(object, getattr(ns, "split_chapters", None)) is None:
         ns.split_chapters = True
+    if cast(object, getattr(ns, "split_mode", None)) is None:
+        ns.split_mode = "auto"
     if cast(object, getattr(ns, "ff_loglevel", None)) is None:
         ns.ff_loglevel = "warning"
 
@@ -426,6 +564,7 @@ def _ns_to_opts(ns: argparse.Namespace) -> Opts:
         publish=publish,
         wipe_id3=cast(bool | None, ns.wipe_id3),
         loudnorm=cast(bool, ns.loudnorm),
+        loudnorm_mode=cast(str, getattr(ns, "loudnorm_mode", "dynamic")),
         q_a=cast(str, ns.q_a),
         verify=cast(bool, ns.verify),
         verify_root=cast(Path, ns.verify_root),
@@ -433,6 +572,7 @@ def _ns_to_opts(ns: argparse.Namespace) -> Opts:
         cleanup_stage=True,
         clean_inbox_mode=cast(str, getattr(ns, "clean_inbox", "no")),
         split_chapters=cast(bool, ns.split_chapters),
+        split_mode=cast(str, getattr(ns, "split_mode", "auto")),
         ff_loglevel=cast(str, ns.ff_loglevel),
         cpu_cores=cast(int | None, getattr(ns, "cpu_cores", None)),
         json=cast(bool, getattr(ns, "json", False)),
@@ -513,6 +653,11 @@ def main() -> int:
             ns.ai_lookup = bool(_ai_effective)
 
             state.OPTS = _ns_to_opts(ns)
+            if cfg is not None:
+                _apply_cache_config(state.OPTS, cfg)
+                _apply_keep_codec_config(state.OPTS, cfg)
+                _apply_stage_config(state.OPTS, cfg)
+                _apply_tags_config(state.OPTS, cfg)
 
             if state.DEBUG:
                 if cfg is not None:
@@ -532,7 +677,7 @@ def main() -> int:
 
             if cast(str, ns.cmd) == "verify" and cfg is None:
                 root = cast(Path | None, getattr(ns, "root", None)) or state.OPTS.verify_root
-                verify_library(root, None)
+                verify_library(root, None, rehash=cast(bool, getattr(ns, "rehash", False)))
                 return 0
 
             # From here on, commands are config-dependent.
@@ -581,7 +726,7 @@ def main() -> int:
 
             if cast(str, ns.cmd) == "verify":
                 root = cast(Path | None, getattr(ns, "root", None)) or state.OPTS.verify_root
-                verify_library(root, cfg)
+                verify_library(root, cfg, rehash=cast(bool, getattr(ns, "rehash", False)))
                 return 0
 
             if cast(str, ns.cmd) == "cache":
@@ -599,6 +744,15 @@ def main() -> int:
                 out("[error] unknown cache subcommand")
                 return 2
 
+            if cast(str, ns.cmd) == "status":
+                from audiomason.run_index import show_status
+
+                return show_status(
+                    get_stage_root(cfg),
+                    rebuild=cast(bool, getattr(ns, "rebuild", False)),
+                    as_json=bool(state.OPTS.json),
+                )
+
             # Issue #74: resolve processing_log (CLI overrides config)
             _pl_cfg = _as_dict(cfg.get("processing_log"))
             _pl_enabled = bool(_pl_cfg.get("enabled", False))
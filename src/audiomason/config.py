@@ -55,10 +55,27 @@ DEFAULTS: dict[str, object] = {
         "cache": "memory",
         "cache_dir": None,
     },
+    "stage": {
+        "copy": "auto",
+        "copy_workers": 4,
+        "copy_buffer_kb": 1024,
+        "unpack": "media",
+        "virtual": False,
+    },
+    "tags": {
+        "workers": 4,
+        "padding_kb": 64,
+    },
     "ffmpeg": {
         "loglevel": "warning",
         "loudnorm": False,
+        "loudnorm_mode": "dynamic",
         "q_a": "2",
+        "split_mode": "auto",
+        "transcode_cache": False,
+        "transcode_cache_max_mb": 4096,
+        "keep_codec": [],
+        "keep_codec_min_kbps": 64,
     },
 }
 
@@ -12,12 +12,23 @@ from mutagen.id3._util import ID3NoHeaderError
 
 import audiomason.state as state
 from audiomason.paths import COVER_NAME, get_cache_root
+from audiomason.stage_index import INDEX as STAGE_INDEX
+from audiomason.tags import planned_cover, read_native_cover
 from audiomason.util import die, ensure_dir, is_url, out, prompt, run_cmd
+from audiomason.virtual_stage import input_arg, open_media
 
 
 def extract_embedded_cover_from_mp3(mp3: Path) -> tuple[bytes, str] | None:
+    # a pending tag plan decides what the file will carry
+    known, planned = planned_cover(mp3)
+    if known:
+        return planned
+    if mp3.suffix.lower() != ".mp3":
+        # stream-copied m4b/ogg track (ffmpeg.keep_codec)
+        return read_native_cover(mp3)
     try:
-        id3 = ID3(mp3)  # type: ignore[no-untyped-call]
+        with open_media(mp3) as fh:
+            id3 = ID3(fh)  # type: ignore[no-untyped-call]
     except ID3NoHeaderError:
         return None
     for tag in id3.values():  # type: ignore[no-untyped-call, misc]
@@ -127,9 +138,9 @@ def cover_from_input(cfg: Mapping[str, object], raw: str) -> Path | None:
 
 def find_file_cover(stage_root: Path, group_root: Path) -> Path | None:
     for ext in [".avif", ".jpg", ".jpeg", ".png", ".webp"]:
-        for cand in [group_root / f"cover{ext}", stage_root / f"cover{ext}"]:
-            if cand.exists() and cand.is_file():
-                return cand
+        for d in [group_root, stage_root]:
+            if STAGE_INDEX.has_file(d, f"cover{ext}"):
+                return d / f"cover{ext}"
     return None
 
 
@@ -145,7 +156,7 @@ def extract_cover_from_m4a(m4a: Path, bookdir: Path) -> tuple[bytes, str] | None
         "error",
         "-y",
         "-i",
-        str(m4a),
+        input_arg(m4a),
         "-an",
         "-map",
         "0:v:0",
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import errno
+import os
+import shutil
+import stat
+import sys
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from audiomason.util import run_parallel
+
+# File copy strategies, cheapest first:
+#   reflink          FICLONE: shares extents on CoW filesystems (btrfs, XFS)
+#   hardlink         same inode; only for read-only sources on the same device
+#   copy_file_range  in-kernel copy (server-side on NFS 4.2 / SMB3)
+#   copy             plain userspace copy
+STRATEGIES = ("reflink", "hardlink", "copy_file_range", "copy")
+
+# Userspace copy buffer; large reads keep high-latency mounts (NFS) busy.
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+_FICLONE = 0x40049409  # linux/fs.h: _IOW(0x94, 9, int)
+
+# errno values meaning "this filesystem pair cannot do that", not "this file failed"
+_UNSUPPORTED = {
+    errno.EXDEV,
+    errno.EOPNOTSUPP,
+    errno.ENOTTY,
+    errno.EINVAL,
+    errno.ENOSYS,
+    errno.EPERM,
+    errno.EMLINK,
+}
+
+
+def reflink(src: Path, dst: Path) -> None:
+    """Clone src to dst sharing extents; OSError when the filesystem cannot."""
+    if sys.platform != "linux":
+        raise OSError(errno.EOPNOTSUPP, "reflink not supported on this platform")
+    import fcntl
+
+    with src.open("rb") as fi, dst.open("wb") as fo:
+        fcntl.ioctl(fo.fileno(), _FICLONE, fi.fileno())
+
+
+def copy_range(src: Path, dst: Path) -> None:
+    """Copy src to dst with os.copy_file_range (no userspace buffers)."""
+    if not hasattr(os, "copy_file_range"):
+        raise OSError(errno.ENOSYS, "copy_file_range not available")
+    with src.open("rb") as fi, dst.open("wb") as fo:
+        left = os.fstat(fi.fileno()).st_size
+        while left > 0:
+            done = os.copy_file_range(fi.fileno(), fo.fileno(), left)
+            if done == 0:
+                break
+            left -= done
+
+
+def _hardlink(src: Path, dst: Path) -> None:
+    os.link(src, dst)
+
+
+_COPY: dict[str, Callable[[Path, Path], None]] = {
+    "reflink": reflink,
+    "hardlink": _hardlink,
+    "copy_file_range": copy_range,
+}
+
+
+def _read_only(st: os.stat_result) -> bool:
+    return not st.st_mode & (stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH)
+
+
+class Copier:
+    """copy2()-like file copies using the cheapest strategy a filesystem pair supports.
+
+    `strategy` is "auto" (try all, cheapest first) or one of STRATEGIES, in
+    which case that one and the cheaper-to-support fallbacks after it are
+    tried. A strategy that fails as unsupported is not retried for the same
+    (source device, destination device) pair. `counts` reports what was used.
+    """
+
+    def __init__(self, strategy: str = "auto", *, buffer_size: int = DEFAULT_BUFFER_SIZE) -> None:
+        if strategy != "auto" and strategy not in STRATEGIES:
+            raise ValueError(f"unknown copy strategy: {strategy}")
+        start = 0 if strategy == "auto" else STRATEGIES.index(strategy)
+        self.chain = STRATEGIES[start:]
+        self.buffer_size = max(64 * 1024, buffer_size)
+        self.counts: dict[str, int] = {}
+        self._unsupported: set[tuple[int, int, str]] = set()
+        self._lock = threading.Lock()
+
+    def copy(self, src: Path, dst: Path) -> str:
+        """Copy src to dst (data + metadata); returns the strategy used."""
+        st = src.stat()
+        dev = (int(st.st_dev), int(dst.parent.stat().st_dev))
+        for name in self.chain:
+            with self._lock:
+                if (*dev, name) in self._unsupported:
+                    continue
+            if name == "hardlink" and (dev[0] != dev[1] or not _read_only(st)):
+                continue
+            try:
+                if name == "copy":
+                    self._copy(src, dst)
+                else:
+                    _COPY[name](src, dst)
+            except OSError as e:
+                if name == "copy":
+                    raise
+                dst.unlink(missing_ok=True)
+                if e.errno in _UNSUPPORTED:
+                    with self._lock:
+                        self._unsupported.add((*dev, name))
+                continue
+            if name != "hardlink":
+                shutil.copystat(src, dst)
+            with self._lock:
+                self.counts[name] = self.counts.get(name, 0) + 1
+            return name
+        raise OSError(errno.EIO, f"no copy strategy succeeded: {src}")
+
+    def _copy(self, src: Path, dst: Path) -> None:
+        with src.open("rb") as fi, dst.open("wb") as fo:
+            shutil.copyfileobj(fi, fo, self.buffer_size)
+
+    def summary(self) -> str:
+        return ", ".join(f"{k}={self.counts[k]}" for k in STRATEGIES if k in self.counts)
+
+
+# relative posix path -> (size, mtime_ns)
+Listing = dict[str, tuple[int, int]]
+
+
+@dataclass(frozen=True)
+class TreeCopy:
+    files: int
+    bytes: int
+    seconds: float
+    listing: Listing
+    removed: tuple[str, ...] = ()
+
+    def rate(self) -> str:
+        mib = self.bytes / (1024 * 1024)
+        speed = mib / self.seconds if self.seconds > 0 else 0.0
+        return f"{self.files} file(s), {mib:.1f} MiB in {self.seconds:.1f}s ({speed:.1f} MiB/s)"
+
+
+def scan_tree(root: Path) -> tuple[list[Path], Listing]:
+    """One os.scandir pass: sorted relative dirs and the file listing of root."""
+    dirs: list[Path] = []
+    files: Listing = {}
+    pending = [Path()]
+    while pending:
+        rel = pending.pop()
+        with os.scandir(root / rel) as it:
+            for entry in it:
+                child = rel / entry.name
+                if entry.is_dir():
+                    dirs.append(child)
+                    pending.append(child)
+                elif entry.is_file():
+                    st = entry.stat()
+                    files[child.as_posix()] = (int(st.st_size), int(st.st_mtime_ns))
+    dirs.sort()
+    return dirs, dict(sorted(files.items()))
+
+
+def copy_tree(
+    src: Path, dst: Path, copier: Copier, *, workers: int, previous: Listing | None = None
+) -> TreeCopy:
+    """Copy the tree under src into dst (which must exist) with a pool of workers.
+
+    Directories are created first, then files are copied concurrently; the
+    result is the same tree whatever the completion order. With `previous`
+    (the listing of src when dst was last synced) only new or changed files
+    are copied and files gone from src are deleted from dst, rsync-style.
+    """
+    t0 = time.monotonic()
+    dirs, listing = scan_tree(src)
+    for d in dirs:
+        (dst / d).mkdir(parents=True, exist_ok=True)
+
+    todo = [rel for rel, sig in listing.items() if previous is None or previous.get(rel) != sig]
+    removed: list[str] = []
+    if previous is not None:
+        removed = sorted(rel for rel in previous if rel not in listing)
+        for rel in removed:
+            (dst / rel).unlink(missing_ok=True)
+        _prune_dirs(dst, keep={d.as_posix() for d in dirs})
+        for rel in todo:
+            # never write through an existing (possibly hardlinked) file
+            (dst / rel).unlink(missing_ok=True)
+
+    run_parallel(lambda rel: copier.copy(src / rel, dst / rel), todo, workers=workers)
+    return TreeCopy(
+        files=len(todo),
+        bytes=sum(listing[rel][0] for rel in todo),
+        seconds=time.monotonic() - t0,
+        listing=listing,
+        removed=tuple(removed),
+    )
+
+
+def _prune_dirs(root: Path, *, keep: set[str]) -> None:
+    # remove directories under root that are empty and no longer in the source
+    for d in sorted((p for p in root.rglob("*") if p.is_dir()), reverse=True):
+        rel = d.relative_to(root).as_posix()
+        if rel not in keep and not any(d.iterdir()):
+            d.rmdir()
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import cast
+
+import audiomason.state as state
+from audiomason.stat_cache import evict_lru
+
+# Incremental source fingerprints.
+#
+# The digest is exactly the one of a full sorted os.walk (path, then
+# "|rel|size|mtime_ns" per file, top-down, files before subdirectories), but
+# the walk is remembered per directory: directory mtime, its files with their
+# size/mtime and the subdirectories walked. A directory whose mtime has not
+# changed is not listed and its files are not stat()ed again; only one stat()
+# per directory remains.
+#
+# Directory mtimes only move when entries are added, removed or renamed, so a
+# directory is trusted only once it and its files have been quiet for
+# FINGERPRINT_SETTLE_NS before the scan: a file still being uploaded or
+# appended to is always re-stat()ed.
+#
+# Trees live in <cache root>/fingerprint (one JSON per source) and digests are
+# memoized per run (reset_fingerprint_memo()).
+
+FINGERPRINT_CACHE_VERSION = 1
+FINGERPRINT_CACHE_MAX_BYTES = 32 * 1024 * 1024
+FINGERPRINT_SETTLE_NS = 60 * 1_000_000_000
+
+_MEMO: dict[Path, str] = {}
+_TREES: dict[Path, dict[str, _Dir]] = {}
+_LOCK = threading.Lock()
+
+
+@dataclass(frozen=True)
+class _Dir:
+    mtime_ns: int
+    scanned_ns: int
+    # (name, size, mtime_ns); size/mtime are None for entries that vanished
+    files: tuple[tuple[str, int | None, int | None], ...]
+    walk: tuple[str, ...]  # subdirectories os.walk descends into (no symlinks)
+
+    def settled(self) -> bool:
+        limit = self.scanned_ns - FINGERPRINT_SETTLE_NS
+        if self.mtime_ns >= limit:
+            return False
+        return all(m is not None and m < limit for _, _, m in self.files)
+
+
+def reset_fingerprint_memo() -> None:
+    """Forget digests memoized by this run (the per-directory trees stay)."""
+    with _LOCK:
+        _MEMO.clear()
+
+
+def _scan_dir(d: Path, mtime_ns: int) -> _Dir:
+    scanned = time.time_ns()
+    files: list[str] = []
+    dirs: list[tuple[str, bool]] = []
+    try:
+        with os.scandir(d) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    dirs.append((entry.name, entry.is_symlink()))
+                else:
+                    files.append(entry.name)
+    except OSError:
+        # os.walk silently skips unreadable directories
+        return _Dir(mtime_ns, 0, (), ())
+    entries: list[tuple[str, int | None, int | None]] = []
+    for name in sorted(files):
+        try:
+            st = (d / name).stat()
+        except FileNotFoundError:
+            entries.append((name, None, None))
+            continue
+        entries.append((name, int(st.st_size), int(st.st_mtime_ns)))
+    walk = tuple(name for name, link in sorted(dirs) if not link)
+    return _Dir(mtime_ns, scanned, tuple(entries), walk)
+
+
+def _walk(root: Path, old: dict[str, _Dir]) -> dict[str, _Dir]:
+    tree: dict[str, _Dir] = {}
+    stack = [""]
+    while stack:
+        rel = stack.pop()
+        d = root / rel if rel else root
+        try:
+            mtime = os.stat(d).st_mtime_ns
+        except OSError:
+            continue
+        prev = old.get(rel)
+        node = prev if prev is not None and prev.mtime_ns == mtime and prev.settled() else None
+        if node is None:
+            node = _scan_dir(d, mtime)
+        tree[rel] = node
+        stack.extend(f"{rel}/{sub}" if rel else sub for sub in reversed(node.walk))
+    return tree
+
+
+def _digest(root: Path, tree: dict[str, _Dir]) -> str:
+    h = hashlib.sha256()
+    h.update(str(root).encode("utf-8"))
+    h.update(b"|D|")
+    stack = [""]
+    while stack:
+        rel = stack.pop()
+        node = tree.get(rel)
+        if node is None:
+            continue
+        for name, size, mtime in node.files:
+            frel = (f"{rel}/{name}" if rel else name).encode("utf-8")
+            if size is None:
+                # Source changed during scan -> produce a different fingerprint deterministically
+                h.update(b"|MISSING|")
+                h.update(frel)
+                continue
+            h.update(b"|")
+            h.update(frel)
+            h.update(b"|")
+            h.update(str(size).encode("utf-8"))
+            h.update(b"|")
+            h.update(str(mtime).encode("utf-8"))
+        stack.extend(f"{rel}/{sub}" if rel else sub for sub in reversed(node.walk))
+    return h.hexdigest()
+
+
+def _cache_file(root: Path) -> Path | None:
+    cache_root = state.OPTS.cache_root if state.OPTS is not None else None
+    if cache_root is None:
+        return None
+    key = hashlib.sha1(str(root).encode("utf-8")).hexdigest()
+    return cache_root / "fingerprint" / f"{key}.json"
+
+
+def _load_tree(root: Path) -> dict[str, _Dir]:
+    with _LOCK:
+        hit = _TREES.get(root)
+    if hit is not None:
+        return hit
+    cf = _cache_file(root)
+    if cf is None:
+        return {}
+    try:
+        raw = cast(object, json.loads(cf.read_text(encoding="utf-8")))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(raw, dict):
+        return {}
+    data = cast(dict[str, object], raw)
+    dirs = data.get("dirs")
+    if data.get("version") != FINGERPRINT_CACHE_VERSION or not isinstance(dirs, dict):
+        return {}
+    tree: dict[str, _Dir] = {}
+    for rel, v in cast(dict[str, object], dirs).items():
+        node = _dir_from_json(v)
+        if node is not None:
+            tree[rel] = node
+    return tree
+
+
+def _dir_from_json(v: object) -> _Dir | None:
+    if not isinstance(v, dict):
+        return None
+    d = cast(dict[str, object], v)
+    mtime, scanned, files, walk = (
+        d.get("mtime_ns"),
+        d.get("scanned_ns"),
+        d.get("files"),
+        d.get("walk"),
+    )
+    if not (isinstance(mtime, int) and isinstance(scanned, int)):
+        return None
+    if not (isinstance(files, list) and isinstance(walk, list)):
+        return None
+    entries: list[tuple[str, int | None, int | None]] = []
+    for f in cast(list[object], files):
+        vals = cast(list[object], f) if isinstance(f, list) else []
+        if len(vals) != 3 or not isinstance(vals[0], str):
+            return None
+        size, fm = vals[1], vals[2]
+        entries.append(
+            (vals[0], size if isinstance(size, int) else None, fm if isinstance(fm, int) else None)
+        )
+    names = [w for w in cast(list[object], walk) if isinstance(w, str)]
+    return _Dir(mtime, scanned, tuple(entries), tuple(names))
+
+
+def _store_tree(root: Path, tree: dict[str, _Dir]) -> None:
+    with _LOCK:
+        _TREES[root] = tree
+    cf = _cache_file(root)
+    if cf is None:
+        return
+    dirs = {
+        rel: {
+            "mtime_ns": n.mtime_ns,
+            "scanned_ns": n.scanned_ns,
+            "files": [list(f) for f in n.files],
+            "walk": list(n.walk),
+        }
+        for rel, n in tree.items()
+    }
+    data: dict[str, object] = {"version": FINGERPRINT_CACHE_VERSION, "dirs": dirs}
+    tmp = cf.with_name(f"{cf.name}.{os.getpid()}.tmp")
+    try:
+        cf.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(json.dumps(data), encoding="utf-8")
+        tmp.replace(cf)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+        return
+    evict_lru(cf.parent, "*.json", FINGERPRINT_CACHE_MAX_BYTES)
+
+
+def source_fingerprint(src: Path) -> str:
+    r = src.expanduser().resolve()
+    with _LOCK:
+        hit = _MEMO.get(r)
+    if hit is not None:
+        return hit
+    if r.is_file():
+        st = r.stat()
+        h = hashlib.sha256()
+        h.update(str(r).encode("utf-8"))
+        h.update(b"|F|")
+        h.update(str(st.st_size).encode("utf-8"))
+        h.update(b"|")
+        h.update(str(st.st_mtime_ns).encode("utf-8"))
+        digest = h.hexdigest()
+    else:
+        old = _load_tree(r)
+        tree = _walk(r, old)
+        if tree != old:
+            _store_tree(r, tree)
+        digest = _digest(r, tree)
+    with _LOCK:
+        _MEMO[r] = digest
+    return digest
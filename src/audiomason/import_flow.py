@@ -6,7 +6,9 @@ import io
 import json
 import shutil
 import sys
+import time
 import types
+from collections.abc import Iterable
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import TextIO, cast
@@ -15,28 +17,53 @@ import audiomason.metadata_lookup as metadata_lookup
 import audiomason.openlibrary as openlibrary
 import audiomason.state as state
 from audiomason.archives import unpack
-from audiomason.audio import convert_m4a_in_place, convert_opus_in_place
+from audiomason.audio import (
+    TRACK_EXTS,
+    EncodeTags,
+    convert_m4a_in_place,
+    convert_opus_in_place,
+    keep_codec_target,
+    split_outputs,
+)
 from audiomason.covers import (
     choose_cover,
     cover_from_input,
     extract_embedded_cover_from_mp3,
     find_file_cover,
 )
+from audiomason.filecopy import Copier, Listing, TreeCopy, copy_tree
+from audiomason.fingerprint import reset_fingerprint_memo, source_fingerprint
 from audiomason.guess import (
     guess_book_title_default,
     guess_series_numbering_style,
     normalize_series_numbering,
 )
 from audiomason.ignore import add_ignore, load_ignore
-from audiomason.manifest import load_manifest, source_fingerprint, update_manifest
+from audiomason.inbox_move import (
+    can_move,
+    holds_moved_source,
+    mark_consumed,
+    move_into_stage,
+    moved_source,
+    restore_moved_source,
+    restore_moved_sources,
+)
+from audiomason.integrity import write_sidecar
+from audiomason.manifest import (
+    ManifestSession,
+    load_manifest,
+    update_manifest,
+    write_manifest_atomic,
+)
 from audiomason.naming import normalize_sentence
 from audiomason.openlibrary import OLResult
 from audiomason.paths import (
-    ARCHIVE_EXTS,
+    GENRE,
     get_archive_root,
     get_drop_root,
     get_output_root,
     get_stage_root,
+    is_archive,
 )
 from audiomason.pipeline_steps import resolve_pipeline_steps
 from audiomason.preflight_orchestrator import PreflightContext, PreflightOrchestrator
@@ -48,8 +75,12 @@ from audiomason.preflight_resolve import (
     resolve_preflight_disable,
 )
 from audiomason.preflight_undo import decide_publish_wipe_clean, prompt_author_with_undo
+from audiomason.publish import publish_dir
 from audiomason.rename import natural_sort, rename_sequential
-from audiomason.tags import summarize_id3_files, wipe_id3, write_cover, write_tags
+from audiomason.run_index import IndexedRun, RunIndex, run_from_manifest
+from audiomason.scheduler import TranscodeSchedule
+from audiomason.stage_index import INDEX as STAGE_INDEX
+from audiomason.tags import TagPlan, summarize_id3_files, wipe_id3, write_cover, write_tags
 from audiomason.util import (
     AmConfigError,
     AmUndoError,
@@ -61,6 +92,7 @@ from audiomason.util import (
     prompt_yes_no,
     slug,
 )
+from audiomason.virtual_stage import materialize
 
 # FEATURE #67: disable selected preflight prompts (skip prompts deterministically)
 
@@ -166,40 +198,38 @@ class BookGroup:
     m4a_hint: Path | None = None
 
 
-def _build_json_report(stage_runs: list[Path]) -> dict[str, object]:
-    # Deterministic: derived from manifest.json only
+def _build_json_report(stage_runs: list[Path], index: RunIndex | None = None) -> dict[str, object]:
+    # Deterministic: derived from the run index (manifest.json when not indexed)
     sources: list[dict[str, object]] = []
     books: list[dict[str, object]] = []
     decisions: list[dict[str, object]] = []
     total_books = 0
     processed_books = 0
+    indexed: dict[str, IndexedRun] = {}
+    if index is not None:
+        with contextlib.suppress(Exception):
+            indexed = index.runs([sr.name for sr in stage_runs])
     for sr in stage_runs:
-        mf = load_manifest(sr)
-        src = cast(dict[str, object], mf.get("source", {}))
-        binfo = cast(dict[str, object], mf.get("books", {}))
-        dec = cast(dict[str, object], mf.get("decisions", {}))
-        bm = cast(dict[str, object], mf.get("book_meta", {}))
-        picked_l = _as_str_list(binfo.get("picked"))
-        detected_l = _as_str_list(binfo.get("detected"))
-        processed_l = _as_str_list(binfo.get("processed"))
-        total_books += len(picked_l)
-        processed_books += len(processed_l)
+        run = indexed.get(sr.name) or run_from_manifest(sr.name, load_manifest(sr))
+        dec = run.decisions
+        total_books += len(run.picked)
+        processed_books += len(run.processed)
 
         sources.append(
             {
-                "name": str(src.get("name") or ""),
-                "stem": str(src.get("stem") or ""),
-                "path": str(src.get("path") or ""),
-                "fingerprint": str(src.get("fingerprint") or ""),
-                "detected_books": detected_l,
-                "picked_books": picked_l,
-                "processed_books": processed_l,
+                "name": run.name,
+                "stem": run.stem,
+                "path": run.path,
+                "fingerprint": run.fingerprint,
+                "detected_books": list(run.detected),
+                "picked_books": list(run.picked),
+                "processed_books": list(run.processed),
             }
         )
 
         decisions.append(
             {
-                "source_stem": str(src.get("stem") or ""),
+                "source_stem": run.stem,
                 "publish": (bool(dec.get("publish")) if "publish" in dec else None),
                 "wipe_id3": (bool(dec.get("wipe_id3")) if "wipe_id3" in dec else None),
                 "author": str(dec.get("author") or ""),
@@ -208,21 +238,22 @@ def _build_json_report(stage_runs: list[Path]) -> dict[str, object]:
         )
 
         author = str(dec.get("author") or "")
-        for label, meta in sorted(bm.items(), key=lambda kv: str(kv[0])):  # type: ignore[misc]
-            m2d = cast(dict[str, object], meta)
-            title = str(m2d.get("title") or "")
-            out_title = str(m2d.get("out_title") or "") or title
+        for b in run.books:
+            if b.meta is None:
+                continue
+            title = str(b.meta.get("title") or "")
+            out_title = str(b.meta.get("out_title") or "") or title
             books.append(
                 {
-                    "source_stem": str(src.get("stem") or ""),
-                    "label": str(label),
+                    "source_stem": run.stem,
+                    "label": b.label,
                     "author": author,
                     "title": title,
                     "out_title": out_title,
-                    "dest_kind": str(m2d.get("dest_kind") or ""),
-                    "cover_mode": str(m2d.get("cover_mode") or ""),
-                    "overwrite": bool(m2d.get("overwrite") is True),
-                    "result": ("processed" if str(label) in processed_l else "pending"),
+                    "dest_kind": str(b.meta.get("dest_kind") or ""),
+                    "cover_mode": str(b.meta.get("cover_mode") or ""),
+                    "overwrite": bool(b.meta.get("overwrite") is True),
+                    "result": ("processed" if b.label in run.processed else "pending"),
                 }
             )
 
@@ -290,9 +321,9 @@ def _list_sources(drop_root: Path) -> list[Path]:
             continue
 
         # allow only dirs + supported archives
-        if src.is_file() and src.suffix.lower() not in ARCHIVE_EXTS:
+        if src.is_file() and not is_archive(src):
             continue
-        if not (src.is_dir() or (src.is_file() and src.suffix.lower() in ARCHIVE_EXTS)):
+        if not (src.is_dir() or (src.is_file() and is_archive(src))):
             continue
 
         candidates = {
@@ -309,13 +340,20 @@ def _list_sources(drop_root: Path) -> list[Path]:
     return items
 
 
-def _choose_source(cfg: dict[str, object], sources: list[Path]) -> list[Path]:
+def _choose_source(
+    cfg: dict[str, object],
+    sources: list[Path],
+    progress: dict[str, tuple[int, int]] | None = None,
+) -> list[Path]:
     if not sources:
         out("[inbox] empty")
         return []
     out("[inbox] sources:")
     for i, p in enumerate(sources, 1):
-        out(f"  {i}) {p.name}")
+        # half-done runs (from the run index): processed/picked books
+        done = (progress or {}).get(slug(p.name))
+        resume = f"  [resume: {done[0]}/{done[1]} processed]" if done else ""
+        out(f"  {i}) {p.name}{resume}")
     else:
         ans = (
             pf_prompt(cfg, "choose_source", "Choose source number, or 'a' for all", "1")
@@ -340,36 +378,142 @@ def _reset_dir(p: Path) -> None:
     ensure_dir(p)
 
 
-def _stage_source(src: Path, stage_src: Path) -> None:
-    _reset_dir(stage_src)
-    if src.is_dir():
-        # copy tree into stage (deterministic)
-        for item in src.rglob("*"):
-            rel = item.relative_to(src)
-            dst = stage_src / rel
-            if item.is_dir():
-                ensure_dir(dst)
-            else:
-                ensure_dir(dst.parent)
-                shutil.copy2(item, dst)
+def _stage_copier() -> tuple[Copier, int]:
+    opts = state.OPTS if state.OPTS is not None else state.Opts()
+    copier = Copier(opts.stage_copy, buffer_size=opts.stage_copy_buffer_kb * 1024)
+    return copier, opts.stage_copy_workers
+
+
+def _stage_record(copier: Copier, done: TreeCopy) -> dict[str, object]:
+    # manifest "stage" section: copy strategies used + the source listing
+    # (relpath -> [size, mtime_ns]) the stage now mirrors
+    rec: dict[str, object] = {"files": {rel: list(sig) for rel, sig in done.listing.items()}}
+    if copier.counts:
+        rec["copy"] = copier.counts
+    return rec
+
+
+def _stage_listing(mf: dict[str, object]) -> Listing | None:
+    raw = _as_dict(mf.get("stage")).get("files")
+    if not isinstance(raw, dict):
+        return None
+    listing: Listing = {}
+    for rel, sig in cast(dict[str, object], raw).items():
+        vals = cast(list[object], sig) if isinstance(sig, list) else []
+        ints = [v for v in vals if isinstance(v, int)]
+        if len(ints) != 2 or len(vals) != 2:
+            return None
+        listing[rel] = (ints[0], ints[1])
+    return listing
+
+
+def _touched_books(rels: Iterable[str], books: list[BookGroup]) -> set[str]:
+    """Labels of the books whose inputs include one of the staged paths `rels`.
+
+    A path belongs to the deepest book whose directory contains it (disc
+    subfolders, scans next to the audio). Stage-level files (a shared
+    cover) and paths outside every book count for all books below the
+    nearest directory that has any.
+    """
+    labels: set[str] = set()
+    for rel in rels:
+        parts = Path(rel).parent.parts
+        owner: BookGroup | None = None
+        for b in books:
+            bp = b.rel_path.parts
+            if parts[: len(bp)] == bp and (owner is None or len(bp) > len(owner.rel_path.parts)):
+                owner = b
+        if owner is not None:
+            labels.add(owner.label)
+        if owner is None or not parts:
+            # the nearest directory above it that holds books
+            for n in range(len(parts), -1, -1):
+                below = {b.label for b in books if b.rel_path.parts[:n] == parts[:n]}
+                if below:
+                    labels |= below
+                    break
+    return labels
+
+
+def _forget_progress(mf: dict[str, object], labels: set[str]) -> None:
+    # A changed book is no longer processed: resume must not offer to skip it.
+    books = _as_dict(mf.get("books"))
+    if not books:
         return
+    if "processed" in books:
+        books["processed"] = [x for x in _as_str_list(books["processed"]) if x not in labels]
+    if "timings" in books:
+        timings = _as_dict(books["timings"])
+        books["timings"] = {k: v for k, v in timings.items() if k not in labels}
+    mf["books"] = books
 
-    if src.is_file() and src.suffix.lower() in ARCHIVE_EXTS:
+
+def _stage_source(src: Path, stage_src: Path) -> dict[str, object]:
+    # Returns the manifest "stage" section (empty for archives).
+    _reset_dir(stage_src)
+    if src.is_dir():
+        # copy tree into stage (deterministic: same tree whatever the copy order)
+        copier, workers = _stage_copier()
+        done = copy_tree(src, stage_src, copier, workers=workers)
+        out(f"[stage] copied {done.rate()}")
+        if copier.counts:
+            out(f"[stage] copy strategy: {copier.summary()}")
+        return _stage_record(copier, done)
+
+    if src.is_file() and is_archive(src):
         unpack(src, stage_src)
-        return
+        return {}
 
     die(f"Unsupported source: {src}")
+    return {}
+
+
+def _should_move(src: Path, stage_run: Path, clean_inbox: bool) -> bool:
+    if not clean_inbox or (state.OPTS is not None and state.OPTS.dry_run):
+        return False
+    if not (src.is_dir() or is_archive(src)):
+        return False
+    return can_move(src, stage_run)
+
+
+def _move_source(src: Path, stage_run: Path, stage_src: Path) -> dict[str, object]:
+    # clean_inbox=yes: the inbox copy is deleted in FINALIZE anyway, so rename
+    # it into the stage instead of copying it (journaled, see inbox_move).
+    if src.is_dir():
+        move_into_stage(src, stage_src, stage_run)
+        out(f"[stage] moved source into stage: {src} -> {stage_src}")
+        return {"moved": True}
+    archive = stage_run / "inbox" / src.name
+    move_into_stage(src, archive, stage_run)
+    out(f"[stage] moved source into stage: {src} -> {archive}")
+    return {**_stage_source(archive, stage_src), "moved": True}
+
+
+def _sync_stage(
+    src: Path, stage_src: Path, previous: Listing
+) -> tuple[dict[str, object], set[str]]:
+    """rsync-like refresh of an existing stage from its (directory) source.
+
+    Only files whose size or mtime differ from `previous` are copied, files
+    gone from the source are deleted. Returns the new manifest "stage" section
+    and the labels of the books whose files changed.
+    """
+    copier, workers = _stage_copier()
+    done = copy_tree(src, stage_src, copier, workers=workers, previous=previous)
+    changed = [rel for rel, sig in done.listing.items() if previous.get(rel) != sig]
+    out(f"[stage] synced {done.rate()}, removed {len(done.removed)} file(s)")
+    if copier.counts:
+        out(f"[stage] copy strategy: {copier.summary()}")
+    touched = _touched_books([*changed, *done.removed], _detect_books(stage_src))
+    return _stage_record(copier, done), touched
 
 
 def _has_audio_files_here(p: Path) -> bool:
-    return any(f.is_file() and f.suffix.lower() in _AUDIO_EXTS for f in p.iterdir())
+    return bool(STAGE_INDEX.files(p, _AUDIO_EXTS))
 
 
 def _find_first_m4a(p: Path) -> Path | None:
-    for f in sorted(p.rglob("*.m4a"), key=lambda x: x.as_posix().lower()):  # type: ignore[misc]
-        if f.is_file():
-            return f
-    return None
+    return STAGE_INDEX.first_file(p, ".m4a")
 
 
 # [issue_75] _detect_books
@@ -385,18 +529,10 @@ def _detect_books(stage_src: Path) -> list[BookGroup]:
     if _has_audio_files_here(stage_src):
         pairs.append(("__ROOT_AUDIO__", stage_src))
 
-    def visit(d: Path, rel: Path) -> None:
+    # one scandir per directory (STAGE_INDEX), pre-order, case-insensitive
+    for d in STAGE_INDEX.walk(stage_src):
         if d != stage_src and _has_audio_files_here(d):
-            pairs.append((rel.as_posix(), d))
-        subdirs = sorted([x for x in d.iterdir() if x.is_dir()], key=lambda p: p.name.casefold())  # type: ignore[misc]
-        for sd in subdirs:
-            visit(sd, rel / sd.name)
-
-    for top in sorted(
-        [x for x in stage_src.iterdir() if x.is_dir()],
-        key=lambda p: p.name.casefold(),  # type: ignore[misc]
-    ):
-        visit(top, Path(top.name))
+            pairs.append((d.relative_to(stage_src).as_posix(), d))
 
     for rel_s, root in sorted(pairs, key=lambda t: t[0].casefold()):  # type: ignore[misc]
         label = rel_s
@@ -448,19 +584,7 @@ def _choose_books(
 
 # [issue_75] _collect_audio_files
 def _collect_audio_files(group_root: Path) -> list[Path]:
-    mp3s = sorted(
-        [p for p in group_root.iterdir() if p.is_file() and p.suffix.lower() == ".mp3"],
-        key=lambda p: p.name.casefold(),  # type: ignore[misc]
-    )
-    m4as = sorted(
-        [p for p in group_root.iterdir() if p.is_file() and p.suffix.lower() == ".m4a"],
-        key=lambda p: p.name.casefold(),  # type: ignore[misc]
-    )
-    opuses = sorted(
-        [p for p in group_root.iterdir() if p.is_file() and p.suffix.lower() == ".opus"],
-        key=lambda p: p.name.casefold(),  # type: ignore[misc]
-    )
-    return mp3s + m4as + opuses
+    return [f for ext in (".mp3", ".m4a", ".opus") for f in STAGE_INDEX.files(group_root, {ext})]
 
 
 def _preflight_global(cfg: dict[str, object]) -> tuple[bool, bool]:
@@ -544,22 +668,99 @@ def _output_dir(archive_root: Path, author: str, title: str) -> Path:
     return archive_root / author_s / title_s
 
 
-def _copy_audio_to_out_no_rename(group_root: Path, outdir: Path) -> list[Path]:
+def _copy_mp3s_to_out(group_root: Path, outdir: Path) -> list[Path]:
+    # m4a/opus are converted from the stage straight into outdir; only files
+    # that are already mp3 need a copy.
     ensure_dir(outdir)
-    src_mp3s = _collect_audio_files(group_root)
-    if not src_mp3s:
+    sources = _collect_audio_files(group_root)
+    if not sources:
         die("No audio files to import (no mp3/m4a/opus found)")
     copied: list[Path] = []
-    for p in src_mp3s:
+    for p in sources:
+        if p.suffix.lower() != ".mp3":
+            continue
         dst = outdir / p.name
-        shutil.copy2(p, dst)
+        materialize(p, dst)
         copied.append(dst)
     return natural_sort(copied)
 
 
-def _copy_audio_to_out(group_root: Path, outdir: Path) -> list[Path]:
-    copied = _copy_audio_to_out_no_rename(group_root, outdir)
-    return rename_sequential(outdir, copied)
+def _predicted_cover(b: BookGroup, cover_mode: str) -> tuple[bool, Path | None]:
+    """(known, image file) the cover step will embed after tagging, when it can be told early."""
+    if cover_mode in {"skip", "embedded"}:
+        # the tags step has already dropped any embedded cover by then
+        return True, None
+    if cover_mode != "file":
+        return False, None  # asks, or picks between file and embedded
+    file_cover = find_file_cover(b.stage_root, b.group_root)
+    if file_cover is None:
+        return True, None
+    if file_cover.suffix.lower() in {".jpg", ".jpeg", ".png"}:
+        return True, file_cover
+    return False, None  # converted to jpeg by the cover step
+
+
+def _encode_tags(
+    b: BookGroup,
+    outdir: Path,
+    copied: list[Path],
+    *,
+    author: str,
+    title: str,
+    wipe: bool,
+    cover_mode: str,
+    steps: list[str],
+) -> dict[Path, EncodeTags]:
+    """Frames the PROCESS steps will give each mp3 encode, by output path.
+
+    ffmpeg writes them while encoding, and the tag plan leaves files that
+    already carry its frames unsaved. A wrong guess only costs that save.
+    """
+    if "tags" not in steps:
+        return {}
+    sources = [p for p in _collect_audio_files(b.group_root) if p.suffix.lower() != ".mp3"]
+    # Chapter splits are tagged after they run; here they only matter for the
+    # track numbers they shift, and a lone source shifts none.
+    probe = len(copied) + len(sources) > 1
+    targets: dict[Path, bool] = {}  # output -> encoded to mp3 with these tags
+    for src in sources:
+        keep = keep_codec_target(src)
+        dst = outdir / f"{src.stem}{keep or '.mp3'}"
+        parts = split_outputs(src, dst) if probe else None
+        outs = [dst] if parts is None else parts
+        if not targets.keys().isdisjoint(outs):
+            return {}
+        targets.update(dict.fromkeys(outs, parts is None and keep is None))
+    tracks = natural_sort([*copied, *targets])
+    if len(set(tracks)) != len(tracks):
+        return {}
+    # replay the steps on the names alone
+    names = list(tracks)
+    tagged: list[str] = []
+    cover_known, cover = True, None
+    for st in steps:
+        if st == "rename":
+            names = [outdir / f"{i:02d}{p.suffix.lower()}" for i, p in enumerate(names, 1)]
+        elif st == "tags":
+            tagged = [p.stem for p in names]
+            cover_known, cover = True, None
+        elif st == "cover":
+            cover_known, cover = _predicted_cover(b, cover_mode)
+    if not tagged or not cover_known:
+        return {}
+    return {
+        p: EncodeTags(
+            title=tagged[i],
+            artist=author,
+            album=title,
+            track=i + 1,
+            genre=GENRE,
+            cover=cover,
+            wipe=wipe,
+        )
+        for i, p in enumerate(tracks)
+        if targets.get(p)
+    }
 
 
 def _apply_book_steps(
@@ -606,6 +807,22 @@ def _apply_book_steps(
     return mp3s
 
 
+def _record_transcode_schedule(
+    stage_run: Path,
+    label: str,
+    *,
+    m4a: TranscodeSchedule | None,
+    opus: TranscodeSchedule | None,
+) -> None:
+    # Scheduler decisions go to the manifest so cpu_cores tuning can be reviewed later.
+    entry: dict[str, object] = {}
+    for ext, sched in (("m4a", m4a), ("opus", opus)):
+        if sched is not None:
+            entry[ext] = sched.to_manifest()
+    if entry:
+        update_manifest(stage_run, {"transcode": {label: entry}})
+
+
 def _write_dry_run_summary(stage_run: Path, author: str, title: str, lines: list[str]) -> None:
     name = f"{author} - {title}.dryrun.txt"
     path = stage_run / name
@@ -663,12 +880,29 @@ def _process_book(
         _write_dry_run_summary(stage_run, author, out_title, lines)
         out(f"[dry-run] wrote: {stage_run / (author + ' - ' + out_title + '.dryrun.txt')}")
         return
-    mp3s = _copy_audio_to_out_no_rename(b.group_root, outdir)
-
-    # [issue_86] PROCESS-only conversion (m4a/opus -> mp3)
-    convert_m4a_in_place(outdir, recursive=False)
-    convert_opus_in_place(outdir, recursive=False)
-    mp3s = natural_sort([p for p in outdir.iterdir() if p.is_file() and p.suffix.lower() == ".mp3"])
+    copied = _copy_mp3s_to_out(b.group_root, outdir)
+
+    # [issue_86] PROCESS-only conversion (m4a/opus -> mp3), reading the stage
+    # copies directly and writing into outdir; mp3 encodes are tagged by ffmpeg
+    encode_tags = _encode_tags(
+        b,
+        outdir,
+        copied,
+        author=author,
+        title=title,
+        wipe=wipe,
+        cover_mode=cover_mode,
+        steps=steps,
+    )
+    sched_m4a = convert_m4a_in_place(b.group_root, recursive=False, outdir=outdir, tags=encode_tags)
+    sched_opus = convert_opus_in_place(
+        b.group_root, recursive=False, outdir=outdir, tags=encode_tags
+    )
+    _record_transcode_schedule(stage_run, b.label, m4a=sched_m4a, opus=sched_opus)
+    # mp3s also holds stream-copied m4b/ogg tracks (ffmpeg.keep_codec)
+    mp3s = natural_sort(
+        [p for p in outdir.iterdir() if p.is_file() and p.suffix.lower() in TRACK_EXTS]
+    )
     if not mp3s:
         die("No mp3 files to import after conversion")
 
@@ -680,42 +914,44 @@ def _process_book(
         except Exception:
             _embedded_cover = None
 
-    if wipe:
-        wipe_id3(mp3s)
-        if _embedded_cover:
-            try:
-                data, mime = _embedded_cover
-                write_cover(mp3s, cover=data, cover_mime=mime)
-                out("[cover] preserved embedded cover after wipe")
-            except Exception:
-                pass
-
-    mp3s = _apply_book_steps(
-        steps=steps,
-        mp3s=mp3s,
-        outdir=outdir,
-        author=author,
-        title=title,
-        out_title=out_title,
-        i=i,
-        n=n,
-        b=b,
-        cfg=cfg,
-        cover_mode=cover_mode,
-    )
+    # wipe, tags and cover are collected and saved once per file
+    with TagPlan():
+        if wipe:
+            wipe_id3(mp3s)
+            if _embedded_cover:
+                try:
+                    data, mime = _embedded_cover
+                    write_cover(mp3s, cover=data, cover_mime=mime)
+                    out("[cover] preserved embedded cover after wipe")
+                except Exception:
+                    pass
+
+        mp3s = _apply_book_steps(
+            steps=steps,
+            mp3s=mp3s,
+            outdir=outdir,
+            author=author,
+            title=title,
+            out_title=out_title,
+            i=i,
+            n=n,
+            b=b,
+            cfg=cfg,
+            cover_mode=cover_mode,
+        )
+    # integrity sidecar: the book is final from here on
+    write_sidecar(outdir)
 
-    # [issue_86] publish-at-end: copy finalized book dir to final_root (archive)
+    # [issue_86] publish-at-end: move finalized book dir to final_root (archive)
     # only after all PROCESS steps
     if final_root != dest_root:
         final_outdir = _output_dir(final_root, author, out_title)
         if state.OPTS and state.OPTS.dry_run:
             out(f"[dry-run] would publish: {outdir} -> {final_outdir}")
         else:
-            ensure_dir(final_outdir.parent)
-            if final_outdir.exists() and any(final_outdir.iterdir()):
-                shutil.rmtree(final_outdir, ignore_errors=True)
-            shutil.copytree(outdir, final_outdir, dirs_exist_ok=True)
-            shutil.rmtree(outdir, ignore_errors=True)
+            workers = state.OPTS.stage_copy_workers if state.OPTS is not None else 4
+            how = publish_dir(outdir, final_outdir, workers=workers)
+            out(f"[publish] {final_outdir} ({how})")
 
 
 def _resolve_source_arg(drop_root: Path, src_path: Path) -> Path:
@@ -744,9 +980,9 @@ def _resolve_source_arg(drop_root: Path, src_path: Path) -> Path:
         die(f"Invalid source path: {p}")
 
     # allow only dirs + supported archives
-    if p.is_file() and p.suffix.lower() not in ARCHIVE_EXTS:
+    if p.is_file() and not is_archive(p):
         die(f"Unsupported source: {p}")
-    if not (p.is_dir() or (p.is_file() and p.suffix.lower() in ARCHIVE_EXTS)):
+    if not (p.is_dir() or (p.is_file() and is_archive(p))):
         die(f"Unsupported source: {p}")
 
     return p
@@ -779,6 +1015,8 @@ def _stage_cover_from_raw(cfg: dict[str, object], raw: str, group_root: Path) ->
         out(f"[dry-run] would stage cover: {img} -> {dst}")
         return dst
     ensure_dir(dst.parent)
+    # never write through a staged file: it may be a hardlink to the inbox
+    dst.unlink(missing_ok=True)
     shutil.copy2(img, dst)
     return dst
 
@@ -826,7 +1064,12 @@ def run_import(cfg: dict[str, object], src_path: Path | None = None) -> None:
     ensure_dir(stage_root)
     ensure_dir(archive_root)
     ensure_dir(output_root)
+    # sources moved into the stage by an interrupted run go back to the inbox
+    restore_moved_sources(stage_root)
+    # fingerprints are memoized per run (preflight + process phases)
+    reset_fingerprint_memo()
     stage_runs_for_json: list[Path] = []
+    run_index = RunIndex(stage_root)
 
     # Issue #74: per-source processing log
     def _pl_resolve_target(cfg: dict[str, object], stage_run: Path, src: Path) -> Path | None:
@@ -891,6 +1134,9 @@ def run_import(cfg: dict[str, object], src_path: Path | None = None) -> None:
         _pl_prompt0 = prompt
         _pl_prompt_yes_no0 = prompt_yes_no
         _pl_util: types.ModuleType | None = None
+        # patches stay in memory (journaled) until a checkpoint
+        mf_session = ManifestSession(stage_run).open()
+        stage_cleaned = False
         try:
             _pl_target = _pl_resolve_target(cfg, stage_run, src)
             if _pl_target is not None and not (state.OPTS and state.OPTS.dry_run):
@@ -970,14 +1216,24 @@ def run_import(cfg: dict[str, object], src_path: Path | None = None) -> None:
             stage_runs_for_json.append(stage_run)
             stage_src = stage_run / "src"
 
-            fp = source_fingerprint(src)
-            update_manifest(stage_run, {"source": {"fingerprint": fp}})
             mf = load_manifest(stage_run)
             dec = _as_dict(mf.get("decisions"))
             bm = _as_dict(mf.get("book_meta"))
             src_meta = _as_dict(mf.get("source"))
-
-            reuse_possible = bool(stage_src.exists() and src_meta.get("fingerprint") == fp)
+            listing = _stage_listing(mf)
+            # moved into the stage by the preflight phase: nothing left to fingerprint
+            moved = moved_source(mf)
+            fp = str(src_meta.get("fingerprint")) if moved else source_fingerprint(src)
+
+            # A stale directory stage with a recorded listing can be synced
+            # incrementally, so it is still worth reusing (not in process phase).
+            reuse_possible = bool(
+                stage_src.exists()
+                and (
+                    src_meta.get("fingerprint") == fp
+                    or (phase != "process" and listing is not None and src.is_dir())
+                )
+            )
             reuse_stage = False
             use_manifest_answers = False
             if phase == "process":
@@ -1016,7 +1272,12 @@ def run_import(cfg: dict[str, object], src_path: Path | None = None) -> None:
                             use_manifest_answers = False
                 else:
                     if reuse_possible:
+                        # the stage may hold the inbox source (clean_inbox=yes move)
+                        restore_moved_source(stage_run)
+                        if holds_moved_source(stage_run):
+                            die(f"Refusing to delete stage holding the moved source: {stage_run}")
                         out("[stage] delete")
+                        mf_session.discard()
                         shutil.rmtree(stage_run, ignore_errors=True)
                         # reset locals; we'll recreate stage + manifest below
                         mf = {}
@@ -1037,8 +1298,26 @@ def run_import(cfg: dict[str, object], src_path: Path | None = None) -> None:
                         },
                     },
                 )
-                out(f"[stage] copying source into stage: {src} -> {stage_src}")
-                _stage_source(src, stage_src)
+                touched: set[str] = set()
+                if reuse_stage and listing is not None and src.is_dir():
+                    out(f"[stage] syncing source into stage: {src} -> {stage_src}")
+                    stage_rec, touched = _sync_stage(src, stage_src, listing)
+                    stale = sorted(lbl for lbl in bm if lbl in touched)
+                    if stale:
+                        out(f"[manifest] changed book(s), answers dropped: {', '.join(stale)}")
+                        bm = {k: v for k, v in bm.items() if k not in touched}
+                elif _should_move(src, stage_run, run_clean_inbox):
+                    stage_rec = _move_source(src, stage_run, stage_src)
+                else:
+                    out(f"[stage] copying source into stage: {src} -> {stage_src}")
+                    stage_rec = _stage_source(src, stage_src)
+                # replace (not merge) the listing and book answers of the old stage
+                mf = load_manifest(stage_run)
+                mf["stage"] = stage_rec
+                mf["book_meta"] = bm
+                if touched:
+                    _forget_progress(mf, touched)
+                write_manifest_atomic(stage_run, mf)
 
             # [issue_86] Conversion is PROCESS-only (m4a/opus -> mp3). No heavy work in PREPARE.
 
@@ -1578,6 +1857,8 @@ def run_import(cfg: dict[str, object], src_path: Path | None = None) -> None:
                     },
                 )
 
+            mf_session.flush()
+            run_index.record(stage_run, load_manifest(stage_run))
             if not do_process:
                 return
 
@@ -1595,6 +1876,11 @@ def run_import(cfg: dict[str, object], src_path: Path | None = None) -> None:
                 overwrite,
                 final_root2,
             ) in enumerate(meta, 1):
+                started_ns = time.time_ns()
+                update_manifest(
+                    stage_run, {"books": {"timings": {b.label: {"started_ns": started_ns}}}}
+                )
+                run_index.record_book(stage_run, b.label, "started", started_ns=started_ns)
                 _process_book(
                     bi,
                     len(meta),
@@ -1611,9 +1897,20 @@ def run_import(cfg: dict[str, object], src_path: Path | None = None) -> None:
                     final_root2,
                     steps,
                 )
+                seconds = round((time.time_ns() - started_ns) / 1e9, 3)
                 processed_labels.append(b.label)
-                update_manifest(stage_run, {"books": {"processed": processed_labels}})
+                update_manifest(
+                    stage_run,
+                    {
+                        "books": {
+                            "processed": processed_labels,
+                            "timings": {b.label: {"seconds": seconds}},
+                        }
+                    },
+                )
+                run_index.record_book(stage_run, b.label, "processed", seconds=seconds)
 
+            mf_session.flush()
             out("[phase] FINALIZE")
 
             # FEATURE #26: clean stage at end (successful run only)
@@ -1631,6 +1928,9 @@ def run_import(cfg: dict[str, object], src_path: Path | None = None) -> None:
             if do_clean_inbox:
                 if state.OPTS and state.OPTS.dry_run:
                     out(f"[inbox] would clean: {src}")
+                elif moved_source(load_manifest(stage_run)) is not None:
+                    mark_consumed(stage_run)
+                    out(f"[inbox] cleaned: {src} (moved into stage)")
                 else:
                     if src.is_dir():
                         shutil.rmtree(src, ignore_errors=True)
@@ -1645,10 +1945,17 @@ def run_import(cfg: dict[str, object], src_path: Path | None = None) -> None:
                 if state.OPTS is not None and state.OPTS.dry_run:
                     out(f"[stage] would clean: {stage_run}")
                 else:
+                    mf_session.discard()
                     shutil.rmtree(stage_run, ignore_errors=True)
+                    stage_cleaned = True
                     out(f"[stage] cleaned: {stage_run}")
 
         finally:
+            mf_session.close()
+            if stage_cleaned:
+                run_index.mark_cleaned(stage_run)
+            elif stage_run.is_dir():
+                run_index.record(stage_run, load_manifest(stage_run))
             # Issue #74: finalize streaming per-source log
             sys.stdout = _pl_stdout0
             sys.stderr = _pl_stderr0
@@ -1684,23 +1991,33 @@ def run_import(cfg: dict[str, object], src_path: Path | None = None) -> None:
         return _list_sources(drop_root)
 
     def _choose_cb(sources: list[Path]) -> list[Path]:
-        return _choose_source(cfg, sources)
+        try:
+            progress = run_index.progress()
+        except Exception:
+            progress = {}
+        return _choose_source(cfg, sources, progress)
 
     def _run_for_cb(picked_sources: list[Path], picked_all: bool, run_clean_inbox: bool) -> None:
         phases = ["combined"]
         if picked_all and len(picked_sources) > 1:
             phases = ["preflight", "process"]
-        for phase in phases:
-            do_process = phase != "preflight"
-            for si, src in enumerate(picked_sources, 1):
-                _run_one_source(
-                    src,
-                    si,
-                    len(picked_sources),
-                    phase=phase,
-                    do_process=do_process,
-                    run_clean_inbox=run_clean_inbox,
-                )
+        try:
+            for phase in phases:
+                do_process = phase != "preflight"
+                for si, src in enumerate(picked_sources, 1):
+                    _run_one_source(
+                        src,
+                        si,
+                        len(picked_sources),
+                        phase=phase,
+                        do_process=do_process,
+                        run_clean_inbox=run_clean_inbox,
+                    )
+        finally:
+            # Sources moved into the stage stay there from preflight to
+            # FINALIZE only: an undo (re-run from choose source), a skipped or
+            # unfinished source puts them back in the inbox.
+            restore_moved_sources(stage_root)
 
     from audiomason.preflight_undo import drive_top_level  # local import to avoid cycle
 
@@ -1709,17 +2026,24 @@ def run_import(cfg: dict[str, object], src_path: Path | None = None) -> None:
             local_cfg, "clean_inbox", "Clean inbox after successful import?", default_no=default_no
         )
 
-    drive_top_level(
-        cfg,
-        src_path=_resolve_source_arg(drop_root, src_path) if src_path is not None else None,
-        drop_root=drop_root,
-        clean_inbox_mode=clean_inbox_mode,
-        list_sources=_list_cb,
-        choose_sources=_choose_cb,
-        run_for=_run_for_cb,
-        ask_clean_inbox=_ask_clean_inbox_cb,
-    )
+    try:
+        drive_top_level(
+            cfg,
+            src_path=_resolve_source_arg(drop_root, src_path) if src_path is not None else None,
+            drop_root=drop_root,
+            clean_inbox_mode=clean_inbox_mode,
+            list_sources=_list_cb,
+            choose_sources=_choose_cb,
+            run_for=_run_for_cb,
+            ask_clean_inbox=_ask_clean_inbox_cb,
+        )
+    except BaseException:
+        # a failed run must not lose sources it moved out of the inbox
+        restore_moved_sources(stage_root)
+        run_index.close()
+        raise
     # ISSUE #18: machine-readable report (printed at end; human output unchanged)
     if state.OPTS is not None and state.OPTS.json:
-        report = _build_json_report(stage_runs_for_json)
+        report = _build_json_report(stage_runs_for_json, run_index)
         print(json.dumps(report, ensure_ascii=False, sort_keys=True), flush=True)
+    run_index.close()
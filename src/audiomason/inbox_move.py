@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import os
+import shutil
+from pathlib import Path
+from typing import cast
+
+from audiomason.manifest import (
+    JOURNAL_NAME,
+    MANIFEST_NAME,
+    flush_manifest,
+    load_manifest,
+    update_manifest,
+)
+from audiomason.util import out
+
+# Move-instead-of-copy staging (clean_inbox=yes).
+#
+# When the source is going to be deleted from the inbox anyway and inbox and
+# stage share a filesystem, staging renames it into the stage run. The
+# manifest "move" journal records the move:
+#   pending   about to rename (the rename may or may not have happened)
+#   moved     the source lives in the stage now
+#   consumed  FINALIZE cleaned the inbox: the source is meant to be gone
+#   restored  renamed back after a failed, undone or unfinished run
+# restore_moved_source() puts back the source of one stage run still
+# pending/moved, restore_moved_sources() those of every run.
+
+
+def _journal(mf: dict[str, object]) -> dict[str, object]:
+    raw = mf.get("move")
+    return cast(dict[str, object], raw) if isinstance(raw, dict) else {}
+
+
+def can_move(src: Path, stage_run: Path) -> bool:
+    """True when src can be renamed into stage_run (same filesystem)."""
+    try:
+        return src.stat().st_dev == stage_run.stat().st_dev
+    except OSError:
+        return False
+
+
+def move_into_stage(src: Path, dst: Path, stage_run: Path) -> None:
+    """Rename src to dst (inside stage_run), journaled in the stage manifest."""
+    journal = {"from": str(src), "to": str(dst)}
+    update_manifest(stage_run, {"move": {**journal, "state": "pending"}})
+    flush_manifest(stage_run)
+    if dst.is_dir():
+        shutil.rmtree(dst)
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    os.rename(src, dst)
+    update_manifest(stage_run, {"move": {"state": "moved"}})
+    flush_manifest(stage_run)
+
+
+def moved_source(mf: dict[str, object]) -> Path | None:
+    """Where the source was moved to, if it currently lives in the stage."""
+    journal = _journal(mf)
+    to = journal.get("to")
+    if journal.get("state") == "moved" and isinstance(to, str):
+        return Path(to)
+    return None
+
+
+def mark_consumed(stage_run: Path) -> None:
+    update_manifest(stage_run, {"move": {"state": "consumed"}})
+
+
+def holds_moved_source(stage_run: Path) -> bool:
+    """True while stage_run may hold the only copy of its source (pending/moved)."""
+    return _journal(load_manifest(stage_run)).get("state") in ("pending", "moved")
+
+
+def restore_moved_source(stage_run: Path) -> Path | None:
+    """Move stage_run's source back to the inbox if it still lives there; returns it."""
+    journal = _journal(load_manifest(stage_run))
+    frm, to = journal.get("from"), journal.get("to")
+    if journal.get("state") not in ("pending", "moved"):
+        return None
+    if not isinstance(frm, str) or not isinstance(to, str):
+        return None
+    src, dst = Path(frm), Path(to)
+    restored = None
+    if dst.exists() and not src.exists():
+        try:
+            os.rename(dst, src)
+        except OSError as e:
+            out(f"[inbox] could not restore {src}: {e}")
+            return None
+        restored = src
+        out(f"[inbox] restored: {src}")
+    update_manifest(stage_run, {"move": {"state": "restored"}})
+    flush_manifest(stage_run)
+    return restored
+
+
+def restore_moved_sources(stage_root: Path) -> list[Path]:
+    """Move sources of unfinished runs back to the inbox; returns the restored paths."""
+    restored: list[Path] = []
+    if not stage_root.is_dir():
+        return restored
+    # a crashed run may have left only its journal
+    runs = {
+        p.parent for name in (MANIFEST_NAME, JOURNAL_NAME) for p in stage_root.glob(f"*/{name}")
+    }
+    for stage_run in sorted(runs):
+        src = restore_moved_source(stage_run)
+        if src is not None:
+            restored.append(src)
+    return restored
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import cast
+
+from audiomason.audio import TRACK_EXTS, media_duration
+
+# Per-book integrity sidecar: <book>/.audiomason.json
+#
+#   {"version": 1, "files": {"01.mp3": {"size": ..., "mtime_ns": ...,
+#                                        "sha256": "...", "duration": 812.4}}}
+#
+# Written once a book is final (after tags/covers, before publish; publish
+# renames or copystat()s, so size/mtime survive). verify compares stat data
+# (no reads) and re-hashes only with --rehash.
+
+SIDECAR = ".audiomason.json"
+SIDECAR_VERSION = 1
+_CHUNK = 1024 * 1024
+
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as fh:
+        for block in iter(lambda: fh.read(_CHUNK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _book_files(book: Path) -> list[Path]:
+    return sorted(p for p in book.iterdir() if p.is_file() and p.name != SIDECAR)
+
+
+def write_sidecar(book: Path) -> dict[str, object]:
+    """Record size, mtime, sha256 (and duration for tracks) of every file in book."""
+    files: dict[str, object] = {}
+    for p in _book_files(book):
+        st = p.stat()
+        entry: dict[str, object] = {
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "sha256": _sha256(p),
+        }
+        if p.suffix.lower() in TRACK_EXTS:
+            entry["duration"] = media_duration(p)
+        files[p.name] = entry
+    data: dict[str, object] = {"version": SIDECAR_VERSION, "files": files}
+    tmp = book / f"{SIDECAR}.tmp"
+    tmp.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    tmp.replace(book / SIDECAR)
+    return data
+
+
+def load_sidecar(book: Path) -> dict[str, dict[str, object]] | None:
+    """The per-file entries of book's sidecar, or None if it has none (or a bad one)."""
+    try:
+        raw = cast(object, json.loads((book / SIDECAR).read_text(encoding="utf-8")))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(raw, dict):
+        return None
+    files = cast(dict[str, object], raw).get("files")
+    if not isinstance(files, dict):
+        return None
+    return {
+        name: cast(dict[str, object], v)
+        for name, v in cast(dict[str, object], files).items()
+        if isinstance(v, dict)
+    }
+
+
+def check_book(book: Path, *, rehash: bool = False) -> list[str] | None:
+    """Integrity problems of book ("<kind>: <file>"); None when there is no sidecar.
+
+    Without rehash only stat data is compared. With rehash every file is read
+    and its digest decides: a file whose bytes still match is fine even if it
+    was touched.
+    """
+    entries = load_sidecar(book)
+    if entries is None:
+        return None
+    problems: list[str] = []
+    present = {p.name: p for p in _book_files(book)}
+    for name, entry in sorted(entries.items()):
+        p = present.pop(name, None)
+        if p is None:
+            problems.append(f"missing: {name}")
+            continue
+        if rehash:
+            if _sha256(p) != entry.get("sha256"):
+                problems.append(f"corrupt: {name}")
+            continue
+        st = os.stat(p)
+        if st.st_size != entry.get("size") or st.st_mtime_ns != entry.get("mtime_ns"):
+            problems.append(f"changed: {name}")
+    problems.extend(f"untracked: {name}" for name in sorted(present))
+    return problems
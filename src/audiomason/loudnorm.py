@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import json
+import math
+import subprocess
+from pathlib import Path
+from typing import cast
+
+import audiomason.state as state
+from audiomason.stat_cache import StatCache
+from audiomason.util import out, run_cmd
+from audiomason.virtual_stage import input_arg
+
+# EBU R128 loudness normalization.
+#
+# loudnorm_mode=dynamic: one pass, loudnorm adapts gain as it goes.
+# loudnorm_mode=two-pass: an analysis-only pass measures the whole source
+# once; the encode then runs loudnorm in linear mode with those numbers.
+# Measurements live in <cache root>/loudnorm keyed by path/size/mtime, so
+# re-runs and every chapter of a split reuse them.
+
+LOUDNORM_MODES = ("dynamic", "two-pass")
+LOUDNORM_TARGET = "I=-16:LRA=11:TP=-1.5"
+LOUDNORM_DYNAMIC = f"loudnorm={LOUDNORM_TARGET}"
+
+# Bump when the measurement command or stored fields change.
+LOUDNORM_CACHE_VERSION = 1
+LOUDNORM_CACHE_MAX_BYTES = 4 * 1024 * 1024
+_LOUDNORM_CACHE: StatCache | None = None
+
+_MEASURED = ("input_i", "input_lra", "input_tp", "input_thresh", "target_offset")
+
+
+def loudnorm_cache() -> StatCache:
+    global _LOUDNORM_CACHE
+    root = state.OPTS.cache_root if state.OPTS is not None else None
+    ln_root = root / "loudnorm" if root is not None else None
+    if _LOUDNORM_CACHE is None or _LOUDNORM_CACHE.root != ln_root:
+        _LOUDNORM_CACHE = StatCache(
+            ln_root, version=LOUDNORM_CACHE_VERSION, max_bytes=LOUDNORM_CACHE_MAX_BYTES
+        )
+    return _LOUDNORM_CACHE
+
+
+def _parse_stats(stderr: bytes) -> dict[str, str] | None:
+    # loudnorm prints its JSON block last on stderr
+    text = stderr.decode("utf-8", errors="replace")
+    start = text.rfind("{")
+    end = text.rfind("}")
+    if start < 0 or end < start:
+        return None
+    try:
+        raw = cast(object, json.loads(text[start : end + 1]))
+    except ValueError:
+        return None
+    if not isinstance(raw, dict):
+        return None
+    data = cast(dict[str, object], raw)
+    stats: dict[str, str] = {}
+    for k in _MEASURED:
+        v = data.get(k)
+        if not isinstance(v, str):
+            return None
+        try:
+            finite = math.isfinite(float(v))
+        except ValueError:
+            return None
+        if not finite:
+            # -inf for silent input: linear mode cannot use it
+            return None
+        stats[k] = v
+    return stats
+
+
+def loudnorm_measure(src: Path) -> dict[str, str] | None:
+    """Measured loudness of src (first audio stream), cached; None if unavailable."""
+    cached = loudnorm_cache().get(src)
+    if cached is not None and cached.get("target") == LOUDNORM_TARGET:
+        hit = {k: v for k, v in cached.items() if k in _MEASURED and isinstance(v, str)}
+        if len(hit) == len(_MEASURED):
+            return hit
+
+    cmd = [
+        "ffmpeg",
+        "-hide_banner",
+        "-nostdin",
+        "-nostats",
+        "-i",
+        input_arg(src),
+        "-vn",
+        "-map",
+        "0:a:0",
+        "-af",
+        f"{LOUDNORM_DYNAMIC}:print_format=json",
+        "-f",
+        "null",
+        "-",
+    ]
+    if state.OPTS is not None and state.OPTS.dry_run:
+        out("[dry-run] " + " ".join(cmd))
+        return None
+    p = run_cmd(cmd, check=True, stderr=subprocess.PIPE)
+    stats = _parse_stats(p.stderr or b"")
+    if stats is None:
+        out(f"[loudnorm] {src.name}: no usable measurement, using dynamic mode")
+        return None
+    loudnorm_cache().put(src, {"target": LOUDNORM_TARGET, **stats})
+    return stats
+
+
+def loudnorm_filter(src: Path) -> str:
+    """The loudnorm filter to encode src with under the current loudnorm_mode."""
+    if state.OPTS is None or state.OPTS.loudnorm_mode != "two-pass":
+        return LOUDNORM_DYNAMIC
+    m = loudnorm_measure(src)
+    if m is None:
+        return LOUDNORM_DYNAMIC
+    return (
+        f"{LOUDNORM_DYNAMIC}"
+        f":measured_I={m['input_i']}"
+        f":measured_LRA={m['input_lra']}"
+        f":measured_TP={m['input_tp']}"
+        f":measured_thresh={m['input_thresh']}"
+        f":offset={m['target_offset']}"
+        ":linear=true"
+    )
+
+
+def with_loudnorm(cmd: list[str], flt: str) -> list[str]:
+    """cmd with its dynamic loudnorm filter replaced by flt."""
+    return [flt if a == LOUDNORM_DYNAMIC else a for a in cmd]
@@ -1,56 +1,49 @@
 from __future__ import annotations
 
-import hashlib
+import copy
 import json
-import os
+import threading
+import time
 from pathlib import Path
+from types import TracebackType
+from typing import TextIO, cast
 
+MANIFEST_NAME = "manifest.json"
+JOURNAL_NAME = "manifest.journal"
+SCHEMA_VERSION = 1
 
-def source_fingerprint(src: Path) -> str:
-    r = src.expanduser().resolve()
-    h = hashlib.sha256()
-    h.update(str(r).encode("utf-8"))
-    if r.is_file():
-        st = r.stat()
-        h.update(b"|F|")
-        h.update(str(st.st_size).encode("utf-8"))
-        h.update(b"|")
-        h.update(str(st.st_mtime_ns).encode("utf-8"))
-        return h.hexdigest()
-    h.update(b"|D|")
-    # Deterministic directory signature: sorted walk of relpaths + size + mtime_ns
-    for root, dirs, files in os.walk(r):
-        dirs.sort()
-        files.sort()
-        rp = Path(root)
-        for fn in files:
-            p = rp / fn
-            try:
-                st = p.stat()
-            except FileNotFoundError:
-                # Source changed during scan -> produce a different fingerprint deterministically
-                h.update(b"|MISSING|")
-                h.update(str(p.relative_to(r)).encode("utf-8"))
-                continue
-            rel = str(p.relative_to(r)).encode("utf-8")
-            h.update(b"|")
-            h.update(rel)
-            h.update(b"|")
-            h.update(str(st.st_size).encode("utf-8"))
-            h.update(b"|")
-            h.update(str(st.st_mtime_ns).encode("utf-8"))
-    return h.hexdigest()
+# Seconds a session may hold patches in memory before it flushes on its own.
+MANIFEST_FLUSH_SECONDS = 2.0
 
+# Manifest sessions.
+#
+# While a ManifestSession is open for a stage run, load_manifest() and
+# update_manifest() work on its in-memory copy: a patch is merged in memory
+# and appended as one line to manifest.journal, and manifest.json is only
+# rewritten at checkpoints (flush()), after MANIFEST_FLUSH_SECONDS, or when
+# the session closes. A crash loses nothing: loading replays the journal on
+# top of manifest.json. Merging is last-writer-wins per key, so replaying
+# patches that already reached manifest.json (crash between the rewrite and
+# dropping the journal) gives the same result.
 
-MANIFEST_NAME = "manifest.json"
-SCHEMA_VERSION = 1
+_SESSIONS: dict[Path, ManifestSession] = {}
+_SESSIONS_LOCK = threading.Lock()
 
 
 def manifest_path(stage_run: Path) -> Path:
     return stage_run / MANIFEST_NAME
 
 
-def load_manifest(stage_run: Path) -> dict[str, object]:
+def journal_path(stage_run: Path) -> Path:
+    return stage_run / JOURNAL_NAME
+
+
+def _active(stage_run: Path) -> ManifestSession | None:
+    with _SESSIONS_LOCK:
+        return _SESSIONS.get(stage_run)
+
+
+def _read_manifest(stage_run: Path) -> dict[str, object]:
     p = manifest_path(stage_run)
     if not p.exists():
         return {}
@@ -62,6 +55,35 @@ def load_manifest(stage_run: Path) -> dict[str, object]:
         return {}
 
 
+def _replay_journal(stage_run: Path, cur: dict[str, object]) -> bool:
+    """Merge journaled patches into cur; True when there were any."""
+    try:
+        lines = journal_path(stage_run).read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return False
+    replayed = False
+    for line in lines:
+        try:
+            raw = cast(object, json.loads(line))
+        except ValueError:
+            # torn last line of a crashed run
+            break
+        if not isinstance(raw, dict):
+            continue
+        _merge_patch(cur, cast(dict[str, object], raw))
+        replayed = True
+    return replayed
+
+
+def load_manifest(stage_run: Path) -> dict[str, object]:
+    session = _active(stage_run)
+    if session is not None:
+        return session.load()
+    cur = _read_manifest(stage_run)
+    _replay_journal(stage_run, cur)
+    return cur
+
+
 def _deep_merge(dst: dict[str, object], src: dict[str, object]) -> dict[str, object]:
     for k, v in src.items():
         if isinstance(v, dict) and isinstance(dst.get(k), dict):
@@ -71,7 +93,13 @@ def _deep_merge(dst: dict[str, object], src: dict[str, object]) -> dict[str, obj
     return dst
 
 
-def write_manifest_atomic(stage_run: Path, data: dict[str, object]) -> None:
+def _merge_patch(cur: dict[str, object], patch: dict[str, object]) -> None:
+    if "schema_version" not in cur:
+        cur["schema_version"] = SCHEMA_VERSION
+    _deep_merge(cur, copy.deepcopy(patch))
+
+
+def _write_manifest(stage_run: Path, data: dict[str, object]) -> None:
     stage_run.mkdir(parents=True, exist_ok=True)
     p = manifest_path(stage_run)
     tmp = p.with_suffix(p.suffix + ".tmp")
@@ -81,11 +109,109 @@ def write_manifest_atomic(stage_run: Path, data: dict[str, object]) -> None:
     tmp.replace(p)
 
 
+def write_manifest_atomic(stage_run: Path, data: dict[str, object]) -> None:
+    session = _active(stage_run)
+    if session is not None:
+        session.replace(data)
+        return
+    _write_manifest(stage_run, data)
+    journal_path(stage_run).unlink(missing_ok=True)
+
+
 def update_manifest(stage_run: Path, patch: dict[str, object]) -> None:
-    cur: dict[str, object] = load_manifest(stage_run)
-    if not cur:
-        cur = {"schema_version": SCHEMA_VERSION}
-    elif "schema_version" not in cur:
-        cur["schema_version"] = SCHEMA_VERSION
-    _deep_merge(cur, patch)
+    session = _active(stage_run)
+    if session is not None:
+        session.update(patch)
+        return
+    cur = load_manifest(stage_run)
+    _merge_patch(cur, patch)
     write_manifest_atomic(stage_run, cur)
+
+
+def flush_manifest(stage_run: Path) -> None:
+    """Checkpoint: write out the open session of stage_run, if any."""
+    session = _active(stage_run)
+    if session is not None:
+        session.flush()
+
+
+class ManifestSession:
+    """In-memory manifest of one stage run with a journal and batched rewrites."""
+
+    def __init__(self, stage_run: Path, *, flush_seconds: float = MANIFEST_FLUSH_SECONDS) -> None:
+        self.stage_run = stage_run
+        self.flush_seconds = flush_seconds
+        self._lock = threading.RLock()
+        self._data: dict[str, object] = {}
+        self._dirty = False
+        self._journal: TextIO | None = None
+        self._flushed_at = time.monotonic()
+
+    def __enter__(self) -> ManifestSession:
+        return self.open()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def open(self) -> ManifestSession:
+        with self._lock:
+            self._data = _read_manifest(self.stage_run)
+            self._dirty = _replay_journal(self.stage_run, self._data)
+            self._flushed_at = time.monotonic()
+        with _SESSIONS_LOCK:
+            _SESSIONS[self.stage_run] = self
+        return self
+
+    def close(self) -> None:
+        with _SESSIONS_LOCK:
+            if _SESSIONS.get(self.stage_run) is self:
+                del _SESSIONS[self.stage_run]
+        self.flush()
+
+    def load(self) -> dict[str, object]:
+        with self._lock:
+            return copy.deepcopy(self._data)
+
+    def update(self, patch: dict[str, object]) -> None:
+        with self._lock:
+            _merge_patch(self._data, patch)
+            self._dirty = True
+            if self._journal is None:
+                self.stage_run.mkdir(parents=True, exist_ok=True)
+                self._journal = journal_path(self.stage_run).open("a", encoding="utf-8")
+            self._journal.write(json.dumps(patch, ensure_ascii=False, sort_keys=True) + "\n")
+            self._journal.flush()
+            if time.monotonic() - self._flushed_at >= self.flush_seconds:
+                self.flush()
+
+    def replace(self, data: dict[str, object]) -> None:
+        """Replace the whole manifest (written out right away)."""
+        with self._lock:
+            self._data = copy.deepcopy(data)
+            self._dirty = True
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._dirty:
+                _write_manifest(self.stage_run, self._data)
+                self._dirty = False
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            journal_path(self.stage_run).unlink(missing_ok=True)
+            self._flushed_at = time.monotonic()
+
+    def discard(self) -> None:
+        """Forget the manifest: the stage run is being deleted."""
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            self._data = {}
+            self._dirty = False
@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO
+
+from audiomason.virtual_stage import open_media
+
+# In-process MP4/M4B chapter reader.
+#
+# Understands Nero chapters (moov/udta/chpl) and QuickTime chapter tracks
+# (a text track referenced by another track's tref/chap). Output mirrors the
+# "chapters" list of `ffprobe -show_chapters` closely enough for
+# audio.m4a_split_by_chapters(): start_time/end_time as decimal strings.
+
+# Refuse to load sample tables larger than this (corrupt or hostile files).
+_MAX_TABLE_ENTRIES = 1_000_000
+
+
+class Mp4ParseError(ValueError):
+    pass
+
+
+@dataclass
+class _Track:
+    track_id: int = 0
+    timescale: int = 0
+    handler: bytes = b""
+    chap_refs: list[int] = field(default_factory=list)
+    # stbl bounds; the tables are only decoded for the chapter track
+    stbl: tuple[int, int] | None = None
+    stts: list[tuple[int, int]] = field(default_factory=list)
+    sizes: list[int] = field(default_factory=list)
+    stsc: list[tuple[int, int]] = field(default_factory=list)
+    chunk_offsets: list[int] = field(default_factory=list)
+
+
+def _u(data: bytes, off: int = 0, n: int = 4) -> int:
+    # big-endian unsigned int of n bytes (MP4 atoms are big-endian throughout)
+    return int.from_bytes(data[off : off + n], "big")
+
+
+def _read(fh: BinaryIO, pos: int, n: int) -> bytes:
+    fh.seek(pos)
+    data = fh.read(n)
+    if len(data) != n:
+        raise Mp4ParseError("truncated atom")
+    return data
+
+
+def _atoms(fh: BinaryIO, start: int, end: int) -> Iterator[tuple[bytes, int, int]]:
+    """Yield (type, payload_start, atom_end) for the atoms in [start, end)."""
+    pos = start
+    while pos + 8 <= end:
+        hdr = _read(fh, pos, 8)
+        size, typ = _u(hdr), hdr[4:8]
+        hsize = 8
+        if size == 1:
+            size = _u(_read(fh, pos + 8, 8), n=8)
+            hsize = 16
+        elif size == 0:
+            size = end - pos
+        if size < hsize or pos + size > end:
+            raise Mp4ParseError(f"bad atom size for {typ!r}")
+        yield typ, pos + hsize, pos + size
+        pos += size
+
+
+def _child(fh: BinaryIO, start: int, end: int, typ: bytes) -> tuple[int, int] | None:
+    for t, ps, pe in _atoms(fh, start, end):
+        if t == typ:
+            return ps, pe
+    return None
+
+
+def _table(fh: BinaryIO, ps: int, widths: tuple[int, ...]) -> list[tuple[int, ...]]:
+    # full box: version/flags, entry count, entries of fixed-width fields
+    count = _u(_read(fh, ps + 4, 4))
+    if count > _MAX_TABLE_ENTRIES:
+        raise Mp4ParseError("sample table too large")
+    item = sum(widths)
+    raw = _read(fh, ps + 8, count * item)
+    rows: list[tuple[int, ...]] = []
+    for base in range(0, count * item, item):
+        row: list[int] = []
+        off = base
+        for w in widths:
+            row.append(_u(raw, off, w))
+            off += w
+        rows.append(tuple(row))
+    return rows
+
+
+def _parse_mvhd(fh: BinaryIO, ps: int) -> tuple[int, int]:
+    version = _read(fh, ps, 1)[0]
+    if version == 1:
+        raw = _read(fh, ps + 20, 12)
+        return _u(raw), _u(raw, 4, 8)
+    raw = _read(fh, ps + 12, 8)
+    return _u(raw), _u(raw, 4)
+
+
+def _parse_trak(fh: BinaryIO, ps: int, pe: int) -> _Track:
+    tr = _Track()
+    for t, cps, cpe in _atoms(fh, ps, pe):
+        if t == b"tkhd":
+            version = _read(fh, cps, 1)[0]
+            off = 20 if version == 1 else 12
+            tr.track_id = _u(_read(fh, cps + off, 4))
+        elif t == b"tref":
+            chap = _child(fh, cps, cpe, b"chap")
+            if chap is not None:
+                raw = _read(fh, chap[0], ((chap[1] - chap[0]) // 4) * 4)
+                tr.chap_refs = [_u(raw, i) for i in range(0, len(raw), 4)]
+        elif t == b"mdia":
+            _parse_mdia(fh, cps, cpe, tr)
+    return tr
+
+
+def _parse_mdia(fh: BinaryIO, ps: int, pe: int, tr: _Track) -> None:
+    for t, cps, cpe in _atoms(fh, ps, pe):
+        if t == b"mdhd":
+            version = _read(fh, cps, 1)[0]
+            off = 20 if version == 1 else 12
+            tr.timescale = _u(_read(fh, cps + off, 4))
+        elif t == b"hdlr":
+            tr.handler = _read(fh, cps + 8, 4)
+        elif t == b"minf":
+            tr.stbl = _child(fh, cps, cpe, b"stbl")
+
+
+def _parse_stbl(fh: BinaryIO, ps: int, pe: int, tr: _Track) -> None:
+    for t, cps, _ in _atoms(fh, ps, pe):
+        if t == b"stts":
+            tr.stts = [(r[0], r[1]) for r in _table(fh, cps, (4, 4))]
+        elif t == b"stsz":
+            hdr = _read(fh, cps + 4, 8)
+            sample_size, count = _u(hdr), _u(hdr, 4)
+            if count > _MAX_TABLE_ENTRIES:
+                raise Mp4ParseError("sample table too large")
+            if sample_size:
+                tr.sizes = [sample_size] * count
+            else:
+                raw = _read(fh, cps + 12, count * 4)
+                tr.sizes = [_u(raw, i) for i in range(0, count * 4, 4)]
+        elif t == b"stsc":
+            tr.stsc = [(r[0], r[1]) for r in _table(fh, cps, (4, 4, 4))]
+        elif t == b"stco":
+            tr.chunk_offsets = [r[0] for r in _table(fh, cps, (4,))]
+        elif t == b"co64":
+            tr.chunk_offsets = [r[0] for r in _table(fh, cps, (8,))]
+
+
+def _sample_offsets(tr: _Track) -> list[int]:
+    offsets: list[int] = []
+    si = 0
+    for ci, chunk_off in enumerate(tr.chunk_offsets, 1):
+        per = 0
+        for first, n in tr.stsc:
+            if first <= ci:
+                per = n
+            else:
+                break
+        pos = chunk_off
+        for _ in range(per):
+            if si >= len(tr.sizes):
+                return offsets
+            offsets.append(pos)
+            pos += tr.sizes[si]
+            si += 1
+    return offsets
+
+
+def _decode_title(raw: bytes) -> str:
+    if len(raw) < 2:
+        return ""
+    n = _u(raw, 0, 2)
+    text = raw[2 : 2 + n]
+    if text.startswith((b"\xfe\xff", b"\xff\xfe")):
+        return text.decode("utf-16", errors="replace")
+    return text.decode("utf-8", errors="replace")
+
+
+def _chapter(i: int, start: float, end: float, title: str) -> dict[str, object]:
+    return {
+        "id": i,
+        "start_time": f"{start:.6f}",
+        "end_time": f"{end:.6f}",
+        "tags": {"title": title},
+    }
+
+
+def _qt_chapters(fh: BinaryIO, tr: _Track) -> list[dict[str, object]]:
+    if tr.timescale <= 0 or not tr.stts:
+        return []
+    starts: list[int] = []
+    durs: list[int] = []
+    t = 0
+    for count, delta in tr.stts:
+        for _ in range(count):
+            starts.append(t)
+            durs.append(delta)
+            t += delta
+    offsets = _sample_offsets(tr)
+    out: list[dict[str, object]] = []
+    for i, (st, d) in enumerate(zip(starts, durs, strict=True)):
+        title = ""
+        if i < len(offsets) and i < len(tr.sizes):
+            title = _decode_title(_read(fh, offsets[i], tr.sizes[i]))
+        out.append(_chapter(i, st / tr.timescale, (st + d) / tr.timescale, title))
+    return out
+
+
+def _nero_chapters(fh: BinaryIO, ps: int, pe: int, total: float) -> list[dict[str, object]]:
+    version = _read(fh, ps, 1)[0]
+    pos = ps + 4 + (4 if version else 0)
+    count = _read(fh, pos, 1)[0]
+    pos += 1
+    marks: list[tuple[float, str]] = []
+    for _ in range(count):
+        start = _u(_read(fh, pos, 8), n=8)
+        n = _read(fh, pos + 8, 1)[0]
+        title = _read(fh, pos + 9, n).decode("utf-8", errors="replace")
+        pos += 9 + n
+        if pos > pe:
+            raise Mp4ParseError("truncated chpl")
+        marks.append((start / 10_000_000, title))
+    out: list[dict[str, object]] = []
+    for i, (st, title) in enumerate(marks):
+        end = marks[i + 1][0] if i + 1 < len(marks) else total
+        out.append(_chapter(i, st, end, title))
+    return out
+
+
+def read_chapters(fh: BinaryIO, size: int) -> list[dict[str, object]]:
+    """Chapters of the MP4 stream in fh[0:size]; raises Mp4ParseError if not an MP4."""
+    moov = _child(fh, 0, size, b"moov")
+    if moov is None:
+        raise Mp4ParseError("no moov atom")
+
+    timescale = 0
+    duration = 0
+    chpl: tuple[int, int] | None = None
+    tracks: list[_Track] = []
+    for t, ps, pe in _atoms(fh, *moov):
+        if t == b"mvhd":
+            timescale, duration = _parse_mvhd(fh, ps)
+        elif t == b"udta":
+            chpl = _child(fh, ps, pe, b"chpl")
+        elif t == b"trak":
+            tracks.append(_parse_trak(fh, ps, pe))
+
+    if chpl is not None:
+        total = duration / timescale if timescale > 0 else 0.0
+        ch = _nero_chapters(fh, chpl[0], chpl[1], total)
+        if ch:
+            return ch
+
+    # Audio sample tables of a long book exceed _MAX_TABLE_ENTRIES, so only
+    # the referenced text track gets its stbl decoded.
+    refs = {r for tr in tracks for r in tr.chap_refs}
+    for tr in tracks:
+        if tr.track_id in refs and tr.handler in {b"text", b"sbtl"}:
+            if tr.stbl is not None:
+                _parse_stbl(fh, tr.stbl[0], tr.stbl[1], tr)
+            return _qt_chapters(fh, tr)
+    return []
+
+
+def read_mp4_chapters(path: Path) -> list[dict[str, object]] | None:
+    """Chapters of an MP4/M4A/M4B file, or None when the file cannot be parsed."""
+    try:
+        with open_media(path) as fh:
+            return read_chapters(fh, path.stat().st_size)
+    except (OSError, Mp4ParseError):
+        return None
@@ -77,7 +77,16 @@ def _defaults_for(cfg: _Cfg) -> dict[str, Path]:
 # ======================
 # Archive extensions
 # ======================
-ARCHIVE_EXTS = {".zip", ".rar", ".7z"}
+ARCHIVE_EXTS = {".zip", ".rar", ".7z", ".tar", ".gz", ".tgz", ".tbz2", ".bz2", ".txz", ".xz"}
+# bare compressors only count as archives when they wrap a tarball
+_TAR_ONLY_EXTS = {".gz", ".bz2", ".xz"}
+
+
+def is_archive(p: Path) -> bool:
+    ext = p.suffix.lower()
+    if ext in _TAR_ONLY_EXTS:
+        return p.stem.lower().endswith(".tar")
+    return ext in ARCHIVE_EXTS
 
 
 def _ensure_abs(label: str, p: Path) -> None:
@@ -1 +1,72 @@
-"""Publishing logic (placeholder)."""
+"""Publishing: move a finished book directory into the library atomically."""
+
+from __future__ import annotations
+
+import errno
+import os
+import shutil
+from pathlib import Path
+
+from audiomason.filecopy import Copier, copy_tree
+
+# Library scanners (audiobookshelf, ...) must never see a half-written book:
+# the final directory appears in one rename(2). Same filesystem => the book
+# directory itself is renamed (O(1)); otherwise it is copied into a hidden
+# sibling of the target, fsynced, and that is renamed into place.
+
+
+def _fsync_path(p: Path) -> None:
+    fd = os.open(p, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _fsync_tree(root: Path) -> None:
+    for dirpath, _dirs, files in os.walk(root):
+        for fn in files:
+            _fsync_path(Path(dirpath) / fn)
+        _fsync_path(Path(dirpath))
+
+
+def _hidden(target: Path, tag: str) -> Path:
+    return target.with_name(f".{target.name}.{tag}-{os.getpid()}")
+
+
+def publish_dir(src: Path, dst: Path, *, workers: int = 4) -> str:
+    """Move directory src to dst, replacing an existing dst; returns "rename" or "copy"."""
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    old: Path | None = None
+    if dst.exists():
+        # keep the previous version until the new one is in place
+        old = _hidden(dst, "old")
+        os.rename(dst, old)
+    try:
+        try:
+            os.rename(src, dst)
+            how = "rename"
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            tmp = _hidden(dst, "publishing")
+            if tmp.exists():
+                shutil.rmtree(tmp)
+            tmp.mkdir()
+            try:
+                copy_tree(src, tmp, Copier(), workers=workers)
+                _fsync_tree(tmp)
+                os.rename(tmp, dst)
+            except BaseException:
+                shutil.rmtree(tmp, ignore_errors=True)
+                raise
+            shutil.rmtree(src, ignore_errors=True)
+            how = "copy"
+        _fsync_path(dst.parent)
+    except BaseException:
+        if old is not None and not dst.exists():
+            os.rename(old, dst)
+        raise
+    if old is not None:
+        shutil.rmtree(old, ignore_errors=True)
+    return how
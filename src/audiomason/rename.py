@@ -35,15 +35,16 @@ def natural_sort(files: list[Path]) -> list[Path]:
 
 
 def rename_sequential(mp3dir: Path, files: list[Path]) -> list[Path]:
+    # NN.<ext>: the extension is kept (mp3, or m4b/ogg for stream-copied tracks)
     tmp: list[Path] = []
     for i, f in enumerate(files, 1):
-        t = mp3dir / f".__tmp__{i:04d}.mp3"
+        t = mp3dir / f".__tmp__{i:04d}{f.suffix.lower()}"
         f.rename(t)
         tmp.append(t)
 
     out_files: list[Path] = []
     for i, t in enumerate(tmp, 1):
-        f = mp3dir / f"{i:02d}.mp3"
+        f = mp3dir / f"{i:02d}{t.suffix}"
         t.rename(f)
         out_files.append(f)
 
@@ -0,0 +1,430 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import cast
+
+from audiomason.manifest import JOURNAL_NAME, MANIFEST_NAME, load_manifest
+from audiomason.util import out
+
+# Run index: one SQLite database per stage root (<stage root>/_state) with a
+# row per stage run (source, fingerprint, book lists, decisions, state) and a
+# row per book (status, timings, book_meta answers).
+#
+# manifest.json stays the source of truth: rows are derived from manifests
+# (record()) whenever the import writes a checkpoint, so the index can always
+# be rebuilt from the stage (rebuild()). Runs whose stage was cleaned after a
+# successful import only live on in the index (state "cleaned").
+#
+# Run states:
+#   staged   staged, nothing processed yet
+#   partial  some picked books processed or started
+#   done     every picked book processed
+#   cleaned  done and the stage run was deleted
+
+RUN_INDEX_DIR = "_state"
+RUN_INDEX_NAME = "run_index.sqlite3"
+RUN_INDEX_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    slug TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    stem TEXT NOT NULL,
+    path TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    detected TEXT NOT NULL,
+    picked TEXT NOT NULL,
+    processed TEXT NOT NULL,
+    decisions TEXT NOT NULL,
+    state TEXT NOT NULL,
+    updated_ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_state ON runs (state);
+CREATE TABLE IF NOT EXISTS books (
+    slug TEXT NOT NULL,
+    label TEXT NOT NULL,
+    meta TEXT,
+    status TEXT NOT NULL,
+    started_ns INTEGER,
+    seconds REAL,
+    PRIMARY KEY (slug, label)
+);
+"""
+
+
+def run_index_path(stage_root: Path) -> Path:
+    return stage_root / RUN_INDEX_DIR / RUN_INDEX_NAME
+
+
+@dataclass(frozen=True)
+class IndexedBook:
+    label: str
+    meta: dict[str, object] | None  # book_meta answers, None until asked
+    status: str  # pending | started | processed
+    started_ns: int | None = None
+    seconds: float | None = None
+
+
+@dataclass(frozen=True)
+class IndexedRun:
+    slug: str
+    name: str
+    stem: str
+    path: str
+    fingerprint: str
+    detected: tuple[str, ...]
+    picked: tuple[str, ...]
+    processed: tuple[str, ...]
+    decisions: dict[str, object]
+    state: str
+    books: tuple[IndexedBook, ...] = ()
+    updated_ns: int = 0
+
+
+def _dict(v: object) -> dict[str, object]:
+    return cast(dict[str, object], v) if isinstance(v, dict) else {}
+
+
+def _strs(v: object) -> tuple[str, ...]:
+    if not isinstance(v, list):
+        return ()
+    return tuple(str(x) for x in cast(list[object], v))
+
+
+def _run_state(picked: tuple[str, ...], books: tuple[IndexedBook, ...]) -> str:
+    status = {b.label: b.status for b in books}
+    if picked and all(status.get(lbl) == "processed" for lbl in picked):
+        return "done"
+    if any(b.status != "pending" for b in books):
+        return "partial"
+    return "staged"
+
+
+def run_from_manifest(slug: str, mf: dict[str, object]) -> IndexedRun:
+    """The index view of one stage run manifest."""
+    src = _dict(mf.get("source"))
+    binfo = _dict(mf.get("books"))
+    bm = _dict(mf.get("book_meta"))
+    timings = _dict(binfo.get("timings"))
+    picked = _strs(binfo.get("picked"))
+    processed = _strs(binfo.get("processed"))
+    books: list[IndexedBook] = []
+    for label in sorted({*picked, *bm}):
+        t = _dict(timings.get(label))
+        started, seconds = t.get("started_ns"), t.get("seconds")
+        if label in processed:
+            status = "processed"
+        elif started is not None:
+            status = "started"
+        else:
+            status = "pending"
+        books.append(
+            IndexedBook(
+                label=label,
+                meta=_dict(bm[label]) if label in bm else None,
+                status=status,
+                started_ns=started if isinstance(started, int) else None,
+                seconds=float(seconds) if isinstance(seconds, (int, float)) else None,
+            )
+        )
+    return IndexedRun(
+        slug=slug,
+        name=str(src.get("name") or ""),
+        stem=str(src.get("stem") or ""),
+        path=str(src.get("path") or ""),
+        fingerprint=str(src.get("fingerprint") or ""),
+        detected=_strs(binfo.get("detected")),
+        picked=picked,
+        processed=processed,
+        decisions=_dict(mf.get("decisions")),
+        state=_run_state(picked, tuple(books)),
+        books=tuple(books),
+    )
+
+
+class RunIndex:
+    """Run index of one stage root. Write failures disable it, never the import."""
+
+    def __init__(self, stage_root: Path) -> None:
+        self.stage_root = stage_root
+        self.path = run_index_path(stage_root)
+        self._conn: sqlite3.Connection | None = None
+        self._broken = False
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10)
+            version = cast(tuple[int], conn.execute("PRAGMA user_version").fetchone())[0]
+            if version != RUN_INDEX_VERSION:
+                # derived data: an index of another layout is simply rebuilt
+                conn.executescript("DROP TABLE IF EXISTS runs; DROP TABLE IF EXISTS books;")
+                conn.execute(f"PRAGMA user_version = {RUN_INDEX_VERSION}")
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.executescript(_SCHEMA)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    @property
+    def broken(self) -> bool:
+        """True once the index failed: readers fall back to the manifests."""
+        return self._broken
+
+    def _fail(self, what: str, e: sqlite3.Error) -> None:
+        self._broken = True
+        out(f"[index] disabled ({what}): {e}")
+
+    def _write(self, what: str, sql: list[tuple[str, tuple[object, ...]]]) -> None:
+        if self._broken:
+            return
+        try:
+            conn = self._db()
+            with conn:
+                for stmt, params in sql:
+                    conn.execute(stmt, params)
+        except sqlite3.Error as e:
+            self._fail(what, e)
+
+    def record(self, stage_run: Path, mf: dict[str, object]) -> None:
+        """Replace the rows of stage_run with what its manifest says."""
+        slug = stage_run.name
+        if not mf:
+            self.forget(stage_run)
+            return
+        run = run_from_manifest(slug, mf)
+        sql: list[tuple[str, tuple[object, ...]]] = [
+            (
+                "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    slug,
+                    run.name,
+                    run.stem,
+                    run.path,
+                    run.fingerprint,
+                    json.dumps(run.detected, ensure_ascii=False),
+                    json.dumps(run.picked, ensure_ascii=False),
+                    json.dumps(run.processed, ensure_ascii=False),
+                    json.dumps(run.decisions, ensure_ascii=False, sort_keys=True),
+                    run.state,
+                    time.time_ns(),
+                ),
+            ),
+            ("DELETE FROM books WHERE slug = ?", (slug,)),
+        ]
+        for b in run.books:
+            meta = (
+                None if b.meta is None else json.dumps(b.meta, ensure_ascii=False, sort_keys=True)
+            )
+            sql.append(
+                (
+                    "INSERT INTO books VALUES (?, ?, ?, ?, ?, ?)",
+                    (slug, b.label, meta, b.status, b.started_ns, b.seconds),
+                )
+            )
+        self._write("record", sql)
+
+    def record_book(
+        self,
+        stage_run: Path,
+        label: str,
+        status: str,
+        *,
+        started_ns: int | None = None,
+        seconds: float | None = None,
+    ) -> None:
+        """Update one book (and its run's processed list) without re-reading the manifest."""
+        slug = stage_run.name
+        sql: list[tuple[str, tuple[object, ...]]] = [
+            (
+                "UPDATE books SET status = ?, started_ns = COALESCE(?, started_ns),"
+                " seconds = COALESCE(?, seconds) WHERE slug = ? AND label = ?",
+                (status, started_ns, seconds, slug, label),
+            ),
+        ]
+        if status == "processed":
+            sql.append(
+                (
+                    "UPDATE runs SET processed = json_insert(processed, '$[#]', ?)"
+                    " WHERE slug = ? AND NOT EXISTS"
+                    " (SELECT 1 FROM json_each(processed) WHERE value = ?)",
+                    (label, slug, label),
+                )
+            )
+        sql.append(
+            (
+                "UPDATE runs SET updated_ns = ?, state = CASE WHEN json_array_length(picked) > 0"
+                " AND NOT EXISTS (SELECT 1 FROM json_each(picked) WHERE value NOT IN"
+                " (SELECT value FROM json_each(processed))) THEN 'done' ELSE 'partial' END"
+                " WHERE slug = ?",
+                (time.time_ns(), slug),
+            )
+        )
+        self._write("book", sql)
+
+    def mark_cleaned(self, stage_run: Path) -> None:
+        self._write(
+            "clean",
+            [
+                (
+                    "UPDATE runs SET state = 'cleaned', updated_ns = ? WHERE slug = ?",
+                    (time.time_ns(), stage_run.name),
+                )
+            ],
+        )
+
+    def forget(self, stage_run: Path) -> None:
+        slug = stage_run.name
+        self._write(
+            "forget",
+            [
+                ("DELETE FROM runs WHERE slug = ?", (slug,)),
+                ("DELETE FROM books WHERE slug = ?", (slug,)),
+            ],
+        )
+
+    def rebuild(self) -> int:
+        """Re-derive the index from the manifests in the stage root; returns the run count."""
+        runs = _stage_runs(self.stage_root)
+        self._broken = False
+        self._write("rebuild", [("DELETE FROM runs", ()), ("DELETE FROM books", ())])
+        for stage_run in runs:
+            self.record(stage_run, load_manifest(stage_run))
+        return len(runs)
+
+    def runs(self, slugs: list[str] | None = None) -> dict[str, IndexedRun]:
+        """Indexed runs by slug (all, or only the given ones); empty once broken."""
+        if self._broken:
+            return {}
+        try:
+            return self._runs(slugs)
+        except sqlite3.Error as e:
+            self._fail("read", e)
+            return {}
+
+    def _runs(self, slugs: list[str] | None) -> dict[str, IndexedRun]:
+        conn = self._db()
+        where = ""
+        params: tuple[object, ...] = ()
+        if slugs is not None:
+            where = " WHERE slug IN (SELECT value FROM json_each(?))"
+            params = (json.dumps(slugs, ensure_ascii=False),)
+        rows = cast(
+            list[tuple[str, str, str, str, str, str, str, str, str, str, int]],
+            conn.execute(f"SELECT * FROM runs{where}", params).fetchall(),
+        )
+        books: dict[str, list[IndexedBook]] = {}
+        book_rows = cast(
+            list[tuple[str, str, str | None, str, int | None, float | None]],
+            conn.execute(f"SELECT * FROM books{where} ORDER BY slug, label", params).fetchall(),
+        )
+        for slug, label, meta, status, started_ns, seconds in book_rows:
+            books.setdefault(slug, []).append(
+                IndexedBook(
+                    label=label,
+                    meta=None if meta is None else _dict(cast(object, json.loads(meta))),
+                    status=status,
+                    started_ns=started_ns,
+                    seconds=seconds,
+                )
+            )
+        found: dict[str, IndexedRun] = {}
+        for slug, name, stem, path, fp, det, pick, proc, dec, st, updated in rows:
+            found[slug] = IndexedRun(
+                slug=slug,
+                name=name,
+                stem=stem,
+                path=path,
+                fingerprint=fp,
+                detected=_strs(cast(object, json.loads(det))),
+                picked=_strs(cast(object, json.loads(pick))),
+                processed=_strs(cast(object, json.loads(proc))),
+                decisions=_dict(cast(object, json.loads(dec))),
+                state=st,
+                books=tuple(books.get(slug, ())),
+                updated_ns=updated,
+            )
+        return found
+
+    def progress(self) -> dict[str, tuple[int, int]]:
+        """(processed, picked) book counts of every half-done run, by slug; empty once broken."""
+        if self._broken:
+            return {}
+        try:
+            rows = cast(
+                list[tuple[str, int, int]],
+                self._db()
+                .execute(
+                    "SELECT slug, json_array_length(processed), json_array_length(picked)"
+                    " FROM runs WHERE state = 'partial'"
+                )
+                .fetchall(),
+            )
+        except sqlite3.Error as e:
+            self._fail("read", e)
+            return {}
+        return {slug: (done, picked) for slug, done, picked in rows}
+
+
+def _stage_runs(stage_root: Path) -> list[Path]:
+    # a crashed run may have left only its journal
+    return sorted(
+        {p.parent for name in (MANIFEST_NAME, JOURNAL_NAME) for p in stage_root.glob(f"*/{name}")}
+    )
+
+
+def _fmt_seconds(books: tuple[IndexedBook, ...]) -> str:
+    total = sum(b.seconds for b in books if b.seconds is not None)
+    return f"{total:.0f}s" if total else "-"
+
+
+def show_status(stage_root: Path, *, rebuild: bool = False, as_json: bool = False) -> int:
+    """`audiomason status`: one line per stage run, from the run index."""
+    index = RunIndex(stage_root)
+    try:
+        if rebuild or not index.path.exists():
+            n = index.rebuild()
+            if not as_json:
+                out(f"[status] index rebuilt from {n} manifest(s)")
+        found = index.runs()
+        if index.broken:
+            found = {
+                sr.name: run_from_manifest(sr.name, load_manifest(sr))
+                for sr in _stage_runs(stage_root)
+            }
+        runs = [found[slug] for slug in sorted(found)]
+    finally:
+        index.close()
+    if as_json:
+        payload = [
+            {
+                "slug": r.slug,
+                "name": r.name,
+                "state": r.state,
+                "books_picked": len(r.picked),
+                "books_processed": len(r.processed),
+                "books": {b.label: b.status for b in r.books},
+            }
+            for r in runs
+        ]
+        print(json.dumps(payload, ensure_ascii=False, sort_keys=True), flush=True)
+        return 0
+    counts: dict[str, int] = {}
+    for r in runs:
+        counts[r.state] = counts.get(r.state, 0) + 1
+        out(
+            f"[status] {r.slug}: {r.state} {len(r.processed)}/{len(r.picked)} books,"
+            f" {_fmt_seconds(r.books)} ({r.name})"
+        )
+    states = ", ".join(f"{s}={counts.get(s, 0)}" for s in ("staged", "partial", "done", "cleaned"))
+    out(f"[status] runs={len(runs)}, {states}")
+    return 0
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+# libmp3lame itself is single-threaded; extra ffmpeg threads only speed up
+# decoding/filtering, so more than this per process is wasted.
+MAX_THREADS_PER_PROCESS = 8
+
+
+@dataclass(frozen=True)
+class TranscodeSchedule:
+    """How a list of ffmpeg jobs shares the cpu_cores budget.
+
+    `names`, `threads` and `durations` are aligned with the work list passed
+    to plan_transcodes(); a duration is None when it could not be probed.
+    """
+
+    cores: int
+    workers: int
+    names: tuple[str, ...]
+    threads: tuple[int, ...]
+    durations: tuple[float | None, ...]
+
+    def to_manifest(self) -> dict[str, object]:
+        return {
+            "cores": self.cores,
+            "workers": self.workers,
+            "files": [
+                {
+                    "name": name,
+                    "duration": (round(d, 3) if d is not None else None),
+                    "threads": t,
+                }
+                for name, d, t in zip(self.names, self.durations, self.threads, strict=True)
+            ],
+        }
+
+
+def plan_transcodes(
+    cores: int,
+    durations: list[float | None],
+    names: list[str] | None = None,
+    *,
+    max_workers: int | None = None,
+) -> TranscodeSchedule:
+    """Decide process count and per-process -threads for a set of encodes.
+
+    Many short files => one process per core with a single thread each.
+    Few or long files => fewer processes, each getting a larger share; a job
+    longer than the average gets proportionally more threads so it does not
+    become the tail of the batch. Any `workers` jobs running together stay
+    within `cores` threads.
+    """
+    cores = max(1, cores)
+    n = len(durations)
+    labels = tuple(names) if names is not None else tuple(f"#{i}" for i in range(1, n + 1))
+    if n == 0:
+        return TranscodeSchedule(cores=cores, workers=1, names=(), threads=(), durations=())
+
+    workers = min(n, cores, max_workers if max_workers is not None else n)
+    cap = min(cores, MAX_THREADS_PER_PROCESS)
+    base = max(1, cores // workers)
+
+    known = [d for d in durations if d is not None and d > 0]
+    mean = sum(known) / len(known) if known else None
+
+    threads: list[int] = []
+    for d in durations:
+        t = base
+        if mean is not None and d is not None and d > 0:
+            t = round(base * (d / mean))
+        threads.append(max(1, min(cap, t)))
+    # the busiest jobs may end up running at the same time: trim the largest
+    # until they fit (all-ones always does, as workers <= cores)
+    while sum(sorted(threads, reverse=True)[:workers]) > cores:
+        threads[threads.index(max(threads))] -= 1
+
+    return TranscodeSchedule(
+        cores=cores,
+        workers=workers,
+        names=labels,
+        threads=tuple(threads),
+        durations=tuple(durations),
+    )
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+# In-memory index of the stage tree.
+#
+# Every directory is read with a single os.scandir() and the listing (file
+# and subdirectory names) is kept. Later lookups cost one stat() of the
+# directory: a changed mtime means entries were added/removed/renamed and
+# that directory alone is read again. Listings whose mtime is too close to
+# the time they were taken are not trusted (coarse mtime granularity could
+# hide a change made in the same tick), like git's "racy" index entries.
+
+_RACY_NS = 2_000_000_000
+
+
+@dataclass(frozen=True)
+class _Listing:
+    mtime_ns: int
+    scanned_ns: int
+    files: tuple[str, ...]
+    dirs: tuple[str, ...]
+
+
+class TreeIndex:
+    def __init__(self) -> None:
+        self._dirs: dict[Path, _Listing] = {}
+        self._lock = threading.Lock()
+
+    def _listing(self, d: Path) -> _Listing:
+        try:
+            mtime = os.stat(d).st_mtime_ns
+        except OSError:
+            return _Listing(0, 0, (), ())
+        with self._lock:
+            hit = self._dirs.get(d)
+        if hit is not None and hit.mtime_ns == mtime and mtime < hit.scanned_ns - _RACY_NS:
+            return hit
+        scanned = time.time_ns()
+        files: list[str] = []
+        dirs: list[str] = []
+        try:
+            with os.scandir(d) as it:
+                for entry in it:
+                    if entry.is_dir():
+                        dirs.append(entry.name)
+                    elif entry.is_file():
+                        files.append(entry.name)
+        except OSError:
+            return _Listing(0, 0, (), ())
+        listing = _Listing(mtime, scanned, tuple(files), tuple(dirs))
+        with self._lock:
+            self._dirs[d] = listing
+        return listing
+
+    def subdirs(self, d: Path) -> list[Path]:
+        """Subdirectories of d, sorted case-insensitively."""
+        return [d / n for n in sorted(self._listing(d).dirs, key=str.casefold)]
+
+    def files(self, d: Path, exts: set[str] | frozenset[str]) -> list[Path]:
+        """Files directly in d with one of exts (case-insensitive), sorted case-insensitively."""
+        names = [n for n in self._listing(d).files if os.path.splitext(n)[1].lower() in exts]
+        return [d / n for n in sorted(names, key=str.casefold)]
+
+    def has_file(self, d: Path, name: str) -> bool:
+        return name in self._listing(d).files
+
+    def walk(self, root: Path) -> Iterator[Path]:
+        """root and every directory below it, depth-first in case-insensitive order."""
+        stack = [root]
+        while stack:
+            d = stack.pop()
+            yield d
+            stack.extend(reversed(self.subdirs(d)))
+
+    def first_file(self, root: Path, suffix: str) -> Path | None:
+        """First file named *<suffix> under root, by case-insensitive full path."""
+        best: Path | None = None
+        for d in self.walk(root):
+            for n in self._listing(d).files:
+                if n.endswith(suffix):
+                    p = d / n
+                    if best is None or p.as_posix().lower() < best.as_posix().lower():
+                        best = p
+        return best
+
+
+INDEX = TreeIndex()
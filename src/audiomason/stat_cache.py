@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import cast
+
+
+def stat_key(path: Path) -> tuple[str, int, int] | None:
+    """(resolved path, size, mtime_ns) identity of a file, or None if it is gone."""
+    try:
+        r = path.expanduser().resolve()
+        st = r.stat()
+    except OSError:
+        return None
+    return (str(r), int(st.st_size), int(st.st_mtime_ns))
+
+
+class StatCache:
+    """Small on-disk JSON cache for facts derived from a file's bytes.
+
+    Entries are keyed by resolved path + size + mtime_ns, so a changed file is
+    simply a miss. Each entry records `version`; bumping it invalidates old
+    entries. The directory is kept under `max_bytes` by dropping the least
+    recently used entries (hits refresh the entry mtime). Without a root the
+    cache is in-memory only (one run).
+    """
+
+    def __init__(self, root: Path | None, *, version: int, max_bytes: int) -> None:
+        self.root = root
+        self.version = version
+        self.max_bytes = max_bytes
+        self._memo: dict[tuple[str, int, int], dict[str, object]] = {}
+        self._lock = threading.Lock()
+        self._puts = 0
+
+    def _entry_path(self, key: tuple[str, int, int]) -> Path | None:
+        if self.root is None:
+            return None
+        h = hashlib.sha1(f"{key[0]}|{key[1]}|{key[2]}".encode()).hexdigest()
+        return self.root / f"{h}.json"
+
+    def get(self, path: Path) -> dict[str, object] | None:
+        key = stat_key(path)
+        if key is None:
+            return None
+        with self._lock:
+            hit = self._memo.get(key)
+        if hit is not None:
+            return hit
+
+        ep = self._entry_path(key)
+        if ep is None or not ep.exists():
+            return None
+        try:
+            raw = cast(dict[str, object], json.loads(ep.read_text(encoding="utf-8")))
+        except Exception:
+            return None
+        data = raw.get("data")
+        if (
+            raw.get("version") != self.version
+            or raw.get("path") != key[0]
+            or raw.get("size") != key[1]
+            or raw.get("mtime_ns") != key[2]
+            or not isinstance(data, dict)
+        ):
+            return None
+        with contextlib.suppress(OSError):
+            os.utime(ep)
+        value = cast(dict[str, object], data)
+        with self._lock:
+            self._memo[key] = value
+        return value
+
+    def put(self, path: Path, data: dict[str, object]) -> None:
+        key = stat_key(path)
+        if key is None:
+            return
+        with self._lock:
+            self._memo[key] = data
+            self._puts += 1
+            evict = self._puts % 64 == 1
+
+        ep = self._entry_path(key)
+        if ep is None:
+            return
+        entry = {
+            "version": self.version,
+            "path": key[0],
+            "size": key[1],
+            "mtime_ns": key[2],
+            "data": data,
+        }
+        try:
+            ep.parent.mkdir(parents=True, exist_ok=True)
+            tmp = ep.with_name(f"{ep.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(json.dumps(entry, ensure_ascii=False, sort_keys=True), encoding="utf-8")
+            tmp.replace(ep)
+        except OSError:
+            # A cache must never break the run.
+            return
+        if evict:
+            self.evict()
+
+    def evict(self) -> int:
+        """Drop least recently used entries until the cache fits max_bytes."""
+        if self.root is None:
+            return 0
+        return evict_lru(self.root, "*.json", self.max_bytes)
+
+
+def evict_lru(root: Path, pattern: str, max_bytes: int) -> int:
+    """Delete the oldest-mtime files matching pattern under root until they fit max_bytes."""
+    if not root.is_dir():
+        return 0
+    entries: list[tuple[int, int, Path]] = []
+    for p in root.glob(pattern):
+        try:
+            st = p.stat()
+        except OSError:
+            continue
+        entries.append((int(st.st_mtime_ns), int(st.st_size), p))
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, p in sorted(entries):
+        if total <= max_bytes:
+            break
+        with contextlib.suppress(OSError):
+            p.unlink()
+            removed += 1
+        total -= size
+    return removed
@@ -17,6 +17,7 @@ class Opts:
     wipe_id3: bool | None = None  # None => ask unless --yes, else True/False
     source_prefix: object | None = None
     loudnorm: bool = False
+    loudnorm_mode: str = "dynamic"  # dynamic | two-pass
     q_a: str = "2"
     verify: bool = False
     verify_root: Path = Path(".")
@@ -25,8 +26,21 @@ class Opts:
     cleanup_stage: bool = False
     clean_inbox_mode: str = "ask"  # ask | yes | no
     split_chapters: bool = True
+    split_mode: str = "auto"  # auto | single | parallel
+    keep_codec: tuple[str, ...] = ()  # source codecs stream-copied instead of encoded (aac, opus)
+    keep_codec_min_kbps: int = 64
     ff_loglevel: str = "warning"  # warning | error | info
     cpu_cores: int | None = None
+    stage_copy: str = "auto"  # auto | reflink | hardlink | copy_file_range | copy
+    stage_copy_workers: int = 4
+    stage_copy_buffer_kb: int = 1024
+    stage_unpack: str = "media"  # media | all (zip/tar members extracted into the stage)
+    stage_virtual: bool = False  # leave stored zip audio members in the archive
+    tag_workers: int = 4  # files tagged concurrently (wipe/tags/cover)
+    tag_padding_kb: int = 64  # ID3 padding reserved past the cover when a tag has to grow
+    cache_root: Path | None = None  # persistent caches (probe results, ...); None => in-memory
+    transcode_cache: bool = False  # reuse identical encodes from <cache_root>/transcode
+    transcode_cache_max_mb: int = 4096
 
     debug: bool = False
 
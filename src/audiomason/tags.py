@@ -1,29 +1,145 @@
 from __future__ import annotations
 
 # pyright: reportPrivateImportUsage=false, reportUnknownMemberType=false
-from collections.abc import Iterable
+import base64
+import contextlib
+import hashlib
+import os
+import threading
+from collections.abc import Callable, Iterable, MutableMapping
+from dataclasses import dataclass, field
 from pathlib import Path
+from types import TracebackType
 from typing import Protocol, cast
 
+from mutagen.flac import Picture
 from mutagen.id3 import ID3
 from mutagen.id3._frames import APIC, TALB, TCON, TIT2, TPE1, TRCK
 from mutagen.id3._util import ID3NoHeaderError
+from mutagen.mp4 import MP4, MP4Cover
+from mutagen.oggopus import OggOpus
 
+import audiomason.state as state
 from audiomason.paths import GENRE
-from audiomason.util import out
+from audiomason.util import AmExitError, out, run_parallel
+from audiomason.virtual_stage import open_media
 
 
 class _TextFrame(Protocol):
     text: object
 
 
+class _Frame(Protocol):
+    FrameID: str
+
+
+class _PaddingInfo(Protocol):
+    padding: int  # bytes left over in the current tag; negative when it does not fit
+
+
+# Stream-copied tracks (ffmpeg.keep_codec) keep their container; everything
+# else in an output dir is mp3 with ID3 tags.
+_MP4_SUFFIXES = {".m4a", ".m4b"}
+_OGG_SUFFIXES = {".ogg", ".opus"}
+
+# title/album/artist/genre keys per container
+_MP4_KEYS = {"title": "\xa9nam", "album": "\xa9alb", "artist": "\xa9ART", "genre": "\xa9gen"}
+_MP4_COVER = "covr"
+_MP4_JPEG = 13  # MP4Cover.FORMAT_JPEG
+_MP4_PNG = 14  # MP4Cover.FORMAT_PNG
+_OGG_COVER = "metadata_block_picture"
+
+
+class _NativeTags(Protocol):
+    tags: MutableMapping[str, object] | None
+
+    def add_tags(self) -> None: ...
+
+    def save(self) -> None: ...
+
+    def delete(self) -> None: ...
+
+
+class _Mp4Cover(Protocol):
+    imageformat: int
+
+
+class _Picture(Protocol):
+    type: int
+    mime: str
+    desc: str
+    data: bytes
+
+    def write(self) -> bytes: ...
+
+
+def _is_native(p: Path) -> bool:
+    return p.suffix.lower() in _MP4_SUFFIXES | _OGG_SUFFIXES
+
+
+def _load_native(p: Path) -> tuple[_NativeTags, MutableMapping[str, object]]:
+    if p.suffix.lower() in _MP4_SUFFIXES:
+        f = cast(_NativeTags, MP4(p))  # type: ignore[no-untyped-call]
+    else:
+        f = cast(_NativeTags, OggOpus(p))  # type: ignore[no-untyped-call]
+    if f.tags is None:
+        f.add_tags()
+    return f, cast(MutableMapping[str, object], f.tags)
+
+
+def _drop(tags: MutableMapping[str, object], key: str) -> None:
+    # VCommentDict.pop() takes no default
+    if key in tags:
+        del tags[key]
+
+
+def read_native_cover(p: Path) -> tuple[bytes, str] | None:
+    """Embedded cover of an mp4/ogg track as (data, mime), if any."""
+    try:
+        _, tags = _load_native(p)
+    except Exception:
+        return None
+    if p.suffix.lower() in _MP4_SUFFIXES:
+        covers = tags.get(_MP4_COVER)
+        if isinstance(covers, list) and covers:
+            first = cast(list[object], covers)[0]
+            fmt = cast(_Mp4Cover, first).imageformat
+            return bytes(cast(bytes, first)), ("image/png" if fmt == _MP4_PNG else "image/jpeg")
+        return None
+    blocks = tags.get(_OGG_COVER)
+    if isinstance(blocks, list) and blocks:
+        raw = base64.b64decode(str(cast(list[object], blocks)[0]))
+        pic = cast(_Picture, Picture(raw))  # type: ignore[no-untyped-call]
+        return pic.data, pic.mime or "image/jpeg"
+    return None
+
+
 def _load_id3(p: Path) -> ID3:
+    # an untagged file gets its tag at the first save, padded by _padding()
     try:
         return ID3(p)  # type: ignore[no-untyped-call]
     except ID3NoHeaderError:
-        id3 = ID3()  # type: ignore[no-untyped-call]
-        id3.save(p)
-        return ID3(p)  # type: ignore[no-untyped-call]
+        return ID3()  # type: ignore[no-untyped-call]
+
+
+# ID3 padding.
+#
+# mutagen rewrites the whole mp3 whenever a tag outgrows the space in front
+# of the audio. A tag that still fits is written in place, whatever padding
+# is left; one that has to grow reserves the cover size plus
+# tags.padding_kb, so a later retag or re-cover is again a header rewrite.
+
+
+def _padding(id3: ID3) -> Callable[[_PaddingInfo], int]:
+    covers = cast(list[object], id3.getall("APIC"))  # type: ignore[no-untyped-call]
+    cover_size = max((len(cast(_Picture, f).data) for f in covers), default=0)
+    kb = state.OPTS.tag_padding_kb if state.OPTS is not None else 64
+    reserve = cover_size + kb * 1024
+
+    def policy(info: _PaddingInfo) -> int:
+        return info.padding if info.padding >= 0 else reserve
+
+    return policy
 
 
 def _frame_text(id3: ID3, key: str) -> str | None:
@@ -43,11 +159,13 @@ def _frame_text(id3: ID3, key: str) -> str | None:
 
 def summarize_id3(mp3: Path) -> dict[str, str]:
     try:
-        id3 = ID3(mp3)  # type: ignore[no-untyped-call]
+        # a virtual stage leaves placeholders; the tag lives in the archive
+        with open_media(mp3) as fh:
+            id3 = ID3(fh)  # type: ignore[no-untyped-call]
     except ID3NoHeaderError:
         return {"file": mp3.name}
     out: dict[str, str] = {"file": mp3.name}
-    for key, field in (
+    for key, name in (
         ("TIT2", "title"),
         ("TPE1", "artist"),
         ("TPE2", "albumartist"),
@@ -57,7 +175,7 @@ def summarize_id3(mp3: Path) -> dict[str, str]:
     ):
         value = _frame_text(id3, key)
         if value:
-            out[field] = value
+            out[name] = value
     return out
 
 
@@ -69,13 +187,44 @@ def summarize_id3_files(files: Iterable[Path], limit: int = 3) -> list[dict[str,
     return out
 
 
-def wipe_id3(files: Iterable[Path]) -> None:
-    for mp3 in files:
+def _tag_workers(workers: int | None) -> int:
+    if workers is not None:
+        return workers
+    return state.OPTS.tag_workers if state.OPTS is not None else 4
+
+
+def _for_each(
+    files: Iterable[Path],
+    job: Callable[[int, Path, TagPlan], str | None],
+    workers: int | None,
+) -> None:
+    # files are independent: run job over them in a bounded pool (per-file
+    # latency dominates on network shares), print messages in input order
+    def run(item: tuple[int, Path]) -> str | None:
+        i, p = item
+        plan = _plan_for_call()
         try:
-            ID3(mp3).delete(mp3)  # type: ignore[no-untyped-call]
-            out(f"[id3] wiped {mp3.name}")
-        except ID3NoHeaderError:
-            pass
+            msg = job(i, p, plan)
+            plan.apply_if_own()
+        except AmExitError:
+            raise
+        except Exception as e:
+            raise AmExitError(f"Tag write failed: {p.name}: {e}") from e
+        return msg
+
+    for msg in run_parallel(run, list(enumerate(files)), workers=_tag_workers(workers)):
+        if msg is not None:
+            out(msg)
+
+
+def wipe_id3(files: Iterable[Path], *, workers: int | None = None) -> None:
+    def wipe(i: int, mp3: Path, plan: TagPlan) -> str | None:
+        if not _is_native(mp3) and not _has_id3(mp3):
+            return None
+        plan.wipe(mp3)
+        return f"[id3] wiped {mp3.name}"
+
+    _for_each(files, wipe, workers)
 
 
 def write_tags(
@@ -86,48 +235,287 @@ def write_tags(
     cover: bytes | None,
     cover_mime: str | None,
     track_start: int = 1,
+    workers: int | None = None,
 ) -> None:
-    for i, mp3 in enumerate(files, track_start):
-        id3 = _load_id3(mp3)
-
-        id3.delall("TIT2")  # type: ignore[no-untyped-call]
-        id3.delall("TALB")  # type: ignore[no-untyped-call]
-        id3.delall("TPE1")  # type: ignore[no-untyped-call]
-        id3.delall("TRCK")  # type: ignore[no-untyped-call]
-        id3.delall("TCON")  # type: ignore[no-untyped-call]
-        id3.delall("APIC")  # type: ignore[no-untyped-call]
-
-        id3.add(TIT2(encoding=3, text=mp3.stem))  # type: ignore[no-untyped-call]
-        id3.add(TALB(encoding=3, text=album))  # type: ignore[no-untyped-call]
-        id3.add(TPE1(encoding=3, text=artist))  # type: ignore[no-untyped-call]
-        id3.add(TRCK(encoding=3, text=str(i)))  # type: ignore[no-untyped-call]
-        id3.add(TCON(encoding=3, text=GENRE))  # type: ignore[no-untyped-call]
+    def tag(i: int, mp3: Path, plan: TagPlan) -> str | None:
+        plan.tags(mp3, artist=artist, album=album, track=track_start + i)
+        return f"[tags] {mp3.name}"
 
-        id3.save(mp3)
-        out(f"[tags] {mp3.name}")
+    _for_each(files, tag, workers)
 
 
 def write_cover(
     mp3s: Iterable[Path],
     cover: bytes | None,
     cover_mime: str | None = None,
+    *,
+    workers: int | None = None,
 ) -> None:
-    for mp3 in mp3s:
-        id3 = _load_id3(mp3)
-
-        # Always reset cover art deterministically
-        id3.delall("APIC")  # type: ignore[no-untyped-call]
-
-        if cover:
-            id3.add(  # type: ignore[no-untyped-call]
-                APIC(  # type: ignore[no-untyped-call]
-                    encoding=3,
-                    mime=cover_mime or "image/jpeg",
-                    type=3,
-                    desc="Cover",
-                    data=cover,
-                )
-            )
-
-        id3.save(mp3)
-        out(f"[cover] {mp3.name}")
+    def embed(i: int, mp3: Path, plan: TagPlan) -> str | None:
+        plan.cover(mp3, cover, cover_mime)
+        return f"[cover] {mp3.name}"
+
+    _for_each(mp3s, embed, workers)
+
+
+# Tag plans.
+#
+# Inside `with TagPlan():` wipe_id3(), write_tags() and write_cover() do not
+# touch the files: each call records its frame changes in the plan, and the
+# plan applies them when the block ends, with one load and one save per file
+# (a wipe then tags then cover used to rewrite a track up to four times).
+# Files are tracked by inode, so renames between steps are followed. Readers
+# of the cover (planned_cover()) see the pending state. Outside a plan every
+# call still writes right away.
+
+_ACTIVE: TagPlan | None = None
+
+
+@dataclass
+class _FilePlan:
+    path: Path
+    wipe: bool = False
+    # ID3 frame id -> frames replacing every frame of that id
+    frames: dict[str, list[object]] = field(default_factory=dict)
+    # native (mp4/ogg) key -> new value, None drops the key
+    native: dict[str, list[object] | None] = field(default_factory=dict)
+    cover_known: bool = False
+    cover: tuple[bytes, str] | None = None
+
+
+def _file_key(p: Path) -> tuple[int, int]:
+    st = p.stat()
+    return st.st_dev, st.st_ino
+
+
+def _has_id3(p: Path) -> bool:
+    try:
+        ID3(p)  # type: ignore[no-untyped-call]
+    except ID3NoHeaderError:
+        return False
+    return True
+
+
+class TagPlan:
+    """Frame changes for a set of files, saved once per file by apply()."""
+
+    def __init__(self) -> None:
+        self._files: dict[tuple[int, int], _FilePlan] = {}
+        self._own = False
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> TagPlan:
+        global _ACTIVE
+        _ACTIVE = self
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        global _ACTIVE
+        _ACTIVE = None
+        if exc_type is None:
+            self.apply()
+
+    def _entry(self, p: Path) -> _FilePlan:
+        # callers hold self._lock
+        key = _file_key(p)
+        fp = self._files.get(key)
+        if fp is None:
+            fp = self._files[key] = _FilePlan(p)
+        fp.path = p
+        return fp
+
+    def wipe(self, p: Path) -> None:
+        with self._lock:
+            fp = self._entry(p)
+            fp.wipe = True
+            fp.frames.clear()
+            fp.native.clear()
+            fp.cover_known, fp.cover = True, None
+
+    def tags(self, p: Path, *, artist: str, album: str, track: int) -> None:
+        with self._lock:
+            fp = self._entry(p)
+            fields = {"title": p.stem, "album": album, "artist": artist, "genre": GENRE}
+            fp.cover_known, fp.cover = True, None
+            if p.suffix.lower() in _MP4_SUFFIXES:
+                for name, value in fields.items():
+                    fp.native[_MP4_KEYS[name]] = [value]
+                fp.native["trkn"] = [(track, 0)]
+                fp.native[_MP4_COVER] = None
+            elif p.suffix.lower() in _OGG_SUFFIXES:
+                for name, value in fields.items():
+                    fp.native[name] = [value]
+                fp.native["tracknumber"] = [str(track)]
+                fp.native[_OGG_COVER] = None
+            else:
+                fp.frames["TIT2"] = [TIT2(encoding=3, text=p.stem)]  # type: ignore[no-untyped-call]
+                fp.frames["TALB"] = [TALB(encoding=3, text=album)]  # type: ignore[no-untyped-call]
+                fp.frames["TPE1"] = [TPE1(encoding=3, text=artist)]  # type: ignore[no-untyped-call]
+                fp.frames["TRCK"] = [TRCK(encoding=3, text=str(track))]  # type: ignore[no-untyped-call]
+                fp.frames["TCON"] = [TCON(encoding=3, text=GENRE)]  # type: ignore[no-untyped-call]
+                fp.frames["APIC"] = []
+
+    def cover(self, p: Path, cover: bytes | None, cover_mime: str | None) -> None:
+        with self._lock:
+            fp = self._entry(p)
+            mime = cover_mime or "image/jpeg"
+            fp.cover_known, fp.cover = True, ((cover, mime) if cover else None)
+            if p.suffix.lower() in _MP4_SUFFIXES:
+                fp.native[_MP4_COVER] = None
+                if cover:
+                    fmt = _MP4_PNG if mime == "image/png" else _MP4_JPEG
+                    fp.native[_MP4_COVER] = [MP4Cover(cover, imageformat=fmt)]  # type: ignore[no-untyped-call]
+            elif p.suffix.lower() in _OGG_SUFFIXES:
+                fp.native[_OGG_COVER] = None
+                if cover:
+                    pic = cast(_Picture, Picture())  # type: ignore[no-untyped-call]
+                    pic.type = 3
+                    pic.mime = mime
+                    pic.desc = "Cover"
+                    pic.data = cover
+                    fp.native[_OGG_COVER] = [base64.b64encode(pic.write()).decode("ascii")]
+            else:
+                # Always reset cover art deterministically
+                fp.frames["APIC"] = []
+                if cover:
+                    fp.frames["APIC"] = [
+                        APIC(encoding=3, mime=mime, type=3, desc="Cover", data=cover)  # type: ignore[no-untyped-call]
+                    ]
+
+    def planned_cover(self, p: Path) -> tuple[bool, tuple[bytes, str] | None]:
+        """(known, cover): the cover p will carry, when the plan decides it."""
+        try:
+            key = _file_key(p)
+        except OSError:
+            return False, None
+        with self._lock:
+            fp = self._files.get(key)
+        if fp is None or not fp.cover_known:
+            return False, None
+        return True, fp.cover
+
+    def apply_if_own(self) -> None:
+        # calls made outside `with TagPlan():` write right away
+        if self._own:
+            self.apply()
+
+    def apply(self, *, workers: int | None = None) -> None:
+        with self._lock:
+            files, self._files = self._files, {}
+
+        def save(item: tuple[tuple[int, int], _FilePlan]) -> bool:
+            key, fp = item
+            try:
+                return _apply_file(_current_path(fp.path, key), fp)
+            except Exception as e:
+                raise AmExitError(f"Tag write failed: {fp.path.name}: {e}") from e
+
+        saved = run_parallel(save, list(files.items()), workers=_tag_workers(workers))
+        kept = saved.count(False)
+        if kept:
+            out(f"[tags] {kept} file(s) already carry the planned tags (tagged at encode)")
+
+
+def _plan_for_call() -> TagPlan:
+    if _ACTIVE is not None:
+        return _ACTIVE
+    plan = TagPlan()
+    plan._own = True  # pyright: ignore[reportPrivateUsage]
+    return plan
+
+
+def planned_cover(p: Path) -> tuple[bool, tuple[bytes, str] | None]:
+    """Cover p will carry once the active tag plan is applied, if it decides it."""
+    if _ACTIVE is None:
+        return False, None
+    return _ACTIVE.planned_cover(p)
+
+
+def _current_path(p: Path, key: tuple[int, int]) -> Path:
+    # renamed since the change was recorded: find it by inode next to the old name
+    try:
+        if _file_key(p) == key:
+            return p
+    except OSError:
+        pass
+    with os.scandir(p.parent) as it:
+        for entry in it:
+            st = entry.stat(follow_symlinks=False)
+            if (st.st_dev, st.st_ino) == key:
+                return Path(entry.path)
+    raise FileNotFoundError(f"tagged file vanished: {p}")
+
+
+def _frame_sig(frame: object) -> tuple[str, ...]:
+    if cast(_Frame, frame).FrameID == "APIC":
+        pic = cast(_Picture, frame)
+        return (pic.mime, str(int(pic.type)), pic.desc, hashlib.sha1(pic.data).hexdigest())
+    text = cast(_TextFrame, frame).text
+    items = cast(list[object], text) if isinstance(text, list) else [text]
+    return tuple(str(t) for t in items)
+
+
+def _has_id3v1(p: Path) -> bool:
+    with p.open("rb") as fh:
+        if fh.seek(0, os.SEEK_END) < 128:
+            return False
+        fh.seek(-128, os.SEEK_END)
+        return fh.read(3) == b"TAG"
+
+
+def _already_tagged(p: Path, fp: _FilePlan) -> bool:
+    """True when p carries exactly the planned frames (ffmpeg wrote them while encoding)."""
+    try:
+        disk = ID3(p)  # type: ignore[no-untyped-call]
+    except ID3NoHeaderError:
+        return False
+    for frame_id, frames in fp.frames.items():
+        found = cast(list[object], disk.getall(frame_id))  # type: ignore[no-untyped-call]
+        have = sorted(_frame_sig(f) for f in found)
+        if have != sorted(_frame_sig(f) for f in frames):
+            return False
+    if fp.wipe:
+        values = cast(Iterable[object], disk.values())  # type: ignore[no-untyped-call]
+        present = {cast(_Frame, f).FrameID for f in values}
+        if not present <= set(fp.frames) or _has_id3v1(p):
+            return False
+    return True
+
+
+def _apply_file(p: Path, fp: _FilePlan) -> bool:
+    """Write fp into p; False when p already carried it and was left untouched."""
+    if _is_native(p):
+        if fp.wipe and not fp.native:
+            f, _ = _load_native(p)
+            f.delete()
+            return True
+        f, tags = _load_native(p)
+        if fp.wipe:
+            for k in list(tags):
+                del tags[k]
+        for k, v in fp.native.items():
+            if v is None:
+                _drop(tags, k)
+            else:
+                tags[k] = v
+        f.save()
+        return True
+    if fp.wipe and not fp.frames:
+        with contextlib.suppress(ID3NoHeaderError):
+            ID3(p).delete(p)  # type: ignore[no-untyped-call]
+        return True
+    if fp.frames and _already_tagged(p, fp):
+        return False
+    id3 = ID3() if fp.wipe else _load_id3(p)  # type: ignore[no-untyped-call]
+    for frame_id, frames in fp.frames.items():
+        id3.delall(frame_id)  # type: ignore[no-untyped-call]
+        for frame in frames:
+            id3.add(frame)  # type: ignore[no-untyped-call]
+    # a wipe also drops any ID3v1 tag
+    id3.save(p, v1=0 if fp.wipe else 1, padding=_padding(id3))
+    return True
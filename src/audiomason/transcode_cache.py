@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+
+from audiomason.filecopy import reflink
+from audiomason.stat_cache import StatCache, evict_lru
+from audiomason.virtual_stage import open_media
+
+# Content-addressed cache of encoded outputs:
+#   <cache root>/transcode/<sha256(input bytes, encoder argv)>.mp3
+#
+# Hits are materialized with a reflink where the filesystem supports it and a
+# plain copy otherwise. Never a hardlink: tags and covers are later written
+# into the output in place, which would silently rewrite the cached entry.
+
+TRANSCODE_CACHE_VERSION = 1
+_HASH_CACHE_MAX_BYTES = 8 * 1024 * 1024
+_CHUNK = 1024 * 1024
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open_media(path) as fh:
+        for block in iter(lambda: fh.read(_CHUNK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def clone_file(src: Path, dst: Path) -> None:
+    """Copy src to dst, sharing extents (reflink) when the filesystem allows it."""
+    try:
+        reflink(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+class TranscodeCache:
+    """Encoded outputs keyed by input content + encoder arguments, LRU-bounded."""
+
+    def __init__(self, cache_root: Path, *, max_bytes: int) -> None:
+        self.root = cache_root / "transcode"
+        self.max_bytes = max_bytes
+        # source digests, so an unchanged file is hashed once
+        self._hashes = StatCache(
+            cache_root / "hash", version=TRANSCODE_CACHE_VERSION, max_bytes=_HASH_CACHE_MAX_BYTES
+        )
+        self._lock = threading.Lock()
+
+    def key(self, src: Path, argv: list[str]) -> str | None:
+        """Cache key for encoding src with argv, or None if src cannot be read."""
+        hit = self._hashes.get(src)
+        digest = hit.get("sha256") if hit is not None else None
+        if not isinstance(digest, str):
+            try:
+                digest = file_sha256(src)
+            except OSError:
+                return None
+            self._hashes.put(src, {"sha256": digest})
+        material: list[object] = [TRANSCODE_CACHE_VERSION, digest, argv]
+        return hashlib.sha256(json.dumps(material).encode()).hexdigest()
+
+    def _entry(self, key: str, suffix: str) -> Path:
+        return self.root / f"{key}{suffix}"
+
+    def fetch(self, key: str, dst: Path) -> bool:
+        """Materialize a cached output at dst; False on a miss."""
+        entry = self._entry(key, dst.suffix)
+        if not entry.is_file():
+            return False
+        tmp = dst.with_name(f".{dst.name}.{threading.get_ident()}.tmp")
+        try:
+            clone_file(entry, tmp)
+            tmp.replace(dst)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+            return False
+        with contextlib.suppress(OSError):
+            os.utime(entry)
+        return True
+
+    def store(self, key: str, produced: Path) -> None:
+        """Add a freshly encoded file; cache errors never fail the encode."""
+        entry = self._entry(key, produced.suffix)
+        tmp = entry.with_name(f"{entry.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            clone_file(produced, tmp)
+            tmp.replace(entry)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+            return
+        with self._lock:
+            evict_lru(self.root, f"*{produced.suffix}", self.max_bytes)
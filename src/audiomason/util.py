@@ -3,9 +3,13 @@ from __future__ import annotations
 import re
 import subprocess
 import unicodedata
-from collections.abc import Sequence
+from collections.abc import Callable, Sequence
+from concurrent.futures import FIRST_EXCEPTION, Future, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import IO
+from typing import IO, TypeVar
+
+_T = TypeVar("_T")
+_R = TypeVar("_R")
 
 
 # ======================
@@ -43,12 +47,13 @@ def run_cmd(
     *,
     check: bool = True,
     stdout: int | IO[str] | None = None,
+    stderr: int | IO[str] | None = None,
     tool: str | None = None,
     install: str | None = None,
 ) -> subprocess.CompletedProcess[bytes]:
     """subprocess.run wrapper that turns expected failures into AmExitError."""
     try:
-        return subprocess.run(cmd, check=check, stdout=stdout)
+        return subprocess.run(cmd, check=check, stdout=stdout, stderr=stderr)
     except FileNotFoundError as e:
         name = tool or (cmd[0] if isinstance(cmd, (list, tuple)) and cmd else str(cmd))
         raise AmExternalToolError(
@@ -59,6 +64,29 @@ def run_cmd(
         raise AmExternalToolError(f"External tool failed: {name} (exit {e.returncode})") from e
 
 
+def run_parallel(fn: Callable[[_T], _R], items: Sequence[_T], *, workers: int) -> list[_R]:
+    """Run fn over items in a bounded thread pool; results keep the input order.
+
+    The first failure cancels jobs that have not started yet, waits for the
+    running ones to finish and is re-raised (earliest item wins on ties).
+    """
+    if workers <= 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(items))) as ex:
+        futs: list[Future[_R]] = [ex.submit(fn, item) for item in items]
+        wait(futs, return_when=FIRST_EXCEPTION)
+        if any(f.done() and f.exception() is not None for f in futs):
+            for f in futs:
+                f.cancel()
+            wait(futs)
+            for f in futs:
+                err = None if f.cancelled() else f.exception()
+                if err is not None:
+                    raise err
+        return [f.result() for f in futs]
+
+
 def out(msg: str) -> None:
     try:
         import audiomason.state as state
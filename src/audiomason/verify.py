@@ -6,6 +6,7 @@ from mutagen.id3 import ID3
 from mutagen.id3._util import ID3NoHeaderError
 
 import audiomason.metadata_lookup as metadata_lookup
+from audiomason.integrity import check_book
 from audiomason.naming import normalize_name
 from audiomason.paths import COVER_NAME
 from audiomason.util import out
@@ -13,11 +14,14 @@ from audiomason.util import out
 READ_ONLY_VERIFY = True
 
 
-def verify_library(root: Path, cfg: dict[str, object] | None = None) -> None:
+def verify_library(
+    root: Path, cfg: dict[str, object] | None = None, *, rehash: bool = False
+) -> None:
     """
     Verify audiobook library:
     - each book dir has cover.jpg
     - mp3 files have ID3 tags
+    - files match the book's .audiomason.json (stat data; digests with rehash)
     """
     authors: list[Path] = [p for p in sorted(root.iterdir()) if p.is_dir()]
     books: list[Path] = []
@@ -56,6 +60,8 @@ def verify_library(root: Path, cfg: dict[str, object] | None = None) -> None:
 
     missing_cover = 0
     missing_tags = 0
+    integrity_errors = 0
+    no_sidecar = 0
 
     for book in books:
         cover = book / COVER_NAME
@@ -71,9 +77,19 @@ def verify_library(root: Path, cfg: dict[str, object] | None = None) -> None:
                 out(f"[verify] missing ID3 tags: {book.name}/{mp3.name}")
                 missing_tags += 1
 
+        problems = check_book(book, rehash=rehash)
+        if problems is None:
+            no_sidecar += 1
+            continue
+        for problem in problems:
+            out(f"[verify] {book.name}: {problem}")
+        integrity_errors += len(problems)
+
     out(
         f"[verify] done: "
         f"books={len(books)}, "
         f"missing_cover={missing_cover}, "
-        f"missing_tags={missing_tags}"
+        f"missing_tags={missing_tags}, "
+        f"integrity_errors={integrity_errors}, "
+        f"no_sidecar={no_sidecar}"
     )
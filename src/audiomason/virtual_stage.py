@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import io
+import json
+import os
+import shutil
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, cast
+
+# Virtual stage (stage.virtual): audio members stored uncompressed in a zip
+# source are not extracted. The stage holds a sparse placeholder of the same
+# size and mtime instead, and <stage>/.am_virtual.json records where each
+# member's bytes live in the archive. Readers go through open_media() /
+# input_arg() (ffmpeg's subfile protocol), and materialize() writes a member
+# straight to its final destination, so the bytes are copied once, not twice.
+
+VIRTUAL_INDEX = ".am_virtual.json"
+
+_INDEX_CACHE: dict[Path, tuple[int, dict[str, Member]]] = {}
+_LOCK = threading.Lock()
+
+
+@dataclass(frozen=True)
+class Member:
+    archive: Path
+    offset: int
+    size: int
+
+    def url(self) -> str:
+        """ffmpeg input reading just this member's bytes from the archive."""
+        return f"subfile,,start,{self.offset},end,{self.offset + self.size},,:{self.archive}"
+
+
+def write_index(stage_src: Path, archive: Path, members: dict[str, tuple[int, int]]) -> None:
+    """Record placeholders under stage_src: relpath -> (offset, size) in archive."""
+    data = {
+        "archive": str(archive.resolve()),
+        "members": {rel: list(v) for rel, v in sorted(members.items())},
+    }
+    (stage_src / VIRTUAL_INDEX).write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+
+
+def _load_index(index: Path) -> dict[str, Member]:
+    try:
+        mtime = index.stat().st_mtime_ns
+    except OSError:
+        return {}
+    with _LOCK:
+        hit = _INDEX_CACHE.get(index)
+        if hit is not None and hit[0] == mtime:
+            return hit[1]
+    members: dict[str, Member] = {}
+    try:
+        raw = cast(object, json.loads(index.read_text(encoding="utf-8")))
+    except (OSError, ValueError):
+        raw = None
+    if isinstance(raw, dict):
+        data = cast(dict[str, object], raw)
+        archive = data.get("archive")
+        entries = data.get("members")
+        if isinstance(archive, str) and isinstance(entries, dict):
+            for rel, v in cast(dict[str, object], entries).items():
+                vals = (
+                    [x for x in cast(list[object], v) if isinstance(x, int)]
+                    if isinstance(v, list)
+                    else []
+                )
+                if len(vals) == 2:
+                    members[rel] = Member(Path(archive), vals[0], vals[1])
+    with _LOCK:
+        _INDEX_CACHE[index] = (mtime, members)
+    return members
+
+
+def member(path: Path) -> Member | None:
+    """The archive member a stage placeholder stands for, or None for real files."""
+    for parent in path.parents:
+        index = parent / VIRTUAL_INDEX
+        if index.is_file():
+            m = _load_index(index).get(path.relative_to(parent).as_posix())
+            try:
+                # stale entry: the placeholder was replaced by some other file
+                if m is not None and path.stat().st_size == m.size:
+                    return m
+            except OSError:
+                pass
+            return None
+    return None
+
+
+class _MemberIO(io.RawIOBase):
+    """Read-only, seekable window onto one member's bytes in the archive."""
+
+    def __init__(self, m: Member, name: str) -> None:
+        super().__init__()
+        self._fd = os.open(m.archive, os.O_RDONLY)
+        self._start = m.offset
+        self._size = m.size
+        self._pos = 0
+        self.name = name
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        base = {os.SEEK_SET: 0, os.SEEK_CUR: self._pos, os.SEEK_END: self._size}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def readinto(self, buffer: memoryview) -> int:  # type: ignore[override]
+        n = min(len(buffer), self._size - self._pos)
+        if n <= 0:
+            return 0
+        data = os.pread(self._fd, n, self._start + self._pos)
+        buffer[: len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+    def close(self) -> None:
+        if not self.closed:
+            os.close(self._fd)
+        super().close()
+
+
+def open_media(path: Path) -> BinaryIO:
+    """Open a staged file for reading, following placeholders into their archive."""
+    m = member(path)
+    if m is None:
+        return path.open("rb")
+    return cast(BinaryIO, io.BufferedReader(_MemberIO(m, str(path))))
+
+
+def input_arg(path: Path) -> str:
+    """ffmpeg/ffprobe input for a staged file."""
+    m = member(path)
+    return m.url() if m is not None else str(path)
+
+
+def materialize(path: Path, dst: Path, *, buffer_size: int = 1024 * 1024) -> None:
+    """copy2() a staged file to dst, reading placeholders from the archive."""
+    m = member(path)
+    if m is None:
+        shutil.copy2(path, dst)
+        return
+    with open_media(path) as fi, dst.open("wb") as fo:
+        shutil.copyfileobj(fi, fo, buffer_size)
+    shutil.copystat(path, dst)
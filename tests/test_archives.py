@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import io
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+import audiomason.state as state
+from audiomason.archives import unpack
+from audiomason.import_flow import _list_sources
+from audiomason.paths import is_archive
+from audiomason.util import AmExitError
+
+
+@pytest.fixture(autouse=True)
+def _opts(monkeypatch) -> None:
+    monkeypatch.setattr(state, "OPTS", state.Opts(stage_copy_workers=2))
+
+
+MEMBERS = {
+    "Book/01.mp3": b"one",
+    "Book/02.mp3": b"two",
+    "Book/cover.jpg": b"jpeg",
+    "Book/info.nfo": b"ripped by",
+    "Book/sample.mkv": b"video",
+}
+
+
+def test_zip_extracts_media_members_only(tmp_path: Path) -> None:
+    src = tmp_path / "book.zip"
+    with zipfile.ZipFile(src, "w") as zf:
+        for name, data in MEMBERS.items():
+            zf.writestr(name, data)
+
+    unpack(src, tmp_path / "stage")
+
+    got = sorted(
+        p.relative_to(tmp_path / "stage").as_posix() for p in (tmp_path / "stage").rglob("*.*")
+    )
+    assert got == ["Book/01.mp3", "Book/02.mp3", "Book/cover.jpg"]
+    assert (tmp_path / "stage" / "Book" / "02.mp3").read_bytes() == b"two"
+
+
+def test_tar_gz_is_unpacked_in_process(tmp_path: Path) -> None:
+    src = tmp_path / "book.tar.gz"
+    with tarfile.open(src, "w:gz") as tf:
+        for name, data in MEMBERS.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = 1_000_000
+            tf.addfile(info, io.BytesIO(data))
+
+    unpack(src, tmp_path / "stage")
+
+    mp3 = tmp_path / "stage" / "Book" / "01.mp3"
+    assert mp3.read_bytes() == b"one"
+    assert mp3.stat().st_mtime == 1_000_000
+    assert not (tmp_path / "stage" / "Book" / "info.nfo").exists()
+
+
+def test_unpack_all_keeps_everything(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(state, "OPTS", state.Opts(stage_unpack="all"))
+    src = tmp_path / "book.zip"
+    with zipfile.ZipFile(src, "w") as zf:
+        for name, data in MEMBERS.items():
+            zf.writestr(name, data)
+
+    unpack(src, tmp_path / "stage")
+
+    assert (tmp_path / "stage" / "Book" / "info.nfo").read_bytes() == b"ripped by"
+
+
+def test_members_escaping_the_stage_are_skipped(tmp_path: Path) -> None:
+    src = tmp_path / "evil.zip"
+    with zipfile.ZipFile(src, "w") as zf:
+        zf.writestr("../outside.mp3", b"x")
+        zf.writestr("ok.mp3", b"y")
+
+    unpack(src, tmp_path / "stage")
+
+    assert not (tmp_path / "outside.mp3").exists()
+    assert (tmp_path / "stage" / "ok.mp3").read_bytes() == b"y"
+
+
+def test_non_tar_compressed_file_is_rejected(tmp_path: Path) -> None:
+    src = tmp_path / "notes.gz"
+    src.write_bytes(b"not a tarball")
+    with pytest.raises(AmExitError):
+        unpack(src, tmp_path / "stage")
+
+
+def test_avif_cover_is_kept(tmp_path: Path) -> None:
+    src = tmp_path / "book.zip"
+    with zipfile.ZipFile(src, "w") as zf:
+        zf.writestr("Book/01.mp3", b"one")
+        zf.writestr("Book/cover.avif", b"avif")
+
+    unpack(src, tmp_path / "stage")
+
+    assert (tmp_path / "stage" / "Book" / "cover.avif").read_bytes() == b"avif"
+
+
+def test_only_compressed_tarballs_are_sources(tmp_path: Path) -> None:
+    for name in ("book.tar.gz", "book.tar.xz", "book.tgz", "notes.gz", "dump.xz", "log.bz2"):
+        (tmp_path / name).write_bytes(b"x")
+
+    got = sorted(p.name for p in _list_sources(tmp_path))
+
+    assert got == ["book.tar.gz", "book.tar.xz", "book.tgz"]
+    assert is_archive(tmp_path / "Book.TAR.BZ2") and not is_archive(tmp_path / "notes.gz")
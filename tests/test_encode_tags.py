@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from mutagen.id3 import ID3
+from mutagen.id3._frames import APIC, TALB, TCON, TIT2, TPE1, TRCK, TSSE
+
+import audiomason.state as state
+from audiomason import audio, tags
+from audiomason import import_flow as imp
+from audiomason.audio import EncodeTags
+from audiomason.paths import GENRE
+from audiomason.tags import TagPlan, write_cover, write_tags
+
+
+@pytest.fixture(autouse=True)
+def _opts(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(
+        state,
+        "OPTS",
+        state.Opts(dry_run=False, loudnorm=False, q_a="2", split_chapters=False, cpu_cores=1),
+    )
+    monkeypatch.setattr(audio.shutil, "which", lambda name: f"/usr/bin/{name}")
+
+
+def _capture_ffmpeg(monkeypatch) -> list[list[str]]:
+    cmds: list[list[str]] = []
+
+    def fake_run_cmd(cmd, check=True, stdout=None):
+        cmds.append(list(cmd))
+        Path(cmd[-1]).write_bytes(b"fake-mp3")
+        return SimpleNamespace(stdout=b"")
+
+    monkeypatch.setattr(audio, "run_cmd", fake_run_cmd)
+    return cmds
+
+
+def test_encode_writes_tags_and_cover(monkeypatch, tmp_path: Path) -> None:
+    cmds = _capture_ffmpeg(monkeypatch)
+    (tmp_path / "a.opus").write_bytes(b"fake-opus")
+    (tmp_path / "b.opus").write_bytes(b"fake-opus")
+    cover = tmp_path / "cover.jpg"
+    cover.write_bytes(b"JPEG")
+    planned = {
+        tmp_path / "a.mp3": EncodeTags("a", "Author", "Book", 1, GENRE, cover=cover, wipe=True)
+    }
+
+    audio.convert_opus_in_place(tmp_path, recursive=False, tags=planned)
+
+    tagged, plain = sorted((c for c in cmds if c[0] == "ffmpeg"), key=str)
+    assert f"-i {cover}" in " ".join(tagged)
+    assert "-vn" not in tagged
+    for arg in ("title=a", "artist=Author", "album=Book", "track=1", f"genre={GENRE}"):
+        assert arg in tagged
+    assert "attached_pic" in tagged and "-map_metadata" in tagged
+    assert "-vn" in plain and "-metadata" not in plain
+
+
+def test_encode_tags_follow_the_pipeline_steps(tmp_path: Path) -> None:
+    group = tmp_path / "stage" / "Book"
+    group.mkdir(parents=True)
+    for name in ("01 intro.mp3", "02 part.m4a", "03 end.opus"):
+        (group / name).write_bytes(b"x")
+    (group / "cover.png").write_bytes(b"PNG")
+    outdir = tmp_path / "out"
+    b = imp.BookGroup(label="Book", group_root=group, stage_root=tmp_path / "stage")
+
+    planned = imp._encode_tags(
+        b,
+        outdir,
+        [outdir / "01 intro.mp3"],
+        author="Author",
+        title="Book",
+        wipe=False,
+        cover_mode="file",
+        steps=["rename", "tags", "cover"],
+    )
+
+    assert planned == {
+        outdir / "02 part.mp3": EncodeTags("02", "Author", "Book", 2, GENRE, group / "cover.png"),
+        outdir / "03 end.mp3": EncodeTags("03", "Author", "Book", 3, GENRE, group / "cover.png"),
+    }
+    # tagging drops a cover embedded before it
+    early = imp._encode_tags(
+        b, outdir, [], author="A", title="B", wipe=False, cover_mode="file", steps=["cover", "tags"]
+    )
+    assert [t.cover for t in early.values()] == [None, None]
+    # an interactive cover choice cannot be predicted
+    asked = imp._encode_tags(
+        b, outdir, [], author="A", title="B", wipe=False, cover_mode="", steps=["tags", "cover"]
+    )
+    assert asked == {}
+
+
+def _encoded(p: Path, *, title: str, extra: bool = False) -> Path:
+    # what ffmpeg leaves behind for an EncodeTags encode
+    p.write_bytes(b"\xff\xfb\x90\x00" + b"\x00" * 2000)
+    id3 = ID3()
+    for frame in (
+        TIT2(encoding=3, text=title),
+        TALB(encoding=3, text="Book"),
+        TPE1(encoding=3, text="Author"),
+        TRCK(encoding=3, text="1"),
+        TCON(encoding=3, text=GENRE),
+        APIC(encoding=3, mime="image/jpeg", type=3, desc="Cover", data=b"JPEG"),
+    ):
+        id3.add(frame)
+    if extra:
+        id3.add(TSSE(encoding=3, text="Lavf"))
+    id3.save(p)
+    return p
+
+
+def _saves(monkeypatch) -> list[str]:
+    saved: list[str] = []
+    real_save = ID3.save
+
+    def counting_save(self, filething=None, **kwargs):
+        saved.append(Path(str(filething)).name)
+        return real_save(self, filething, **kwargs)
+
+    monkeypatch.setattr(tags.ID3, "save", counting_save)
+    return saved
+
+
+def test_plan_skips_files_tagged_at_encode(monkeypatch, tmp_path: Path) -> None:
+    good = _encoded(tmp_path / "01.mp3", title="01")
+    stale = _encoded(tmp_path / "02.mp3", title="old")
+    saved = _saves(monkeypatch)
+
+    with TagPlan():
+        write_tags([good], artist="Author", album="Book", cover=None, cover_mime=None)
+        write_tags([stale], artist="Author", album="Book", cover=None, cover_mime=None)
+        write_cover([good, stale], cover=b"JPEG", cover_mime="image/jpeg")
+
+    assert saved == ["02.mp3"]
+    assert str(ID3(stale)["TIT2"]) == "02"
+
+
+def test_wipe_needs_exactly_the_planned_frames(monkeypatch, tmp_path: Path) -> None:
+    clean = _encoded(tmp_path / "01.mp3", title="01")
+    noisy = _encoded(tmp_path / "02.mp3", title="02", extra=True)
+    saved = _saves(monkeypatch)
+
+    for p in (clean, noisy):
+        with TagPlan():
+            tags.wipe_id3([p])
+            write_tags([p], artist="Author", album="Book", cover=None, cover_mime=None)
+            write_cover([p], cover=b"JPEG", cover_mime="image/jpeg")
+
+    assert saved == ["02.mp3"]
+    assert "TSSE" not in ID3(noisy)
+
+
+def test_encode_tags_with_default_options(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(state, "OPTS", state.Opts())
+    chapters = [
+        {"start_time": "0.0", "end_time": "60.0"},
+        {"start_time": "60.0", "end_time": "120.0"},
+    ]
+    monkeypatch.setattr(audio, "m4a_chapters", lambda p, **_: chapters if p.stem == "b" else [])
+    group = tmp_path / "stage" / "Book"
+    group.mkdir(parents=True)
+    for name in ("a.opus", "b.m4a", "c.m4a"):
+        (group / name).write_bytes(b"x")
+    outdir = tmp_path / "out"
+    b = imp.BookGroup(label="Book", group_root=group, stage_root=tmp_path / "stage")
+
+    planned = imp._encode_tags(
+        b, outdir, [], author="A", title="B", wipe=False, cover_mode="", steps=["rename", "tags"]
+    )
+
+    # b.m4a splits into 01.mp3 and 02.mp3, tagged after the split
+    assert planned == {
+        outdir / "a.mp3": EncodeTags("03", "A", "B", 3, GENRE),
+        outdir / "c.mp3": EncodeTags("04", "A", "B", 4, GENRE),
+    }
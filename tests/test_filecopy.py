@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import errno
+import os
+from pathlib import Path
+
+import pytest
+
+from audiomason import filecopy
+from audiomason.filecopy import Copier, copy_tree
+
+
+def test_read_only_sources_are_hardlinked(tmp_path: Path) -> None:
+    src = tmp_path / "a.mp3"
+    src.write_bytes(b"audio")
+    src.chmod(0o444)
+    dst = tmp_path / "stage" / "a.mp3"
+    dst.parent.mkdir()
+
+    copier = Copier("hardlink")
+    assert copier.copy(src, dst) == "hardlink"
+    assert os.path.samefile(src, dst)
+    assert copier.counts == {"hardlink": 1}
+
+
+def test_writable_sources_are_never_hardlinked(tmp_path: Path) -> None:
+    src = tmp_path / "a.mp3"
+    src.write_bytes(b"audio")
+    os.utime(src, (1_000_000, 1_000_000))
+    dst = tmp_path / "b.mp3"
+
+    used = Copier("hardlink").copy(src, dst)
+
+    assert used in {"copy_file_range", "copy"}
+    assert not os.path.samefile(src, dst)
+    assert dst.read_bytes() == b"audio"
+    assert dst.stat().st_mtime == 1_000_000
+
+
+def test_unsupported_strategy_is_not_retried(monkeypatch, tmp_path: Path) -> None:
+    calls = 0
+
+    def no_reflink(src: Path, dst: Path) -> None:
+        nonlocal calls
+        calls += 1
+        raise OSError(errno.EOPNOTSUPP, "nope")
+
+    monkeypatch.setitem(filecopy._COPY, "reflink", no_reflink)
+    copier = Copier()
+    for i in range(3):
+        src = tmp_path / f"{i}.mp3"
+        src.write_bytes(b"x")
+        assert copier.copy(src, tmp_path / f"{i}.out") != "reflink"
+    assert calls == 1
+    assert sum(copier.counts.values()) == 3
+
+
+def test_unknown_strategy_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        Copier("rsync")
+
+
+def test_copy_tree_parallel_matches_source(tmp_path: Path) -> None:
+    src = tmp_path / "src"
+    for i in range(12):
+        f = src / f"cd{i % 3}" / "nested" / f"{i:02d}.mp3"
+        f.parent.mkdir(parents=True, exist_ok=True)
+        f.write_bytes(bytes([i]) * (1000 + i))
+    (src / "empty").mkdir()
+    dst = tmp_path / "dst"
+    dst.mkdir()
+
+    done = copy_tree(src, dst, Copier("copy", buffer_size=64 * 1024), workers=4)
+
+    def listing(root: Path) -> list[tuple[str, bytes | None]]:
+        return sorted(
+            (p.relative_to(root).as_posix(), p.read_bytes() if p.is_file() else None)
+            for p in root.rglob("*")
+        )
+
+    assert listing(dst) == listing(src)
+    assert done.files == 12
+    assert done.bytes == sum(1000 + i for i in range(12))
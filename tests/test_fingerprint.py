@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+
+import pytest
+
+import audiomason.state as state
+from audiomason import fingerprint
+from audiomason.fingerprint import reset_fingerprint_memo, source_fingerprint
+
+OLD_NS = 1_000_000_000_000_000_000
+
+
+def _reference(src: Path) -> str:
+    # the original full-walk fingerprint
+    r = src.expanduser().resolve()
+    h = hashlib.sha256()
+    h.update(str(r).encode("utf-8"))
+    h.update(b"|D|")
+    for root, dirs, files in os.walk(r):
+        dirs.sort()
+        files.sort()
+        for fn in files:
+            p = Path(root) / fn
+            st = p.stat()
+            h.update(b"|" + str(p.relative_to(r)).encode("utf-8"))
+            h.update(b"|" + str(st.st_size).encode("utf-8"))
+            h.update(b"|" + str(st.st_mtime_ns).encode("utf-8"))
+    return h.hexdigest()
+
+
+@pytest.fixture(autouse=True)
+def _fresh(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(state, "OPTS", state.Opts(cache_root=tmp_path / "cache"))
+    monkeypatch.setattr(fingerprint, "_TREES", {})
+    reset_fingerprint_memo()
+
+
+def _source(root: Path) -> Path:
+    src = root / "inbox" / "Book"
+    for rel in ("01.mp3", "CD1/01.mp3", "CD1/02.mp3", "CD2/a/01.mp3", "b.txt"):
+        p = src / rel
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_bytes(rel.encode())
+    (src / "link").symlink_to(src / "CD1")
+    for p in [src, *src.rglob("*")]:
+        if not p.is_symlink():
+            os.utime(p, ns=(OLD_NS, OLD_NS))
+    return src
+
+
+def test_digest_matches_full_walk(tmp_path: Path) -> None:
+    src = _source(tmp_path)
+    assert source_fingerprint(src) == _reference(src)
+
+
+def test_settled_directories_are_not_rewalked(monkeypatch, tmp_path: Path) -> None:
+    src = _source(tmp_path)
+    first = source_fingerprint(src)
+    # new process: only the on-disk cache is left
+    monkeypatch.setattr(fingerprint, "_TREES", {})
+    reset_fingerprint_memo()
+
+    def no_scan(d: Path, mtime_ns: int) -> object:
+        raise AssertionError(f"rescanned {d}")
+
+    monkeypatch.setattr(fingerprint, "_scan_dir", no_scan)
+    assert source_fingerprint(src) == first
+
+
+def test_changed_directory_is_rescanned(tmp_path: Path) -> None:
+    src = _source(tmp_path)
+    first = source_fingerprint(src)
+
+    (src / "CD2" / "a" / "02.mp3").write_bytes(b"late part")
+    assert source_fingerprint(src) == first  # memoized within the run
+
+    reset_fingerprint_memo()
+    second = source_fingerprint(src)
+    assert second != first
+    assert second == _reference(src)
+
+
+def test_recent_files_are_always_restated(tmp_path: Path) -> None:
+    src = _source(tmp_path)
+    growing = src / "CD1" / "02.mp3"
+    os.utime(growing)  # still being written
+    source_fingerprint(src)
+
+    # appended in place: the directory mtime does not move
+    with growing.open("ab") as fh:
+        fh.write(b"more")
+    os.utime(src / "CD1", ns=(OLD_NS, OLD_NS))
+    reset_fingerprint_memo()
+
+    assert source_fingerprint(src) == _reference(src)
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from mutagen.id3 import ID3
+
+import audiomason.state as state
+from audiomason.cli import _apply_tags_config
+from audiomason.tags import write_cover, write_tags
+from audiomason.util import AmConfigError
+
+AUDIO = b"\xff\xfb\x90\x00" + b"\x00" * 4000
+COVER = b"\xff\xd8" + b"c" * 20_000
+
+
+@pytest.fixture(autouse=True)
+def _opts(monkeypatch) -> None:
+    monkeypatch.setattr(state, "OPTS", state.Opts(tag_padding_kb=16))
+
+
+def _tag_size(p: Path) -> int:
+    return int(ID3(p).size)
+
+
+def test_first_write_reserves_cover_plus_padding(tmp_path: Path) -> None:
+    p = tmp_path / "01.mp3"
+    p.write_bytes(AUDIO)  # untagged, as copied or encoded
+
+    write_cover([p], cover=COVER, cover_mime="image/jpeg")
+
+    assert _tag_size(p) >= 2 * len(COVER) + 16 * 1024
+    assert p.read_bytes().endswith(AUDIO)
+
+
+def test_later_edits_rewrite_the_tag_in_place(tmp_path: Path) -> None:
+    p = tmp_path / "01.mp3"
+    p.write_bytes(AUDIO)
+    write_cover([p], cover=COVER, cover_mime="image/jpeg")
+    size = _tag_size(p)
+
+    write_tags([p], artist="Author", album="Book" * 100, cover=None, cover_mime=None)
+    write_cover([p], cover=COVER[::-1], cover_mime="image/jpeg")
+
+    assert _tag_size(p) == size
+    assert ID3(p).getall("APIC")[0].data == COVER[::-1]
+    assert p.stat().st_size == size + len(AUDIO)
+
+
+def test_padding_config() -> None:
+    opts = state.Opts()
+    _apply_tags_config(opts, {"tags": {"padding_kb": 0}})
+    assert opts.tag_padding_kb == 0
+    with pytest.raises(AmConfigError):
+        _apply_tags_config(opts, {"tags": {"padding_kb": -1}})
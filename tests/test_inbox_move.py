@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import json
+import zipfile
+from pathlib import Path
+
+import pytest
+
+import audiomason.state as state
+from audiomason.inbox_move import (
+    holds_moved_source,
+    move_into_stage,
+    restore_moved_source,
+    restore_moved_sources,
+)
+from audiomason.manifest import load_manifest
+from audiomason.state import Opts
+from audiomason.util import AmAbortError, AmUndoError
+
+
+def test_clean_inbox_yes_moves_sources_into_stage(monkeypatch, tmp_path: Path) -> None:
+    drop_root = tmp_path / "abooksinbox"
+    stage_root = tmp_path / "_am_stage"
+    archive_root = tmp_path / "abooks"
+    output_root = tmp_path / "abooks_ready"
+    for d in (drop_root, stage_root, archive_root, output_root):
+        d.mkdir(parents=True, exist_ok=True)
+    for name in ("Foo.Bar", "Foo.Baz"):
+        (drop_root / name).mkdir()
+        (drop_root / name / "01.mp3").write_bytes(name.encode())
+
+    import audiomason.import_flow as imp
+    import audiomason.preflight_resolve as pr
+
+    monkeypatch.setattr(imp, "get_drop_root", lambda cfg: drop_root)
+    monkeypatch.setattr(imp, "get_stage_root", lambda cfg: stage_root)
+    monkeypatch.setattr(imp, "get_archive_root", lambda cfg: archive_root)
+    monkeypatch.setattr(imp, "get_output_root", lambda cfg: output_root)
+
+    def no_copy(*a: object, **k: object) -> None:
+        raise AssertionError("source must be moved, not copied")
+
+    monkeypatch.setattr(imp, "copy_tree", no_copy)
+    monkeypatch.setattr(
+        state,
+        "OPTS",
+        Opts(yes=True, quiet=True, lookup=False, clean_inbox_mode="yes", verify_root=output_root),
+    )
+
+    answers = iter(["a", "Author One", "Book One", "Author Two", "Book Two"])
+    monkeypatch.setattr(imp, "prompt", lambda msg, default="": next(answers))
+    monkeypatch.setattr(pr, "prompt", lambda msg, default="": next(answers))
+    monkeypatch.setattr(imp, "prompt_yes_no", lambda *a, **k: False)
+    monkeypatch.setattr(pr, "prompt_yes_no", lambda *a, **k: False)
+
+    imp.run_import(cfg={})
+
+    assert list(drop_root.iterdir()) == []
+    assert (archive_root / "Author One" / "Book One" / "01.mp3").read_bytes().endswith(b"Foo.Bar")
+    for name in ("Foo.Bar", "Foo.Baz"):
+        move = load_manifest(stage_root / name).get("move")
+        assert isinstance(move, dict) and move.get("state") == "consumed"
+
+
+def test_interrupted_move_is_restored(tmp_path: Path) -> None:
+    src = tmp_path / "inbox" / "Book"
+    src.mkdir(parents=True)
+    (src / "01.mp3").write_bytes(b"x")
+    stage_run = tmp_path / "stage" / "book"
+    stage_run.mkdir(parents=True)
+
+    move_into_stage(src, stage_run / "src", stage_run)
+    assert not src.exists()
+
+    assert restore_moved_sources(tmp_path / "stage") == [src]
+    assert (src / "01.mp3").read_bytes() == b"x"
+    mf = json.loads((stage_run / "manifest.json").read_text(encoding="utf-8"))
+    assert mf["move"]["state"] == "restored"
+    # nothing left to restore
+    assert restore_moved_sources(tmp_path / "stage") == []
+
+
+def test_undo_after_move_keeps_the_source(monkeypatch, tmp_path: Path) -> None:
+    drop_root = tmp_path / "abooksinbox"
+    stage_root = tmp_path / "_am_stage"
+    for d in (drop_root, stage_root, tmp_path / "abooks", tmp_path / "abooks_ready"):
+        d.mkdir(parents=True, exist_ok=True)
+    # an archive: its unpacked stage outlives the move back, so reuse is offered
+    src = drop_root / "Foo.Bar.zip"
+    with zipfile.ZipFile(src, "w") as zf:
+        for book in ("A", "B"):
+            zf.writestr(f"{book}/01.mp3", b"only copy")
+    data = src.read_bytes()
+
+    import audiomason.import_flow as imp
+    import audiomason.preflight_resolve as pr
+
+    monkeypatch.setattr(imp, "get_drop_root", lambda cfg: drop_root)
+    monkeypatch.setattr(imp, "get_stage_root", lambda cfg: stage_root)
+    monkeypatch.setattr(imp, "get_archive_root", lambda cfg: tmp_path / "abooks")
+    monkeypatch.setattr(imp, "get_output_root", lambda cfg: tmp_path / "abooks_ready")
+    monkeypatch.setattr(
+        state, "OPTS", Opts(quiet=True, lookup=False, clean_inbox_mode="yes", verify_root=None)
+    )
+
+    in_inbox: dict[str, list[bool]] = {"source": [], "books": []}
+    reuse: list[str] = []
+
+    def decline(q: str, **k: object) -> bool:
+        reuse.append(q)
+        return False
+
+    def answer(msg: str, default: str = "") -> str:
+        if msg.startswith("Choose source"):
+            in_inbox["source"].append(src.exists())
+        elif msg.startswith("Choose book"):
+            in_inbox["books"].append(src.exists())
+            if len(in_inbox["books"]) == 1:
+                raise AmUndoError("undo")  # back to choose source
+            raise AmAbortError("stop")
+        return default or "1"
+
+    monkeypatch.setattr(imp, "prompt", answer)
+    monkeypatch.setattr(pr, "prompt", answer)
+    monkeypatch.setattr(imp, "prompt_yes_no", decline)
+    monkeypatch.setattr(pr, "prompt_yes_no", decline)
+
+    with pytest.raises(AmAbortError):
+        imp.run_import(cfg={})
+
+    assert "[stage] Reuse existing staged source?" in reuse
+
+    # moved while the books were chosen, back in the inbox at choose source
+    # (the stage, whose reuse was declined, was deleted) and after the abort
+    assert in_inbox == {"source": [True, True], "books": [False, False]}
+    assert src.read_bytes() == data
+
+
+def test_deleting_a_stage_never_drops_a_moved_source(monkeypatch, tmp_path: Path) -> None:
+    src = tmp_path / "inbox" / "Book"
+    src.mkdir(parents=True)
+    (src / "01.mp3").write_bytes(b"x")
+    stage_run = tmp_path / "stage" / "book"
+    stage_run.mkdir(parents=True)
+    move_into_stage(src, stage_run / "src", stage_run)
+
+    assert holds_moved_source(stage_run)
+    assert restore_moved_source(stage_run) == src
+    assert not holds_moved_source(stage_run)
+    assert (src / "01.mp3").read_bytes() == b"x"
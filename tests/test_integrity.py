@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from audiomason.integrity import SIDECAR, check_book, load_sidecar, write_sidecar
+from audiomason.verify import verify_library
+
+
+def _book(root: Path) -> Path:
+    book = root / "Author" / "Title"
+    book.mkdir(parents=True)
+    (book / "01.mp3").write_bytes(b"audio one")
+    (book / "cover.jpg").write_bytes(b"jpeg")
+    return book
+
+
+def test_sidecar_records_every_file(tmp_path: Path) -> None:
+    book = _book(tmp_path)
+    write_sidecar(book)
+
+    entries = load_sidecar(book)
+    assert entries is not None
+    assert sorted(entries) == ["01.mp3", "cover.jpg"]
+    assert entries["cover.jpg"]["size"] == 4
+    assert "duration" in entries["01.mp3"]
+    assert "duration" not in entries["cover.jpg"]
+    assert check_book(book) == []
+
+
+def test_stat_check_and_rehash(tmp_path: Path) -> None:
+    book = _book(tmp_path)
+    write_sidecar(book)
+    mp3 = book / "01.mp3"
+    st = mp3.stat()
+
+    # touched but identical: stat check flags it, rehash clears it
+    os.utime(mp3, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert check_book(book) == ["changed: 01.mp3"]
+    assert check_book(book, rehash=True) == []
+
+    # same size and mtime, different bytes: only rehash can tell
+    mp3.write_bytes(b"audio two")
+    os.utime(mp3, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert check_book(book) == []
+    assert check_book(book, rehash=True) == ["corrupt: 01.mp3"]
+
+
+def test_missing_and_untracked_files(tmp_path: Path) -> None:
+    book = _book(tmp_path)
+    write_sidecar(book)
+    (book / "cover.jpg").unlink()
+    (book / "02.mp3").write_bytes(b"extra")
+
+    assert check_book(book) == ["missing: cover.jpg", "untracked: 02.mp3"]
+
+
+def test_verify_reports_integrity(tmp_path: Path, capsys) -> None:
+    book = _book(tmp_path)
+    write_sidecar(book)
+    (book / "01.mp3").write_bytes(b"truncated")
+    other = tmp_path / "Author" / "Legacy"
+    other.mkdir()
+    assert not (other / SIDECAR).exists()
+
+    verify_library(tmp_path)
+
+    text = capsys.readouterr().out
+    assert "[verify] Title: changed: 01.mp3" in text
+    assert "integrity_errors=1, no_sidecar=1" in text
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import struct
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from mutagen.mp4 import MP4
+from mutagen.ogg import OggPage
+from mutagen.oggopus import OggOpus
+
+import audiomason.state as state
+from audiomason import audio
+from audiomason.cli import _apply_keep_codec_config
+from audiomason.covers import extract_embedded_cover_from_mp3
+from audiomason.rename import rename_sequential
+from audiomason.state import Opts
+from audiomason.tags import write_cover, write_tags
+from audiomason.util import AmConfigError
+
+
+def _write_opus(path: Path) -> None:
+    # smallest Ogg Opus stream mutagen accepts: head, tags, one audio page
+    head = b"OpusHead" + bytes([1, 1]) + struct.pack("<HIhB", 312, 48000, 0, 0)
+    tags = b"OpusTags" + struct.pack("<I", 4) + b"test" + struct.pack("<I", 0)
+    pages = []
+    for seq, (pkt, granule) in enumerate([(head, 0), (tags, 0), (b"\xfc" + b"\x00" * 10, 48000)]):
+        page = OggPage()
+        page.serial = 1
+        page.sequence = seq
+        page.position = granule
+        page.packets = [pkt]
+        page.first = seq == 0
+        page.last = seq == 2
+        pages.append(page.write())
+    path.write_bytes(b"".join(pages))
+
+
+def test_ogg_tracks_get_vorbis_comments_and_cover(tmp_path: Path) -> None:
+    track = tmp_path / "01.ogg"
+    _write_opus(track)
+
+    write_tags([track], artist="Author", album="Book", track_start=1, cover=None, cover_mime=None)
+    write_cover([track], cover=b"\x89PNG-data", cover_mime="image/png")
+
+    f = OggOpus(track)
+    assert f["artist"] == ["Author"]
+    assert f["album"] == ["Book"]
+    assert f["tracknumber"] == ["1"]
+    assert extract_embedded_cover_from_mp3(track) == (b"\x89PNG-data", "image/png")
+
+
+def _atom(typ: bytes, payload: bytes) -> bytes:
+    return (8 + len(payload)).to_bytes(4, "big") + typ + payload
+
+
+def _write_m4b(path: Path) -> None:
+    # ftyp + moov with one sound track: enough for mutagen.mp4
+    version_flags = b"\x00" * 4
+    mvhd = _atom(b"mvhd", version_flags + b"\x00" * 8 + struct.pack(">II", 1000, 5000))
+    mdhd = _atom(
+        b"mdhd", version_flags + b"\x00" * 8 + struct.pack(">II", 1000, 5000) + b"\x00" * 4
+    )
+    hdlr = _atom(b"hdlr", version_flags + b"\x00" * 4 + b"soun" + b"\x00" * 12)
+    stsd = _atom(b"stsd", version_flags + struct.pack(">I", 0))
+    minf = _atom(b"minf", _atom(b"stbl", stsd))
+    trak = _atom(b"trak", _atom(b"mdia", mdhd + hdlr + minf))
+    path.write_bytes(_atom(b"ftyp", b"M4A \x00\x00\x00\x00") + _atom(b"moov", mvhd + trak))
+
+
+def test_m4b_tracks_get_mp4_atoms_and_cover(tmp_path: Path) -> None:
+    track = tmp_path / "01.m4b"
+    _write_m4b(track)
+
+    write_tags([track], artist="Author", album="Book", track_start=3, cover=None, cover_mime=None)
+    write_cover([track], cover=b"jpeg-data", cover_mime="image/jpeg")
+
+    tags = MP4(track).tags
+    assert tags is not None
+    assert tags["\xa9ART"] == ["Author"]
+    assert tags["\xa9alb"] == ["Book"]
+    assert tags["trkn"] == [(3, 0)]
+    assert extract_embedded_cover_from_mp3(track) == (b"jpeg-data", "image/jpeg")
+
+
+def test_rename_sequential_keeps_container_suffix(tmp_path: Path) -> None:
+    a = tmp_path / "b.ogg"
+    b = tmp_path / "a.mp3"
+    a.write_bytes(b"1")
+    b.write_bytes(b"2")
+    assert [p.name for p in rename_sequential(tmp_path, [a, b])] == ["01.ogg", "02.mp3"]
+
+
+def test_keep_codec_stream_copies_qualifying_sources(monkeypatch, tmp_path: Path) -> None:
+    old_opts = state.OPTS
+    try:
+        state.OPTS = Opts(dry_run=False, keep_codec=("aac",), keep_codec_min_kbps=64)
+        monkeypatch.setattr(audio.shutil, "which", lambda name: f"/usr/bin/{name}")
+        rates = {"hi.m4a": ("aac", 128_000), "lo.m4a": ("aac", 32_000)}
+        monkeypatch.setattr(audio, "_audio_codec", lambda p: rates[p.name])
+        monkeypatch.setattr(audio, "m4a_chapters", lambda p, **_: [])
+        cmds: list[list[str]] = []
+
+        def fake_run_cmd(cmd, check=True, stdout=None):
+            if cmd[0] == "ffprobe":
+                return SimpleNamespace(stdout=b"{}")
+            cmds.append(cmd)
+            Path(cmd[-1]).write_bytes(b"out")
+            return SimpleNamespace(stdout=b"")
+
+        monkeypatch.setattr(audio, "run_cmd", fake_run_cmd)
+        for name in rates:
+            (tmp_path / name).write_bytes(b"m4a")
+
+        audio.convert_m4a_in_place(tmp_path, recursive=False)
+
+        by_out = {Path(c[-1]).name: c for c in cmds}
+        assert set(by_out) == {"hi.m4b", "lo.mp3"}
+        assert by_out["hi.m4b"][by_out["hi.m4b"].index("-c:a") + 1] == "copy"
+        assert "libmp3lame" in by_out["lo.mp3"]
+
+        # loudnorm needs a real encode
+        state.OPTS.loudnorm = True
+        assert audio.keep_codec_target(tmp_path / "hi.m4a") is None
+    finally:
+        state.OPTS = old_opts
+
+
+def test_keep_codec_min_kbps_config_is_validated() -> None:
+    opts = Opts()
+    _apply_keep_codec_config(opts, {"ffmpeg": {"keep_codec_min_kbps": 96}})
+    assert opts.keep_codec_min_kbps == 96
+    for bad in (-1, "fast", 1.5):
+        with pytest.raises(AmConfigError):
+            _apply_keep_codec_config(Opts(), {"ffmpeg": {"keep_codec_min_kbps": bad}})
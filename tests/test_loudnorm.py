@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+import audiomason.state as state
+from audiomason import audio, loudnorm
+from audiomason.cli import _apply_config_defaults
+from audiomason.state import Opts
+from audiomason.util import AmConfigError
+
+_STATS = {
+    "input_i": "-23.54",
+    "input_tp": "-7.96",
+    "input_lra": "0.00",
+    "input_thresh": "-34.17",
+    "target_offset": "0.58",
+}
+
+
+def test_two_pass_measures_once_and_encodes_linear(monkeypatch, tmp_path: Path) -> None:
+    old_opts = state.OPTS
+    try:
+        state.OPTS = Opts(
+            dry_run=False, loudnorm=True, loudnorm_mode="two-pass", cache_root=tmp_path / "cache"
+        )
+        monkeypatch.setattr(audio.shutil, "which", lambda name: f"/usr/bin/{name}")
+        measures: list[list[str]] = []
+        encodes: list[list[str]] = []
+
+        def fake_measure(cmd, check=True, stdout=None, stderr=None):
+            measures.append(cmd)
+            return SimpleNamespace(stderr=b"[Parsed_loudnorm_0]\n" + json.dumps(_STATS).encode())
+
+        def fake_encode(cmd, check=True, stdout=None):
+            encodes.append(cmd)
+            Path(cmd[-1]).write_bytes(b"mp3")
+            return SimpleNamespace(stdout=b"")
+
+        monkeypatch.setattr(loudnorm, "run_cmd", fake_measure)
+        monkeypatch.setattr(audio, "run_cmd", fake_encode)
+
+        src = tmp_path / "a.opus"
+        src.write_bytes(b"opus")
+        audio.opus_to_mp3_single(src, tmp_path / "a.mp3")
+
+        # a new run (fresh in-memory state) reuses the stored measurement
+        monkeypatch.setattr(loudnorm, "_LOUDNORM_CACHE", None)
+        audio.opus_to_mp3_single(src, tmp_path / "b.mp3")
+
+        assert len(measures) == 1
+        assert "null" in measures[0]
+        assert len(encodes) == 2
+        flt = encodes[1][encodes[1].index("-af") + 1]
+        assert "measured_I=-23.54" in flt
+        assert "offset=0.58" in flt
+        assert flt.endswith(":linear=true")
+    finally:
+        state.OPTS = old_opts
+
+
+def test_silent_source_falls_back_to_dynamic() -> None:
+    stats = dict(_STATS, input_i="-inf")
+    assert loudnorm._parse_stats(json.dumps(stats).encode()) is None
+
+
+def test_loudnorm_mode_config_is_validated() -> None:
+    ns = argparse.Namespace()
+    _apply_config_defaults(ns, {"ffmpeg": {"loudnorm_mode": "two-pass"}})
+    assert ns.loudnorm_mode == "two-pass"
+    with pytest.raises(AmConfigError, match="loudnorm_mode"):
+        _apply_config_defaults(argparse.Namespace(), {"ffmpeg": {"loudnorm_mode": "twopass"}})
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from audiomason import manifest
+from audiomason.manifest import (
+    JOURNAL_NAME,
+    MANIFEST_NAME,
+    ManifestSession,
+    flush_manifest,
+    load_manifest,
+    update_manifest,
+    write_manifest_atomic,
+)
+
+
+def _on_disk(stage_run: Path) -> dict[str, object]:
+    p = stage_run / MANIFEST_NAME
+    if not p.exists():
+        return {}
+    data: dict[str, object] = json.loads(p.read_text(encoding="utf-8"))
+    return data
+
+
+def test_patches_are_batched_until_a_checkpoint(monkeypatch, tmp_path: Path) -> None:
+    writes: list[Path] = []
+    real_write = manifest._write_manifest
+
+    def counting_write(stage_run: Path, data: dict[str, object]) -> None:
+        writes.append(stage_run)
+        real_write(stage_run, data)
+
+    monkeypatch.setattr(manifest, "_write_manifest", counting_write)
+    with ManifestSession(tmp_path, flush_seconds=3600):
+        for i in range(100):
+            update_manifest(tmp_path, {"books": {"processed": [str(n) for n in range(i + 1)]}})
+        assert writes == []
+        assert len(load_manifest(tmp_path)["books"]["processed"]) == 100  # type: ignore[index]
+
+        flush_manifest(tmp_path)
+        assert len(writes) == 1
+        assert not (tmp_path / JOURNAL_NAME).exists()
+        update_manifest(tmp_path, {"decisions": {"author": "A"}})
+
+    assert len(writes) == 2
+    mf = _on_disk(tmp_path)
+    assert mf["schema_version"] == 1
+    assert mf["decisions"] == {"author": "A"}
+
+
+def test_crash_is_recovered_from_the_journal(tmp_path: Path) -> None:
+    update_manifest(tmp_path, {"source": {"name": "Book"}})
+    ManifestSession(tmp_path, flush_seconds=3600).open()
+    update_manifest(tmp_path, {"books": {"picked": ["A"]}})
+    update_manifest(tmp_path, {"books": {"processed": ["A"]}})
+    # killed here: never flushed or closed, last line torn
+    with (tmp_path / JOURNAL_NAME).open("a", encoding="utf-8") as fh:
+        fh.write('{"books": {"pro')
+    manifest._SESSIONS.clear()
+
+    assert _on_disk(tmp_path) == {"schema_version": 1, "source": {"name": "Book"}}
+    expected = {
+        "schema_version": 1,
+        "source": {"name": "Book"},
+        "books": {"picked": ["A"], "processed": ["A"]},
+    }
+    assert load_manifest(tmp_path) == expected
+    with ManifestSession(tmp_path):
+        pass
+    assert _on_disk(tmp_path) == expected
+    assert not (tmp_path / JOURNAL_NAME).exists()
+
+
+def test_replace_and_timer_write_through(tmp_path: Path) -> None:
+    with ManifestSession(tmp_path, flush_seconds=0):
+        update_manifest(tmp_path, {"stage": {"files": {"a": [1, 2]}}})
+        assert _on_disk(tmp_path)["stage"] == {"files": {"a": [1, 2]}}
+
+    with ManifestSession(tmp_path, flush_seconds=3600):
+        mf = load_manifest(tmp_path)
+        mf["stage"] = {"files": {}}
+        write_manifest_atomic(tmp_path, mf)
+        assert _on_disk(tmp_path)["stage"] == {"files": {}}
+
+
+def test_discarded_session_does_not_recreate_the_stage(tmp_path: Path) -> None:
+    stage_run = tmp_path / "run"
+    with ManifestSession(stage_run, flush_seconds=3600) as session:
+        update_manifest(stage_run, {"decisions": {"clean_stage": True}})
+        session.discard()
+        (stage_run / JOURNAL_NAME).unlink()
+        stage_run.rmdir()
+    assert not stage_run.exists()
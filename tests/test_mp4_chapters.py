@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from audiomason import audio
+from audiomason.mp4_chapters import read_mp4_chapters
+
+
+def _atom(typ: bytes, payload: bytes) -> bytes:
+    return (8 + len(payload)).to_bytes(4, "big") + typ + payload
+
+
+def _full(typ: bytes, payload: bytes) -> bytes:
+    return _atom(typ, b"\x00\x00\x00\x00" + payload)
+
+
+def _mvhd(timescale: int, duration: int) -> bytes:
+    return _full(b"mvhd", b"\x00" * 8 + timescale.to_bytes(4, "big") + duration.to_bytes(4, "big"))
+
+
+def _u32(*vals: int) -> bytes:
+    return b"".join(v.to_bytes(4, "big") for v in vals)
+
+
+def test_nero_chapters(tmp_path: Path) -> None:
+    marks = [(0, b"Intro"), (90 * 10_000_000, b"Part 2")]
+    chpl = b"\x00" + len(marks).to_bytes(1, "big")
+    for start, title in marks:
+        chpl += start.to_bytes(8, "big") + len(title).to_bytes(1, "big") + title
+    moov = _atom(b"moov", _mvhd(1000, 300_000) + _atom(b"udta", _full(b"chpl", chpl[1:])))
+    src = tmp_path / "book.m4b"
+    src.write_bytes(_atom(b"ftyp", b"M4B \x00\x00\x00\x00") + moov)
+
+    ch = read_mp4_chapters(src)
+    assert ch is not None
+    assert [(c["start_time"], c["end_time"]) for c in ch] == [
+        ("0.000000", "90.000000"),
+        ("90.000000", "300.000000"),
+    ]
+    assert [c["tags"] for c in ch] == [{"title": "Intro"}, {"title": "Part 2"}]
+
+
+def _chapter_track_book(tmp_path: Path, audio_mdia: bytes = b"") -> Path:
+    titles = [b"One", b"Two"]
+    samples = b"".join(len(t).to_bytes(2, "big") + t for t in titles)
+    mdat = _atom(b"mdat", samples)
+    head = _atom(b"ftyp", b"M4A \x00\x00\x00\x00")
+    data_off = len(head) + 8
+
+    audio_trak = _atom(
+        b"trak",
+        _full(b"tkhd", b"\x00" * 8 + _u32(1))
+        + _atom(b"tref", _atom(b"chap", _u32(2)))
+        + audio_mdia,
+    )
+    stbl = _atom(
+        b"stbl",
+        _full(b"stts", _u32(1, 2, 600))
+        + _full(b"stsz", _u32(0, 2, 5, 5))
+        + _full(b"stsc", _u32(1, 1, 2, 1))
+        + _full(b"stco", _u32(1, data_off)),
+    )
+    text_trak = _atom(
+        b"trak",
+        _full(b"tkhd", b"\x00" * 8 + _u32(2))
+        + _atom(
+            b"mdia",
+            _full(b"mdhd", b"\x00" * 8 + _u32(10, 1200))
+            + _full(b"hdlr", b"\x00" * 4 + b"text")
+            + _atom(b"minf", stbl),
+        ),
+    )
+    moov = _atom(b"moov", _mvhd(10, 1200) + audio_trak + text_trak)
+    src = tmp_path / "book.m4a"
+    src.write_bytes(head + mdat + moov)
+    return src
+
+
+def test_quicktime_chapter_track(tmp_path: Path) -> None:
+    ch = read_mp4_chapters(_chapter_track_book(tmp_path))
+    assert ch is not None
+    assert [(c["start_time"], c["end_time"]) for c in ch] == [
+        ("0.000000", "60.000000"),
+        ("60.000000", "120.000000"),
+    ]
+    assert [c["tags"] for c in ch] == [{"title": "One"}, {"title": "Two"}]
+
+
+def test_long_audio_track_tables_are_not_decoded(tmp_path: Path) -> None:
+    # ~8h of AAC at 1024 samples/frame, 44.1kHz
+    frames = 1_250_000
+    stbl = _atom(
+        b"stbl",
+        _full(b"stts", _u32(1, frames, 1024))
+        + _full(b"stsz", _u32(0, frames) + b"\x00\x00\x01\x00" * frames)
+        + _full(b"stsc", _u32(1, 1, 1, 1))
+        + _full(b"stco", _u32(1, 0)),
+    )
+    audio_mdia = _atom(
+        b"mdia",
+        _full(b"mdhd", b"\x00" * 8 + _u32(44_100, frames * 1024))
+        + _full(b"hdlr", b"\x00" * 4 + b"soun")
+        + _atom(b"minf", stbl),
+    )
+
+    ch = read_mp4_chapters(_chapter_track_book(tmp_path, audio_mdia))
+    assert ch is not None
+    assert [c["tags"] for c in ch] == [{"title": "One"}, {"title": "Two"}]
+
+
+def test_m4a_chapters_skips_ffprobe_when_parsed(monkeypatch, tmp_path: Path) -> None:
+    src = tmp_path / "book.m4b"
+    src.write_bytes(_atom(b"moov", _mvhd(1000, 5000)))
+
+    def boom(path: Path) -> dict[str, object]:
+        raise AssertionError("ffprobe must not run")
+
+    monkeypatch.setattr(audio, "ffprobe_json", boom)
+    assert audio.m4a_chapters(src) == []
+
+
+def test_unparseable_file_returns_none(tmp_path: Path) -> None:
+    src = tmp_path / "junk.m4a"
+    src.write_bytes(b"not an mp4 at all")
+    assert read_mp4_chapters(src) is None
@@ -74,3 +74,37 @@ def test_detect_books_after_opus_conversion(monkeypatch, tmp_path: Path) -> None
         assert books, "expected at least one detected book after opus conversion"
     finally:
         state.OPTS = old_opts
+
+
+def test_process_converts_from_stage_into_outdir(monkeypatch, tmp_path: Path) -> None:
+    old_opts = getattr(state, "OPTS", None)
+    try:
+        state.OPTS = Opts(
+            dry_run=False, loudnorm=False, q_a="2", ff_loglevel="warning", cpu_cores=None
+        )
+        group = tmp_path / "stage" / "book"
+        group.mkdir(parents=True)
+        (group / "01.mp3").write_bytes(b"mp3")
+        (group / "02.opus").write_bytes(b"fake-opus")
+        outdir = tmp_path / "out"
+
+        monkeypatch.setattr(audio.shutil, "which", lambda name: f"/usr/bin/{name}")
+        inputs: list[Path] = []
+
+        def fake_run_cmd(cmd, check=True, stdout=None):
+            if cmd[0] == "ffprobe":
+                return SimpleNamespace(stdout=b"{}")
+            inputs.append(Path(cmd[cmd.index("-i") + 1]))
+            Path(cmd[-1]).write_bytes(b"fake-mp3")
+            return SimpleNamespace(stdout=b"")
+
+        monkeypatch.setattr(audio, "run_cmd", fake_run_cmd)
+
+        imp._copy_mp3s_to_out(group, outdir)
+        audio.convert_opus_in_place(group, recursive=False, outdir=outdir)
+
+        assert inputs == [group / "02.opus"]
+        assert sorted(p.name for p in outdir.iterdir()) == ["01.mp3", "02.mp3"]
+        assert sorted(p.name for p in group.iterdir()) == ["01.mp3", "02.opus"]
+    finally:
+        state.OPTS = old_opts
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import argparse
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+import audiomason.state as state
+from audiomason import audio
+from audiomason.cli import _apply_config_defaults
+from audiomason.state import Opts
+from audiomason.util import AmConfigError, AmExternalToolError
+
+
+def _opts(cores: int) -> Opts:
+    return Opts(dry_run=False, loudnorm=False, q_a="2", ff_loglevel="warning", cpu_cores=cores)
+
+
+def _which(name: str) -> str:
+    return f"/usr/bin/{name}"
+
+
+def test_convert_opus_runs_workers_concurrently(monkeypatch, tmp_path: Path, capsys) -> None:
+    old_opts = state.OPTS
+    try:
+        state.OPTS = _opts(8)
+        for i in range(1, 7):
+            (tmp_path / f"{i:02d}.opus").write_bytes(b"fake-opus")
+
+        monkeypatch.setattr(audio.shutil, "which", _which)
+        lock = threading.Lock()
+        running = 0
+        peak = 0
+
+        def fake_run_cmd(cmd, check=True, stdout=None):
+            nonlocal running, peak
+            if cmd[0] == "ffprobe":
+                return SimpleNamespace(stdout=b"{}")
+            assert "-nostats" in cmd
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.05)
+            Path(cmd[-1]).write_bytes(b"fake-mp3")
+            with lock:
+                running -= 1
+            return SimpleNamespace(stdout=b"")
+
+        monkeypatch.setattr(audio, "run_cmd", fake_run_cmd)
+
+        audio.convert_opus_in_place(tmp_path, recursive=False)
+
+        assert peak > 1
+        assert sorted(p.name for p in tmp_path.glob("*.mp3")) == [
+            f"{i:02d}.mp3" for i in range(1, 7)
+        ]
+        lines = [ln for ln in capsys.readouterr().out.splitlines() if "/6 " in ln]
+        assert lines == [f"[convert] {i}/6 {i:02d}.opus" for i in range(1, 7)]
+    finally:
+        state.OPTS = old_opts
+
+
+def test_convert_first_failure_cancels_pending_jobs(monkeypatch, tmp_path: Path) -> None:
+    old_opts = state.OPTS
+    try:
+        state.OPTS = _opts(4)  # 2 workers
+        for i in range(1, 9):
+            (tmp_path / f"{i:02d}.opus").write_bytes(b"fake-opus")
+
+        monkeypatch.setattr(audio.shutil, "which", _which)
+        started: list[str] = []
+
+        def fake_run_cmd(cmd, check=True, stdout=None):
+            if cmd[0] == "ffprobe":
+                return SimpleNamespace(stdout=b"{}")
+            dst = Path(cmd[-1])
+            started.append(dst.name)
+            dst.write_bytes(b"partial")
+            if dst.name == "01.mp3":
+                raise AmExternalToolError("External tool failed: ffmpeg (exit 1)")
+            time.sleep(0.05)
+            return SimpleNamespace(stdout=b"")
+
+        monkeypatch.setattr(audio, "run_cmd", fake_run_cmd)
+
+        with pytest.raises(AmExternalToolError):
+            audio.convert_opus_in_place(tmp_path, recursive=False)
+
+        assert not (tmp_path / "01.mp3").exists()
+        assert len(started) < 8
+    finally:
+        state.OPTS = old_opts
+
+
+def test_colliding_outputs_run_serially_with_a_serial_schedule(monkeypatch, tmp_path: Path) -> None:
+    old_opts = state.OPTS
+    try:
+        state.OPTS = _opts(4)
+        for sub in ("a", "b"):
+            (tmp_path / "stage" / sub).mkdir(parents=True)
+            (tmp_path / "stage" / sub / "01.opus").write_bytes(b"fake-opus")
+        outdir = tmp_path / "out"
+        outdir.mkdir()
+        monkeypatch.setattr(audio.shutil, "which", _which)
+        cmds: list[list[str]] = []
+
+        def fake_run_cmd(cmd, check=True, stdout=None):
+            if cmd[0] == "ffprobe":
+                return SimpleNamespace(stdout=b"{}")
+            cmds.append(cmd)
+            return SimpleNamespace(stdout=b"")
+
+        monkeypatch.setattr(audio, "run_cmd", fake_run_cmd)
+
+        sched = audio.convert_opus_in_place(tmp_path / "stage", outdir=outdir)
+
+        assert sched is not None and sched.workers == 1
+        assert sched.threads == (4, 4)
+        for cmd in cmds:
+            assert "-stats" in cmd
+            assert cmd[cmd.index("-threads") + 1] == "4"
+    finally:
+        state.OPTS = old_opts
+
+
+def _chapters(n: int, length: float) -> list[dict[str, object]]:
+    return [{"start_time": str(i * length), "end_time": str((i + 1) * length)} for i in range(n)]
+
+
+def test_split_parallel_encodes_each_chapter(monkeypatch, tmp_path: Path) -> None:
+    old_opts = state.OPTS
+    try:
+        state.OPTS = _opts(4)
+        src = tmp_path / "book.m4b"
+        src.write_bytes(b"fake-m4b")
+        monkeypatch.setattr(audio, "m4a_chapters", lambda p, **_: _chapters(6, 600.0))
+        cmds: list[list[str]] = []
+        lock = threading.Lock()
+
+        def fake_run_cmd(cmd, check=True, stdout=None):
+            with lock:
+                cmds.append(cmd)
+            Path(cmd[-1]).write_bytes(b"fake-mp3")
+            return SimpleNamespace(stdout=b"")
+
+        monkeypatch.setattr(audio, "run_cmd", fake_run_cmd)
+
+        produced = audio.m4a_split_by_chapters(src, tmp_path / "out")
+
+        assert [p.name for p in produced] == [f"{i:02d}.mp3" for i in range(1, 7)]
+        assert len(cmds) == 6
+        spans = sorted(
+            (float(c[c.index("-ss") + 1]), float(c[c.index("-t") + 1]), Path(c[-1]).name)
+            for c in cmds
+        )
+        assert spans == [(i * 600.0, 600.0, f"{i + 1:02d}.mp3") for i in range(6)]
+        assert all("segment" not in c for c in cmds)
+    finally:
+        state.OPTS = old_opts
+
+
+def test_convert_m4a_probes_each_source_once(monkeypatch, tmp_path: Path) -> None:
+    old_opts = state.OPTS
+    try:
+        state.OPTS = _opts(1)
+        for sub in ("a", "b"):
+            (tmp_path / sub).mkdir()
+            (tmp_path / sub / "book.m4a").write_bytes(b"fake-m4a")
+        monkeypatch.setattr(audio.shutil, "which", _which)
+        probed: list[str] = []
+
+        def fake_chapters(p: Path, **_: object) -> list[dict[str, object]]:
+            probed.append(p.parent.name)
+            return _chapters(2, 60.0)
+
+        def fake_run_cmd(cmd, check=True, stdout=None):
+            if cmd[0] == "ffprobe":
+                return SimpleNamespace(stdout=b"{}")
+            return SimpleNamespace(stdout=b"")
+
+        monkeypatch.setattr(audio, "m4a_chapters", fake_chapters)
+        monkeypatch.setattr(audio, "run_cmd", fake_run_cmd)
+
+        audio.convert_m4a_in_place(tmp_path)
+
+        assert probed == ["a", "b"]
+    finally:
+        state.OPTS = old_opts
+
+
+@pytest.mark.parametrize("cores", [1, 4])
+def test_convert_logs_each_result_after_its_source(
+    monkeypatch, tmp_path: Path, capsys, cores: int
+) -> None:
+    old_opts = state.OPTS
+    try:
+        state.OPTS = _opts(cores)
+        for sub in ("a", "b"):
+            (tmp_path / sub).mkdir()
+            (tmp_path / sub / f"{sub}.m4a").write_bytes(b"fake-m4a")
+        monkeypatch.setattr(audio.shutil, "which", _which)
+
+        def fake_run_cmd(cmd, check=True, stdout=None):
+            if cmd[0] == "ffprobe":
+                return SimpleNamespace(stdout=b"{}")
+            for i in (1, 2):
+                Path(cmd[-1].replace("%02d", f"{i:02d}")).write_bytes(b"fake-mp3")
+            return SimpleNamespace(stdout=b"")
+
+        monkeypatch.setattr(audio, "read_mp4_chapters", lambda p: _chapters(2, 60.0))
+        monkeypatch.setattr(audio, "run_cmd", fake_run_cmd)
+
+        sched = audio.convert_m4a_in_place(tmp_path)
+
+        assert sched is not None and (sched.workers > 1) == (cores > 1)
+        logged = capsys.readouterr().out.splitlines()
+        lines = [ln for ln in logged if not ln.startswith(("[convert] found", "[convert] running"))]
+        assert lines == [
+            "[convert] 1/2 a.m4a",
+            "[chapters] a.m4a: 2 chapter(s)",
+            "[split] splitting by chapters: 2 tracks (single-pass)",
+            "[convert] split produced 2 mp3",
+            "[convert] 2/2 b.m4a",
+            "[chapters] b.m4a: 2 chapter(s)",
+            "[split] splitting by chapters: 2 tracks (single-pass)",
+            "[convert] split produced 2 mp3",
+        ]
+    finally:
+        state.OPTS = old_opts
+
+
+def test_split_auto_keeps_short_sources_single_pass(monkeypatch, tmp_path: Path) -> None:
+    old_opts = state.OPTS
+    try:
+        state.OPTS = _opts(4)
+        assert audio.split_mode(600.0, 4) == "single"
+        assert audio.split_mode(4 * 3600.0, 1) == "single"
+        assert audio.split_mode(4 * 3600.0, 4) == "parallel"
+        state.OPTS.split_mode = "single"
+        assert audio.split_mode(4 * 3600.0, 4) == "single"
+    finally:
+        state.OPTS = old_opts
+
+
+def test_split_mode_config_is_validated() -> None:
+    ns = argparse.Namespace()
+    _apply_config_defaults(ns, {"ffmpeg": {"split_mode": "parallel"}})
+    assert ns.split_mode == "parallel"
+    with pytest.raises(AmConfigError, match="split_mode"):
+        _apply_config_defaults(argparse.Namespace(), {"ffmpeg": {"split_mode": "paralel"}})
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from types import SimpleNamespace
+
+import audiomason.state as state
+from audiomason import audio
+from audiomason.stat_cache import StatCache
+from audiomason.state import Opts
+
+
+def test_ffprobe_json_is_served_from_disk_cache(monkeypatch, tmp_path: Path) -> None:
+    old_opts = state.OPTS
+    try:
+        state.OPTS = Opts(cache_root=tmp_path / "cache")
+        src = tmp_path / "book.m4a"
+        src.write_bytes(b"fake-m4a")
+        calls: list[str] = []
+
+        def fake_run_cmd(cmd, check=True, stdout=None):
+            calls.append(cmd[-1])
+            return SimpleNamespace(stdout=json.dumps({"chapters": [{"id": 1}]}).encode())
+
+        monkeypatch.setattr(audio.shutil, "which", lambda name: f"/usr/bin/{name}")
+        monkeypatch.setattr(audio, "run_cmd", fake_run_cmd)
+
+        assert audio.ffprobe_json(src) == {"chapters": [{"id": 1}]}
+        monkeypatch.setattr(audio, "_PROBE_CACHE", None)  # new run: memo gone, disk stays
+        assert len(audio.m4a_chapters(src)) == 1
+        assert calls == [str(src)]
+        assert len(list((tmp_path / "cache" / "probe").glob("*.json"))) == 1
+
+        # changed file => miss
+        os.utime(src, ns=(1, 1))
+        audio.ffprobe_json(src)
+        assert len(calls) == 2
+    finally:
+        state.OPTS = old_opts
+
+
+def test_stat_cache_rejects_other_versions_and_evicts_lru(tmp_path: Path) -> None:
+    files = []
+    for i in range(4):
+        f = tmp_path / f"{i}.opus"
+        f.write_bytes(b"x")
+        files.append(f)
+
+    root = tmp_path / "probe"
+    StatCache(root, version=1, max_bytes=10**6).put(files[0], {"a": 1})
+    assert StatCache(root, version=2, max_bytes=10**6).get(files[0]) is None
+    assert StatCache(root, version=1, max_bytes=10**6).get(files[0]) == {"a": 1}
+
+    cache = StatCache(root, version=1, max_bytes=10**6)
+    for i, f in enumerate(files):
+        cache.put(f, {"i": i})
+    entries = sorted(root.glob("*.json"), key=lambda p: p.stat().st_mtime_ns)
+    for n, p in enumerate(entries):
+        os.utime(p, ns=(n * 10**9, n * 10**9))
+    cache.max_bytes = entries[0].stat().st_size * 2
+    assert cache.evict() == 2
+    assert sorted(root.glob("*.json")) == sorted(entries[2:])
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import errno
+import os
+from pathlib import Path
+
+from audiomason import publish
+from audiomason.publish import publish_dir
+
+
+def _book(root: Path) -> Path:
+    book = root / "ready" / "Author" / "Title"
+    book.mkdir(parents=True)
+    (book / "01.mp3").write_bytes(b"one")
+    (book / "cover.jpg").write_bytes(b"jpeg")
+    return book
+
+
+def test_same_filesystem_publish_is_a_rename(tmp_path: Path) -> None:
+    book = _book(tmp_path)
+    inode = book.stat().st_ino
+    dst = tmp_path / "library" / "Author" / "Title"
+
+    assert publish_dir(book, dst) == "rename"
+
+    assert not book.exists()
+    assert dst.stat().st_ino == inode
+    assert (dst / "01.mp3").read_bytes() == b"one"
+
+
+def test_existing_book_is_replaced(tmp_path: Path) -> None:
+    book = _book(tmp_path)
+    dst = tmp_path / "library" / "Author" / "Title"
+    dst.mkdir(parents=True)
+    (dst / "stale.mp3").write_bytes(b"old")
+
+    publish_dir(book, dst)
+
+    assert sorted(p.name for p in dst.iterdir()) == ["01.mp3", "cover.jpg"]
+    assert [p.name for p in dst.parent.iterdir()] == ["Title"]
+
+
+def test_cross_device_publish_copies_then_renames(monkeypatch, tmp_path: Path) -> None:
+    book = _book(tmp_path)
+    dst = tmp_path / "library" / "Author" / "Title"
+    real_rename = os.rename
+    renamed: list[str] = []
+
+    def rename(a: Path, b: Path) -> None:
+        if Path(a) == book:
+            raise OSError(errno.EXDEV, "cross-device link")
+        renamed.append(Path(a).name)
+        real_rename(a, b)
+
+    monkeypatch.setattr(publish.os, "rename", rename)
+
+    assert publish_dir(book, dst) == "copy"
+
+    # the book only ever appears under its final name via a hidden temp dir
+    assert renamed == [f".Title.publishing-{os.getpid()}"]
+    assert not book.exists()
+    assert (dst / "cover.jpg").read_bytes() == b"jpeg"
+    assert [p.name for p in dst.parent.iterdir()] == ["Title"]
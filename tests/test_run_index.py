@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from audiomason.import_flow import _build_json_report, _choose_source
+from audiomason.manifest import load_manifest, update_manifest
+from audiomason.run_index import RunIndex, run_index_path, show_status
+
+
+def _run(stage_root: Path, slug: str, picked: list[str], processed: list[str]) -> Path:
+    sr = stage_root / slug
+    update_manifest(
+        sr,
+        {
+            "source": {"name": f"{slug}.zip", "stem": slug, "path": f"/in/{slug}.zip"},
+            "books": {"detected": picked, "picked": picked, "processed": processed},
+            "decisions": {"author": "Auth", "publish": True},
+            "book_meta": {lbl: {"title": lbl.upper(), "dest_kind": "output"} for lbl in picked},
+        },
+    )
+    return sr
+
+
+def test_record_and_states(tmp_path: Path) -> None:
+    index = RunIndex(tmp_path)
+    for sr in (
+        _run(tmp_path, "fresh", ["A"], []),
+        _run(tmp_path, "half", ["A", "B"], ["A"]),
+        _run(tmp_path, "done", ["A"], ["A"]),
+    ):
+        index.record(sr, load_manifest(sr))
+
+    runs = index.runs()
+    assert {slug: r.state for slug, r in runs.items()} == {
+        "fresh": "staged",
+        "half": "partial",
+        "done": "done",
+    }
+    assert runs["half"].books[0].meta == {"title": "A", "dest_kind": "output"}
+    assert index.progress() == {"half": (1, 2)}
+    assert run_index_path(tmp_path).exists()
+
+
+def test_book_updates_without_manifest_reload(tmp_path: Path) -> None:
+    index = RunIndex(tmp_path)
+    sr = _run(tmp_path, "half", ["A", "B"], ["A"])
+    index.record(sr, load_manifest(sr))
+
+    index.record_book(sr, "B", "started", started_ns=123)
+    assert index.runs(["half"])["half"].books[1].status == "started"
+    index.record_book(sr, "B", "processed", seconds=4.5)
+
+    run = index.runs(["half"])["half"]
+    assert run.state == "done"
+    assert run.processed == ("A", "B")
+    assert (run.books[1].started_ns, run.books[1].seconds) == (123, 4.5)
+    assert index.progress() == {}
+
+
+def test_rebuild_and_report_match_manifests(tmp_path: Path) -> None:
+    runs = [_run(tmp_path, "half", ["A", "B"], ["A"]), _run(tmp_path, "done", ["A"], ["A"])]
+    index = RunIndex(tmp_path)
+    assert index.rebuild() == 2
+
+    from_index = _build_json_report(runs, index)
+    assert from_index == _build_json_report(runs)
+    assert from_index["results"] == {"sources_total": 2, "books_total": 3, "books_processed": 2}
+
+    # a cleaned stage is forgotten on rebuild
+    index.mark_cleaned(runs[1])
+    assert index.runs()["done"].state == "cleaned"
+    (runs[1] / "manifest.json").unlink()
+    assert index.rebuild() == 1
+    assert list(index.runs()) == ["half"]
+
+
+def test_choose_source_shows_half_done_runs(monkeypatch, capsys) -> None:
+    from audiomason import import_flow as mod
+
+    monkeypatch.setattr(mod, "pf_prompt", lambda *a, **k: "1")
+    _choose_source({}, [Path("Foo Bar"), Path("Other")], {"Foo_Bar": (1, 3)})
+
+    text = capsys.readouterr().out
+    assert "1) Foo Bar  [resume: 1/3 processed]" in text
+    assert "2) Other\n" in text
+
+
+def test_status_rebuilds_a_missing_index(tmp_path: Path, capsys) -> None:
+    _run(tmp_path, "half", ["A", "B"], ["A"])
+
+    assert show_status(tmp_path) == 0
+    text = capsys.readouterr().out
+    assert "index rebuilt from 1 manifest(s)" in text
+    assert "[status] half: partial 1/2 books" in text
+    assert "runs=1, staged=0, partial=1, done=0, cleaned=0" in text
+
+    show_status(tmp_path, as_json=True)
+    payload = json.loads(capsys.readouterr().out)
+    assert payload[0]["books"] == {"A": "processed", "B": "pending"}
+
+
+def test_corrupt_index_falls_back_to_manifests(tmp_path: Path, capsys) -> None:
+    sr = _run(tmp_path, "half", ["A", "B"], ["A"])
+    path = run_index_path(tmp_path)
+    path.parent.mkdir(parents=True)
+    path.write_bytes(b"not a database" * 100)
+
+    index = RunIndex(tmp_path)
+    assert index.runs() == {} and index.progress() == {}
+    assert index.broken
+    assert _build_json_report([sr], index) == _build_json_report([sr])
+    index.close()
+
+    assert show_status(tmp_path) == 0
+    assert "[status] half: partial 1/2 books" in capsys.readouterr().out
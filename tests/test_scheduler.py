@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from audiomason.scheduler import MAX_THREADS_PER_PROCESS, plan_transcodes
+
+
+def test_single_long_file_gets_more_threads():
+    s = plan_transcodes(32, [72000.0])
+    assert s.workers == 1
+    assert s.threads == (MAX_THREADS_PER_PROCESS,)
+
+
+def test_many_short_files_get_more_processes():
+    s = plan_transcodes(8, [600.0] * 200)
+    assert s.workers == 8
+    assert set(s.threads) == {1}
+
+
+def test_long_file_in_mixed_batch_gets_larger_share():
+    s = plan_transcodes(16, [36000.0, 600.0, 600.0, 600.0], names=["a", "b", "c", "d"])
+    assert s.workers == 4
+    assert s.threads[0] > s.threads[1]
+    assert s.threads[1] >= 1
+
+
+def test_schedule_manifest_lists_decisions():
+    s = plan_transcodes(4, [10.0, None], names=["01.m4a", "02.m4a"])
+    assert s.to_manifest() == {
+        "cores": 4,
+        "workers": 2,
+        "files": [
+            {"name": "01.m4a", "duration": 10.0, "threads": 2},
+            {"name": "02.m4a", "duration": None, "threads": 2},
+        ],
+    }
+
+
+def test_concurrent_threads_stay_within_the_budget():
+    for cores, durations in (
+        (8, [36000.0] + [600.0] * 7),
+        (6, [36000.0, 30000.0, 600.0, 600.0]),
+        (3, [7200.0, 60.0, 60.0]),
+    ):
+        s = plan_transcodes(cores, durations)
+        assert sum(sorted(s.threads, reverse=True)[: s.workers]) <= cores
+    # a lone long job still gets a larger share than the short ones
+    s = plan_transcodes(16, [36000.0, 600.0, 600.0, 600.0])
+    assert s.threads[0] > s.threads[1]
+
+
+def test_max_workers_replans_threads():
+    s = plan_transcodes(4, [600.0, 600.0], max_workers=1)
+    assert s.workers == 1
+    assert s.threads == (4, 4)
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from audiomason import import_flow as imp
+from audiomason import stage_index
+from audiomason.covers import find_file_cover
+from audiomason.stage_index import TreeIndex
+
+OLD_NS = 1_000_000_000_000_000_000
+
+
+def _age(root: Path) -> None:
+    # make directory listings old enough to be trusted by the index
+    for d in [root, *(p for p in root.rglob("*") if p.is_dir())]:
+        os.utime(d, ns=(OLD_NS, OLD_NS))
+
+
+def test_each_directory_is_scanned_once(monkeypatch, tmp_path: Path) -> None:
+    stage = tmp_path / "src"
+    for rel in ("A/Book1/01.mp3", "A/Book1/CD2/01.m4a", "B/Book2/01.opus", "B/notes/x.txt"):
+        p = stage / rel
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_bytes(b"x")
+    _age(stage)
+    index = TreeIndex()
+    monkeypatch.setattr(imp, "STAGE_INDEX", index)
+
+    scanned: list[str] = []
+    real_scandir = os.scandir
+
+    def counting_scandir(path: object = ".") -> object:
+        # os is shared: only count the stage tree
+        if isinstance(path, Path) and path.is_relative_to(stage):
+            scanned.append(path.relative_to(stage).as_posix())
+        return real_scandir(path)  # type: ignore[arg-type]
+
+    monkeypatch.setattr(stage_index.os, "scandir", counting_scandir)
+
+    books = imp._detect_books(stage)
+    for b in books:
+        imp._collect_audio_files(b.group_root)
+
+    assert [b.label for b in books] == ["A/Book1", "A/Book1/CD2", "B/Book2"]
+    assert books[0].m4a_hint == stage / "A" / "Book1" / "CD2" / "01.m4a"
+    assert sorted(scanned) == sorted(
+        [".", "A", "A/Book1", "A/Book1/CD2", "B", "B/Book2", "B/notes"]
+    )
+
+
+def test_changed_directory_is_rescanned(tmp_path: Path) -> None:
+    index = TreeIndex()
+    (tmp_path / "01.mp3").write_bytes(b"x")
+    _age(tmp_path)
+    assert index.files(tmp_path, {".mp3"}) == [tmp_path / "01.mp3"]
+
+    (tmp_path / "02.mp3").write_bytes(b"y")
+
+    assert index.files(tmp_path, {".mp3"}) == [tmp_path / "01.mp3", tmp_path / "02.mp3"]
+
+
+def test_find_file_cover_prefers_group_then_stage(tmp_path: Path) -> None:
+    group = tmp_path / "Book"
+    group.mkdir()
+    (tmp_path / "cover.jpg").write_bytes(b"stage")
+    assert find_file_cover(tmp_path, group) == tmp_path / "cover.jpg"
+
+    (group / "cover.png").write_bytes(b"group")
+    # extension order wins over location, as before
+    assert find_file_cover(tmp_path, group) == tmp_path / "cover.jpg"
+    (group / "cover.jpg").write_bytes(b"group")
+    assert find_file_cover(tmp_path, group) == group / "cover.jpg"
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+from audiomason import import_flow
+from audiomason.filecopy import Copier, copy_tree
+
+
+def _tree(root: Path, files: dict[str, bytes]) -> None:
+    for rel, data in files.items():
+        p = root / rel
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_bytes(data)
+        os.utime(p, ns=(1_000_000_000, 1_000_000_000))
+
+
+def test_incremental_copy_only_touches_changed_files(tmp_path: Path) -> None:
+    src, dst = tmp_path / "src", tmp_path / "stage"
+    dst.mkdir()
+    _tree(src, {"A/01.mp3": b"one", "A/02.mp3": b"two", "B/01.mp3": b"bee"})
+    first = copy_tree(src, dst, Copier("copy"), workers=2)
+    assert first.files == 3
+
+    (src / "A" / "03.mp3").write_bytes(b"three")
+    (src / "B" / "01.mp3").unlink()
+    (src / "B").rmdir()
+    (dst / "A" / "01.mp3").write_bytes(b"untouched stage copy")
+
+    again = copy_tree(src, dst, Copier("copy"), workers=2, previous=first.listing)
+
+    assert again.files == 1
+    assert again.removed == ("B/01.mp3",)
+    assert not (dst / "B").exists()
+    assert (dst / "A" / "03.mp3").read_bytes() == b"three"
+    # unchanged source file was not copied again
+    assert (dst / "A" / "01.mp3").read_bytes() == b"untouched stage copy"
+
+
+def test_sync_stage_reports_changed_books(tmp_path: Path) -> None:
+    src, stage = tmp_path / "src", tmp_path / "stage"
+    stage.mkdir()
+    _tree(src, {"01.mp3": b"root", "A/01.mp3": b"a", "B/01.mp3": b"b"})
+    rec = import_flow._stage_source(src, stage)
+    listing = import_flow._stage_listing({"stage": json.loads(json.dumps(rec))})
+    assert listing is not None and len(listing) == 3
+
+    (src / "B" / "02.mp3").write_bytes(b"new part")
+
+    rec2, touched = import_flow._sync_stage(src, stage, listing)
+
+    assert touched == {"B"}
+    assert (stage / "B" / "02.mp3").read_bytes() == b"new part"
+    files = rec2["files"]
+    assert isinstance(files, dict) and "B/02.mp3" in files
+
+
+def test_changed_books_lose_their_processed_mark() -> None:
+    mf: dict[str, object] = {
+        "book_meta": {},
+        "books": {
+            "picked": ["A", "B"],
+            "processed": ["A", "B"],
+            "timings": {"A": {"seconds": 1.0}, "B": {"seconds": 2.0}},
+        },
+    }
+
+    import_flow._forget_progress(mf, {"B"})
+
+    assert mf["books"] == {
+        "picked": ["A", "B"],
+        "processed": ["A"],
+        "timings": {"A": {"seconds": 1.0}},
+    }
+
+
+def test_changes_map_to_the_book_containing_them(tmp_path: Path) -> None:
+    src, stage = tmp_path / "src", tmp_path / "stage"
+    stage.mkdir()
+    _tree(
+        src,
+        {
+            "Saga/Book1/CD1/01.mp3": b"1",
+            "Saga/Book1/CD2/01.mp3": b"2",
+            "Saga/Book1/scans/back.jpg": b"scan",
+            "Saga/Book2/01.mp3": b"b2",
+        },
+    )
+    rec = import_flow._stage_source(src, stage)
+    listing = import_flow._stage_listing({"stage": json.loads(json.dumps(rec))})
+    assert listing is not None
+
+    (src / "Saga" / "Book1" / "CD2" / "02.mp3").write_bytes(b"late disc part")
+    (src / "Saga" / "Book1" / "scans" / "back.jpg").write_bytes(b"rescan")
+    rec, touched = import_flow._sync_stage(src, stage, listing)
+    assert touched == {"Saga/Book1/CD1", "Saga/Book1/CD2"}
+
+    listing = import_flow._stage_listing({"stage": json.loads(json.dumps(rec))})
+    assert listing is not None
+    (src / "cover.jpg").write_bytes(b"shared cover")
+    _, touched = import_flow._sync_stage(src, stage, listing)
+    assert touched == {"Saga/Book1/CD1", "Saga/Book1/CD2", "Saga/Book2"}
+
+
+def test_nested_disc_belongs_to_the_enclosing_book() -> None:
+    stage = Path("/stage")
+    books = [
+        import_flow.BookGroup("__ROOT_AUDIO__", stage, stage, Path(".")),
+        import_flow.BookGroup("Book", stage / "Book", stage, Path("Book")),
+    ]
+    assert import_flow._touched_books(["Book/CD1/01.mp3"], books) == {"Book"}
+    assert import_flow._touched_books(["01.mp3"], books) == {"__ROOT_AUDIO__", "Book"}
+    assert import_flow._touched_books(["Other/notes.txt"], books) == {"__ROOT_AUDIO__"}
+
+
+def test_malformed_listing_is_ignored() -> None:
+    assert import_flow._stage_listing({}) is None
+    assert import_flow._stage_listing({"stage": {"files": {"a.mp3": [1]}}}) is None
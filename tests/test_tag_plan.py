@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from mutagen.id3 import ID3
+from mutagen.id3._frames import APIC, COMM, TIT2
+
+from audiomason import tags
+from audiomason.covers import extract_embedded_cover_from_mp3
+from audiomason.rename import rename_sequential
+from audiomason.tags import TagPlan, wipe_id3, write_cover, write_tags
+
+
+def _track(p: Path) -> Path:
+    p.write_bytes(b"\xff\xfb\x90\x00" + b"\x00" * 2000)
+    id3 = ID3()
+    id3.add(TIT2(encoding=3, text="old title"))
+    id3.add(COMM(encoding=3, lang="eng", desc="", text="ripped by someone"))
+    id3.add(APIC(encoding=3, mime="image/jpeg", type=3, desc="Cover", data=b"OLD"))
+    id3.save(p, v1=2)
+    return p
+
+
+def _count_saves(monkeypatch) -> list[str]:
+    saved: list[str] = []
+    real_save = ID3.save
+
+    def counting_save(self, filething=None, **kwargs):
+        saved.append(Path(str(filething)).name)
+        return real_save(self, filething, **kwargs)
+
+    monkeypatch.setattr(tags.ID3, "save", counting_save)
+    return saved
+
+
+def test_wipe_tags_cover_save_each_file_once(monkeypatch, tmp_path: Path) -> None:
+    mp3s = [_track(tmp_path / "b.mp3"), _track(tmp_path / "a.mp3")]
+    saved = _count_saves(monkeypatch)
+
+    with TagPlan():
+        wipe_id3(mp3s)
+        write_cover(mp3s, cover=b"OLD", cover_mime="image/jpeg")
+        mp3s = rename_sequential(tmp_path, mp3s)
+        write_tags(mp3s, artist="Author", album="Book", track_start=1, cover=None, cover_mime=None)
+        write_cover(mp3s, cover=b"NEW", cover_mime="image/png")
+        assert saved == []
+
+    assert sorted(saved) == sorted(p.name for p in mp3s)
+    id3 = ID3(mp3s[0])
+    assert str(id3["TIT2"]) == mp3s[0].stem
+    assert str(id3["TPE1"]) == "Author"
+    assert str(id3["TRCK"]) == "1"
+    assert not id3.getall("COMM")  # wiped
+    assert [f.data for f in id3.getall("APIC")] == [b"NEW"]
+    assert mp3s[0].read_bytes()[-128:-125] != b"TAG"  # ID3v1 dropped with the wipe
+
+
+def test_cover_reads_see_the_pending_plan(tmp_path: Path) -> None:
+    mp3 = _track(tmp_path / "01.mp3")
+
+    with TagPlan():
+        assert extract_embedded_cover_from_mp3(mp3) == (b"OLD", "image/jpeg")
+        write_tags([mp3], artist="A", album="B", track_start=1, cover=None, cover_mime=None)
+        assert extract_embedded_cover_from_mp3(mp3) is None
+        write_cover([mp3], cover=b"NEW", cover_mime="image/png")
+        assert extract_embedded_cover_from_mp3(mp3) == (b"NEW", "image/png")
+        assert [f.data for f in ID3(mp3).getall("APIC")] == [b"OLD"]
+
+    assert extract_embedded_cover_from_mp3(mp3) == (b"NEW", "image/png")
+
+
+def test_failed_block_writes_nothing(tmp_path: Path) -> None:
+    mp3 = _track(tmp_path / "01.mp3")
+    before = mp3.read_bytes()
+
+    try:
+        with TagPlan():
+            wipe_id3([mp3])
+            raise RuntimeError("step failed")
+    except RuntimeError:
+        pass
+
+    assert mp3.read_bytes() == before
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from mutagen.id3 import ID3
+
+import audiomason.state as state
+from audiomason import tags
+from audiomason.cli import _apply_tags_config
+from audiomason.tags import TagPlan, wipe_id3, write_cover, write_tags
+from audiomason.util import AmConfigError, AmExitError
+
+
+def _tracks(root: Path, n: int) -> list[Path]:
+    files = []
+    for i in range(1, n + 1):
+        p = root / f"{i:02d}.mp3"
+        ID3().save(p)
+        files.append(p)
+    return files
+
+
+def test_files_are_tagged_concurrently_in_order(monkeypatch, tmp_path: Path, capsys) -> None:
+    files = _tracks(tmp_path, 6)
+    active: list[int] = []
+    peak: list[int] = [0]
+    lock = threading.Lock()
+    real_apply = tags._apply_file
+
+    def slow_apply(p: Path, fp: object) -> None:
+        with lock:
+            active.append(1)
+            peak[0] = max(peak[0], len(active))
+        time.sleep(0.05)
+        real_apply(p, fp)  # type: ignore[arg-type]
+        with lock:
+            active.pop()
+
+    monkeypatch.setattr(tags, "_apply_file", slow_apply)
+    write_tags(files, artist="A", album="B", track_start=3, cover=None, cover_mime=None, workers=3)
+
+    assert peak[0] == 3
+    assert [str(ID3(p)["TRCK"]) for p in files] == ["3", "4", "5", "6", "7", "8"]
+    lines = capsys.readouterr().out.splitlines()
+    assert lines == [f"[tags] {p.name}" for p in files]
+
+
+def test_plan_applies_in_a_pool(monkeypatch, tmp_path: Path) -> None:
+    files = _tracks(tmp_path, 4)
+    threads: set[str] = set()
+    real_apply = tags._apply_file
+
+    def record_thread(p: Path, fp: object) -> None:
+        threads.add(threading.current_thread().name)
+        time.sleep(0.02)
+        real_apply(p, fp)  # type: ignore[arg-type]
+
+    monkeypatch.setattr(tags, "_apply_file", record_thread)
+    monkeypatch.setattr(state, "OPTS", state.Opts(tag_workers=4))
+    with TagPlan():
+        wipe_id3(files)
+        write_cover(files, cover=b"IMG", cover_mime="image/jpeg")
+
+    assert len(threads) > 1
+    assert all(ID3(p).getall("APIC") for p in files)
+
+
+def test_first_failure_names_the_file(monkeypatch, tmp_path: Path) -> None:
+    files = _tracks(tmp_path, 4)
+    real_apply = tags._apply_file
+
+    def fail_some(p: Path, fp: object) -> None:
+        if p.name in ("02.mp3", "04.mp3"):
+            raise OSError("Input/output error")
+        real_apply(p, fp)  # type: ignore[arg-type]
+
+    monkeypatch.setattr(tags, "_apply_file", fail_some)
+    with pytest.raises(AmExitError, match=r"Tag write failed: 02\.mp3: Input/output error"):
+        write_cover(files, cover=b"IMG", cover_mime="image/jpeg", workers=4)
+
+
+def test_tags_workers_config() -> None:
+    opts = state.Opts()
+    _apply_tags_config(opts, {"tags": {"workers": 8}})
+    assert opts.tag_workers == 8
+    with pytest.raises(AmConfigError):
+        _apply_tags_config(opts, {"tags": {"workers": 0}})
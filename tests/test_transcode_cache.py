@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+import audiomason.state as state
+from audiomason import audio
+from audiomason.cli import _apply_cache_config
+from audiomason.state import Opts
+from audiomason.transcode_cache import TranscodeCache
+from audiomason.util import AmConfigError
+
+
+def test_identical_source_reuses_cached_encode(monkeypatch, tmp_path: Path) -> None:
+    old_opts = state.OPTS
+    try:
+        state.OPTS = Opts(
+            dry_run=False,
+            q_a="2",
+            cache_root=tmp_path / "cache",
+            transcode_cache=True,
+        )
+        monkeypatch.setattr(audio.shutil, "which", lambda name: f"/usr/bin/{name}")
+        encodes: list[list[str]] = []
+
+        def fake_run_cmd(cmd, check=True, stdout=None):
+            encodes.append(cmd)
+            Path(cmd[-1]).write_bytes(b"encoded:" + Path(cmd[cmd.index("-i") + 1]).read_bytes())
+            return SimpleNamespace(stdout=b"")
+
+        monkeypatch.setattr(audio, "run_cmd", fake_run_cmd)
+
+        a = tmp_path / "a.m4a"
+        b = tmp_path / "b" / "copy.m4a"
+        b.parent.mkdir()
+        a.write_bytes(b"same-bytes")
+        b.write_bytes(b"same-bytes")
+
+        assert audio.m4a_to_mp3_single(a, a.with_suffix(".mp3")) is False
+        assert audio.m4a_to_mp3_single(b, b.with_suffix(".mp3")) is True
+        assert len(encodes) == 1
+        assert b.with_suffix(".mp3").read_bytes() == b"encoded:same-bytes"
+
+        # the output is a copy: editing it in place must not touch the cache
+        b.with_suffix(".mp3").write_bytes(b"retagged")
+        c = tmp_path / "c.m4a"
+        c.write_bytes(b"same-bytes")
+        assert audio.m4a_to_mp3_single(c, c.with_suffix(".mp3")) is True
+        assert c.with_suffix(".mp3").read_bytes() == b"encoded:same-bytes"
+
+        # different encoder settings are a different entry
+        state.OPTS.q_a = "4"
+        assert audio.m4a_to_mp3_single(c, c.with_suffix(".mp3")) is False
+        assert len(encodes) == 2
+    finally:
+        state.OPTS = old_opts
+
+
+def test_cache_is_lru_bounded(tmp_path: Path) -> None:
+    cache = TranscodeCache(tmp_path / "cache", max_bytes=150)
+    for i in range(3):
+        src = tmp_path / f"{i}.m4a"
+        src.write_bytes(f"src-{i}".encode())
+        out = tmp_path / f"{i}.mp3"
+        out.write_bytes(b"x" * 60)
+        key = cache.key(src, ["-q:a", "2"])
+        assert key is not None
+        cache.store(key, out)
+    assert len(list((tmp_path / "cache" / "transcode").glob("*.mp3"))) == 2
+
+
+def test_cache_config_is_validated() -> None:
+    opts = Opts()
+    _apply_cache_config(opts, {"ffmpeg": {"transcode_cache": True, "transcode_cache_max_mb": 512}})
+    assert opts.transcode_cache and opts.transcode_cache_max_mb == 512
+    for bad in ({"transcode_cache": "yes"}, {"transcode_cache_max_mb": -1}):
+        with pytest.raises(AmConfigError):
+            _apply_cache_config(Opts(), {"ffmpeg": bad})
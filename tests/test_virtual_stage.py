@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import zipfile
+from pathlib import Path
+
+import pytest
+from mutagen.id3 import ID3
+from mutagen.id3._frames import TALB, TIT2
+
+import audiomason.state as state
+from audiomason.archives import unpack
+from audiomason.tags import summarize_id3
+from audiomason.transcode_cache import file_sha256
+from audiomason.virtual_stage import VIRTUAL_INDEX, input_arg, materialize, member, open_media
+
+AUDIO = b"ID3" + bytes(range(256)) * 40
+
+
+@pytest.fixture
+def staged(monkeypatch, tmp_path: Path) -> Path:
+    monkeypatch.setattr(state, "OPTS", state.Opts(stage_virtual=True))
+    src = tmp_path / "book.zip"
+    with zipfile.ZipFile(src, "w") as zf:
+        zf.writestr("Book/01.mp3", AUDIO, compress_type=zipfile.ZIP_STORED)
+        zf.writestr("Book/02.mp3", AUDIO[::-1], compress_type=zipfile.ZIP_DEFLATED)
+        zf.writestr("Book/cover.jpg", b"jpeg", compress_type=zipfile.ZIP_STORED)
+    stage = tmp_path / "stage"
+    unpack(src, stage)
+    return stage
+
+
+def test_stored_audio_stays_in_the_archive(staged: Path) -> None:
+    placeholder = staged / "Book" / "01.mp3"
+    assert (staged / VIRTUAL_INDEX).is_file()
+    assert placeholder.stat().st_size == len(AUDIO)
+    assert placeholder.read_bytes() != AUDIO
+
+    m = member(placeholder)
+    assert m is not None
+    assert input_arg(placeholder) == m.url()
+    assert m.url().startswith(f"subfile,,start,{m.offset},end,{m.offset + len(AUDIO)},,:")
+    with open_media(placeholder) as fh:
+        assert fh.read() == AUDIO
+        fh.seek(-4, 2)
+        assert fh.read() == AUDIO[-4:]
+
+
+def test_deflated_and_non_audio_members_are_extracted(staged: Path) -> None:
+    assert member(staged / "Book" / "02.mp3") is None
+    assert (staged / "Book" / "02.mp3").read_bytes() == AUDIO[::-1]
+    assert (staged / "Book" / "cover.jpg").read_bytes() == b"jpeg"
+    assert input_arg(staged / "Book" / "02.mp3") == str(staged / "Book" / "02.mp3")
+
+
+def test_materialize_writes_member_bytes(staged: Path, tmp_path: Path) -> None:
+    dst = tmp_path / "out.mp3"
+    materialize(staged / "Book" / "01.mp3", dst)
+    assert dst.read_bytes() == AUDIO
+
+
+def test_cache_keys_hash_member_bytes(staged: Path, tmp_path: Path) -> None:
+    real = tmp_path / "real.mp3"
+    real.write_bytes(AUDIO)
+    assert file_sha256(staged / "Book" / "01.mp3") == file_sha256(real)
+
+
+def test_id3_summary_reads_the_archive_member(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(state, "OPTS", state.Opts(stage_virtual=True))
+    real = tmp_path / "real.mp3"
+    real.write_bytes(b"\xff\xfb\x90\x00" + b"\x00" * 2000)
+    id3 = ID3()
+    id3.add(TIT2(encoding=3, text="Chapter 1"))
+    id3.add(TALB(encoding=3, text="Book"))
+    id3.save(real)
+    src = tmp_path / "book.zip"
+    with zipfile.ZipFile(src, "w") as zf:
+        zf.writestr("Book/01.mp3", real.read_bytes(), compress_type=zipfile.ZIP_STORED)
+    unpack(src, tmp_path / "stage")
+
+    placeholder = tmp_path / "stage" / "Book" / "01.mp3"
+    assert member(placeholder) is not None
+    assert summarize_id3(placeholder) == {"file": "01.mp3", "title": "Chapter 1", "album": "Book"}